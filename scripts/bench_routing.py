@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.routing.semantic import _tokenize, get_semantic_index, semantic_route
+
+
+def build_synthetic_intents(intent_count: int, vocab_size: int = 20_000, seed: int = 7) -> dict[str, Any]:
+    rng = random.Random(seed)
+    vocab = [f"wort{i}" for i in range(vocab_size)]
+    intents: dict[str, Any] = {}
+    for i in range(intent_count):
+        examples = [" ".join(rng.sample(vocab, 6)) for _ in range(4)]
+        intents[f"intent_{i}"] = {"examples": examples, "default_tier": "tier_2"}
+    return {"intents": intents}
+
+
+def linear_scan_route(message: str, intents_config: dict[str, Any]) -> str | None:
+    """Reference scan that re-tokenizes every intent per message (pre-index behaviour)."""
+    message_tokens = _tokenize(message)
+    best_intent: str | None = None
+    best_overlap = 0.0
+    for intent_name, intent_meta in intents_config.get("intents", {}).items():
+        candidate_tokens: set[str] = set()
+        for phrase in intent_meta.get("examples") or intent_meta.get("keywords") or []:
+            candidate_tokens.update(_tokenize(str(phrase)))
+        if not candidate_tokens:
+            continue
+        overlap = len(message_tokens & candidate_tokens) / len(candidate_tokens)
+        if overlap > best_overlap:
+            best_overlap = overlap
+            best_intent = intent_name
+    return best_intent
+
+
+def _time_per_call_us(fn: Callable[[str], object], messages: list[str]) -> float:
+    start = time.perf_counter()
+    for message in messages:
+        fn(message)
+    return (time.perf_counter() - start) / len(messages) * 1_000_000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark semantic routing latency vs intent count")
+    parser.add_argument("--sizes", default="10,100,1000,5000")
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--skip-linear", action="store_true", help="Skip the slow per-message reference scan")
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    print(f"{'intents':>8} {'index_build_ms':>15} {'indexed_us':>11} {'linear_us':>11}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        intents = build_synthetic_intents(size)
+        vocab = [f"wort{i}" for i in range(20_000)]
+        messages = [" ".join(rng.sample(vocab, 8)) for _ in range(args.messages)]
+
+        t0 = time.perf_counter()
+        get_semantic_index(intents)
+        build_ms = (time.perf_counter() - t0) * 1000
+
+        indexed_us = _time_per_call_us(lambda m: semantic_route(m, intents), messages)
+        linear = "-"
+        if not args.skip_linear:
+            linear = f"{_time_per_call_us(lambda m: linear_scan_route(m, intents), messages[:20]):.1f}"
+        print(f"{size:>8} {build_ms:>15.1f} {indexed_us:>11.1f} {linear:>11}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.compile_tenant_bundles import compile_bundles
+from src.tenant.manager import TenantManager
+
+
+def _build_tree(root: Path, tenant_count: int) -> list[str]:
+    source = PROJECT_ROOT / "configs"
+    shutil.copytree(source / "defaults", root / "defaults")
+    tenant_ids = [f"tenant_{i:04d}" for i in range(tenant_count)]
+    for tenant_id in tenant_ids:
+        target = root / "tenants" / tenant_id
+        shutil.copytree(source / "tenants" / "example_tenant", target)
+        tenant_yaml = (target / "tenant.yaml").read_text(encoding="utf-8")
+        (target / "tenant.yaml").write_text(tenant_yaml.replace("example_tenant", tenant_id), encoding="utf-8")
+    return tenant_ids
+
+
+def _warm_all(manager: TenantManager, tenant_ids: list[str]) -> float:
+    start = time.perf_counter()
+    for tenant_id in tenant_ids:
+        manager.load_tenant_config(tenant_id)
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare tenant warm-up from YAML vs compiled bundles")
+    parser.add_argument("--tenants", type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_root = Path(tmp) / "configs"
+        bundle_root = Path(tmp) / "bundles"
+        tenant_ids = _build_tree(config_root, args.tenants)
+
+        compile_start = time.perf_counter()
+        compile_bundles(config_root, bundle_root)
+        compile_ms = (time.perf_counter() - compile_start) * 1000
+
+        yaml_ms = _warm_all(TenantManager(config_root=config_root, on_reload=None), tenant_ids)
+        bundle_ms = _warm_all(TenantManager(config_root=config_root, on_reload=None, bundle_root=bundle_root), tenant_ids)
+
+    print(f"tenants:          {args.tenants}")
+    print(f"compile bundles:  {compile_ms:8.1f} ms")
+    print(f"cold start yaml:  {yaml_ms:8.1f} ms ({yaml_ms / args.tenants:.3f} ms/tenant)")
+    print(f"cold start bundle:{bundle_ms:8.1f} ms ({bundle_ms / args.tenants:.3f} ms/tenant)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,10 +2,15 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
 
 @dataclass
 class CalibrationReport:
@@ -66,17 +71,37 @@ def analyze_decisions(records: list[dict[str, Any]], current_low_conf_threshold:
     )
 
 
+def replay_routing(records: list[dict[str, Any]], tenant_context: Any, workers: int | None = None) -> list[dict[str, Any]]:
+    """Re-route logged `input_text`s against the current tenant config (one `route_batch` call)."""
+    from src.routing import route_batch
+
+    decisions = route_batch([str(row.get("input_text", "")) for row in records], tenant_context, workers=workers)
+    return [
+        {**row, "predicted_intent": decision.intent, "confidence": decision.confidence}
+        for row, decision in zip(records, decisions)
+    ]
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Calibrate confidence threshold from decision logs")
     parser.add_argument("--input", required=True, help="Path to JSON file containing decision records")
     parser.add_argument("--output", default="calibration_report.json")
     parser.add_argument("--current-threshold", type=float, default=0.35)
+    parser.add_argument("--replay-tenant", help="Re-route input_text with this tenant's current config before analyzing")
+    parser.add_argument("--config-root", default="configs")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size for large replays")
     args = parser.parse_args()
 
     records = json.loads(Path(args.input).read_text(encoding="utf-8"))
     if not isinstance(records, list):
         raise ValueError("Input JSON must be a list of decision log rows")
 
+    if args.replay_tenant:
+        from src.tenant.manager import TenantManager
+
+        tenant_context = TenantManager(config_root=Path(args.config_root)).load_tenant_context(tenant_id=args.replay_tenant)
+        records = replay_routing(records, tenant_context, workers=args.workers)
+
     report = analyze_decisions(records, current_low_conf_threshold=args.current_threshold)
     out_path = Path(args.output)
     out_path.write_text(json.dumps(report.to_dict(), ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
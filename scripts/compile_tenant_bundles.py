@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.tenant.bundle import bundle_path, compute_source_hash, write_bundle
+from src.tenant.manager import TENANT_ID_PATTERN, TenantManager
+
+
+def compile_bundles(config_root: Path, output: Path, tenant_ids: list[str] | None = None) -> list[Path]:
+    manager = TenantManager(config_root=config_root)
+    if tenant_ids is None:
+        tenant_ids = sorted(
+            entry.name
+            for entry in manager.tenants_root.iterdir()
+            if entry.is_dir() and TENANT_ID_PATTERN.fullmatch(entry.name) and (entry / "tenant.yaml").exists()
+        )
+
+    written: list[Path] = []
+    for tenant_id in tenant_ids:
+        tenant_root = (manager.tenants_root / tenant_id).resolve()
+        # Hash before parsing so an edit during compilation leaves the bundle stale, not wrong.
+        source_hash = compute_source_hash(manager.source_paths(tenant_root))
+        config = manager.build_tenant_config(tenant_id)
+        target = bundle_path(output, tenant_id)
+        write_bundle(target, config, source_hash)
+        written.append(target)
+    return written
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compile merged tenant configs into binary snapshots")
+    parser.add_argument("--config-root", default="configs")
+    parser.add_argument("--output", default="configs/bundles")
+    parser.add_argument("--tenant", action="append", dest="tenants", help="Compile only this tenant (repeatable)")
+    args = parser.parse_args()
+
+    written = compile_bundles(Path(args.config_root), Path(args.output), tenant_ids=args.tenants)
+    print(f"Compiled {len(written)} tenant bundle(s) into {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import json
+import threading
+from pathlib import Path
+from typing import Any, AsyncIterator
+
+import httpx
+import yaml
+
+DEFAULT_TIMEOUT_SECONDS = 8.0
+CONNECT_TIMEOUT_SECONDS = 3.0
+
+
+def load_tier_timeouts(config_path: Path) -> dict[str, float]:
+    """Read per-tier request timeouts (`litellm_params.timeout`) from litellm_config.yaml."""
+    if not config_path.exists():
+        return {}
+    raw = yaml.safe_load(config_path.read_text(encoding="utf-8")) or {}
+    timeouts: dict[str, float] = {}
+    for entry in raw.get("model_list", []):
+        timeout = entry.get("litellm_params", {}).get("timeout")
+        if entry.get("model_name") and timeout is not None:
+            timeouts[str(entry["model_name"])] = float(timeout)
+    return timeouts
+
+
+def parse_sse_delta(line: str) -> str | None:
+    """Content delta of one SSE line; "" for lines without content, None at `[DONE]`."""
+    if not line.startswith("data:"):
+        return ""
+    data = line[len("data:") :].strip()
+    if data == "[DONE]":
+        return None
+    try:
+        choices = json.loads(data).get("choices") or [{}]
+    except ValueError:
+        return ""
+    return str((choices[0].get("delta") or {}).get("content") or "")
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+class LiteLLMClient:
+    """Pooled HTTP client for the LiteLLM proxy `chat/completions` endpoint.
+
+    One long-lived `httpx.AsyncClient` (per event loop) and one `httpx.Client`
+    keep connections alive across requests. HTTP/2 is used when `h2` is
+    installed. Timeouts are taken per tier from litellm_config.yaml.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        tier_timeouts: dict[str, float] | None = None,
+        default_timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        max_connections: int = 50,
+        max_keepalive_connections: int = 20,
+        transport: Any = None,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.tier_timeouts = tier_timeouts or {}
+        self.default_timeout = default_timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self.http2 = _http2_available()
+        self.transport = transport
+        # An AsyncClient's pool is bound to the loop it was first used on: one client per loop.
+        self._async_clients: dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+        self._async_lock = threading.Lock()
+        self._closing: set[asyncio.Task[None]] = set()
+        self._sync_client: httpx.Client | None = None
+        self._sync_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Any, config_path: Path | None = None) -> LiteLLMClient:
+        path = config_path or Path(settings.litellm_config_path)
+        return cls(
+            base_url=settings.litellm_base_url,
+            api_key=settings.litellm_api_key,
+            tier_timeouts=load_tier_timeouts(path),
+        )
+
+    def timeout_for(self, model: str) -> httpx.Timeout:
+        return httpx.Timeout(self.tier_timeouts.get(model, self.default_timeout), connect=CONNECT_TIMEOUT_SECONDS)
+
+    def _request_kwargs(self, model: str, prompt: str, max_tokens: int, stream: bool = False) -> dict[str, Any]:
+        body: dict[str, Any] = {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+        }
+        if stream:
+            body["stream"] = True
+        return {"json": body, "timeout": self.timeout_for(model)}
+
+    def _client_kwargs(self) -> dict[str, Any]:
+        kwargs: dict[str, Any] = {
+            "base_url": self.base_url,
+            "headers": {"Authorization": f"Bearer {self.api_key}"},
+            "limits": self.limits,
+            "http2": self.http2,
+        }
+        if self.transport is not None:
+            kwargs["transport"] = self.transport
+        return kwargs
+
+    def async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._async_lock:
+            client = self._async_clients.get(loop)
+            if client is not None and not client.is_closed:
+                return client
+            stale = [old for old_loop, old in self._async_clients.items() if old_loop.is_closed()]
+            self._async_clients = {l: c for l, c in self._async_clients.items() if not l.is_closed()}
+            client = self._async_clients[loop] = httpx.AsyncClient(**self._client_kwargs())
+        # clients of finished loops (e.g. asyncio.run) release their pools on this loop
+        for old in stale:
+            task = loop.create_task(old.aclose())
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+        return client
+
+    def sync_client(self) -> httpx.Client:
+        # Specialist threads share this client; create it exactly once.
+        with self._sync_lock:
+            if self._sync_client is None or self._sync_client.is_closed:
+                self._sync_client = httpx.Client(**self._client_kwargs())
+            return self._sync_client
+
+    async def acomplete(self, model: str, prompt: str, max_tokens: int) -> str:
+        response = await self.async_client().post("/chat/completions", **self._request_kwargs(model, prompt, max_tokens))
+        response.raise_for_status()
+        return str(response.json()["choices"][0]["message"]["content"])
+
+    async def astream(self, model: str, prompt: str, max_tokens: int) -> AsyncIterator[str]:
+        """Yield content deltas from the SSE `chat/completions` stream as they arrive."""
+        request_kwargs = self._request_kwargs(model, prompt, max_tokens, stream=True)
+        async with self.async_client().stream("POST", "/chat/completions", **request_kwargs) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                delta = parse_sse_delta(line)
+                if delta is None:
+                    break
+                if delta:
+                    yield delta
+
+    def complete(self, model: str, prompt: str, max_tokens: int) -> str:
+        """Blocking variant for sync callers; shares pool limits and timeouts with `acomplete`."""
+        response = self.sync_client().post("/chat/completions", **self._request_kwargs(model, prompt, max_tokens))
+        response.raise_for_status()
+        return str(response.json()["choices"][0]["message"]["content"])
+
+    async def aclose(self) -> None:
+        current = asyncio.get_running_loop()
+        with self._async_lock:
+            clients, self._async_clients = self._async_clients, {}
+        for loop, client in clients.items():
+            if loop is current or loop.is_closed() or not loop.is_running():
+                await client.aclose()
+            else:
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.aclose(), loop))
+        pending = [task for task in self._closing if task.get_loop() is current]
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        self.close()
+
+    def close(self) -> None:
+        if self._sync_client is not None:
+            self._sync_client.close()
+            self._sync_client = None
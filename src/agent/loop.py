@@ -1,42 +1,128 @@
 from __future__ import annotations
 
 import time
-from typing import Any
-
-import httpx
+from typing import Any, AsyncIterator
 
+from src.agent.llm_client import LiteLLMClient
 from src.config import settings
+from src.memory.context import get_default_tokenizer
 from src.observability.client import DecisionLogger, create_decision_logger
+from src.orchestration.budget import BudgetAgent
+from src.orchestration.spend_ledger import SpendReservation
+
+FALLBACK_REPLY = "Alles klar, ich kümmere mich darum."
+BUDGET_EXCEEDED_REPLY = "Das Tageslimit ist erreicht, bitte versuche es morgen noch einmal."
+MAX_REPLY_TOKENS = 400
 
 
 class AgentLoop:
-    def __init__(self, logger: DecisionLogger | None = None) -> None:
+    def __init__(
+        self,
+        logger: DecisionLogger | None = None,
+        llm_client: LiteLLMClient | None = None,
+        budget: BudgetAgent | None = None,
+    ) -> None:
         self.logger = logger or create_decision_logger(settings)
+        self.llm_client = llm_client or LiteLLMClient.from_settings(settings)
+        # without a budget, calls are neither capped nor booked
+        self.budget = budget
 
     def _call_litellm(self, model: str, prompt: str, max_tokens: int) -> str:
         try:
-            response = httpx.post(
-                f"{settings.litellm_base_url}/chat/completions",
-                json={
-                    "model": model,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "max_tokens": max_tokens,
-                },
-                headers={"Authorization": f"Bearer {settings.litellm_api_key}"},
-                timeout=8.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-            return str(data["choices"][0]["message"]["content"])
+            return self.llm_client.complete(model=model, prompt=prompt, max_tokens=max_tokens)
+        except Exception:
+            return FALLBACK_REPLY
+
+    async def _acall_litellm(self, model: str, prompt: str, max_tokens: int) -> str:
+        try:
+            return await self.llm_client.acomplete(model=model, prompt=prompt, max_tokens=max_tokens)
         except Exception:
-            return "Alles klar, ich kümmere mich darum."
+            return FALLBACK_REPLY
+
+    @staticmethod
+    def _reserve(budget: BudgetAgent, event: dict[str, Any], model: str, prompt: str) -> SpendReservation | None:
+        """Reserve the worst-case cost of the call for `event["tenant_id"]`; None if over the daily cap."""
+        estimated = get_default_tokenizer().count(prompt) + MAX_REPLY_TOKENS
+        return budget.reserve(model, estimated, tenant_id=str(event.get("tenant_id") or "") or None)
+
+    def _settle(self, reservation: SpendReservation | None, prompt: str, text: str) -> None:
+        if self.budget is None or reservation is None:
+            return
+        if text == FALLBACK_REPLY:
+            # the call failed before producing output; nothing was spent
+            self.budget.release(reservation)
+            return
+        tokenizer = get_default_tokenizer()
+        self.budget.settle(reservation, tokenizer.count(prompt), tokenizer.count(text))
 
     def process(self, event: dict[str, Any]) -> dict[str, Any]:
+        """Blocking entry point for sync callers (scripts, specialists, tests)."""
+        start = time.perf_counter()
+        model = str(event.get("tier", "tier_2"))
+        prompt = str(event.get("text", ""))
+        reservation = self._reserve(self.budget, event, model, prompt) if self.budget else None
+        if self.budget and reservation is None:
+            return self._finish(event, model, BUDGET_EXCEEDED_REPLY, start)
+        text = ""
+        try:
+            text = self._call_litellm(model=model, prompt=prompt, max_tokens=MAX_REPLY_TOKENS)
+        finally:
+            self._settle(reservation, prompt, text)
+        return self._finish(event, model, text, start)
+
+    async def aprocess(self, event: dict[str, Any]) -> dict[str, Any]:
+        """Non-blocking entry point for async request handlers."""
         start = time.perf_counter()
         model = str(event.get("tier", "tier_2"))
         prompt = str(event.get("text", ""))
-        text = self._call_litellm(model=model, prompt=prompt, max_tokens=400)
+        reservation = self._reserve(self.budget, event, model, prompt) if self.budget else None
+        if self.budget and reservation is None:
+            return self._finish(event, model, BUDGET_EXCEEDED_REPLY, start)
+        text = ""
+        try:
+            text = await self._acall_litellm(model=model, prompt=prompt, max_tokens=MAX_REPLY_TOKENS)
+        finally:
+            self._settle(reservation, prompt, text)
+        return self._finish(event, model, text, start)
+
+    async def astream(self, event: dict[str, Any]) -> AsyncIterator[str]:
+        """Yield the reply as it is generated; logs time-to-first-token separately."""
+        start = time.perf_counter()
+        model = str(event.get("tier", "tier_2"))
+        prompt = str(event.get("text", ""))
+        reservation = self._reserve(self.budget, event, model, prompt) if self.budget else None
+        if self.budget and reservation is None:
+            self._finish(event, model, BUDGET_EXCEEDED_REPLY, start)
+            yield BUDGET_EXCEEDED_REPLY
+            return
+        chunks: list[str] = []
+        first_token_at: float | None = None
+        try:
+            try:
+                async for chunk in self.llm_client.astream(model=model, prompt=prompt, max_tokens=MAX_REPLY_TOKENS):
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    chunks.append(chunk)
+                    yield chunk
+            except Exception:
+                if not chunks:
+                    first_token_at = time.perf_counter()
+                    chunks.append(FALLBACK_REPLY)
+                    yield FALLBACK_REPLY
+        finally:
+            # also runs when the client disconnects mid-stream (GeneratorExit): book and log the partial reply
+            self._settle(reservation, prompt, "".join(chunks))
+            self._finish(event, model, "".join(chunks), start, first_token_at=first_token_at)
 
+    def _finish(
+        self,
+        event: dict[str, Any],
+        model: str,
+        text: str,
+        start: float,
+        first_token_at: float | None = None,
+    ) -> dict[str, Any]:
+        finished_at = time.perf_counter()
         response = {
             "text": text,
             "intent": event.get("intent", "fallback"),
@@ -57,7 +143,9 @@ class AgentLoop:
                 "grounding_passed": True,
                 "citations": [],
                 "response_text": response["text"],
-                "latency_ms": int((time.perf_counter() - start) * 1000),
+                "latency_ms": int((finished_at - start) * 1000),
+                # without streaming the first token arrives with the full reply
+                "time_to_first_token_ms": int(((first_token_at or finished_at) - start) * 1000),
                 "token_in": 10,
                 "token_out": 12,
             }
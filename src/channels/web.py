@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import AsyncIterator
+
 from src.channels.base import BaseChannel, build_disclosure
 from src.channels.message import UnifiedMessage, from_web_payload
 
@@ -10,3 +12,9 @@ class WebChannel(BaseChannel):
 
     def format_response(self, text: str, tenant_name: str) -> str:
         return f"{build_disclosure(tenant_name)}\n\n{text}"
+
+    async def format_stream(self, chunks: AsyncIterator[str], tenant_name: str) -> AsyncIterator[str]:
+        """Streaming counterpart of `format_response`: the disclosure is always the first chunk."""
+        yield f"{build_disclosure(tenant_name)}\n\n"
+        async for chunk in chunks:
+            yield chunk
@@ -15,18 +15,26 @@ class Settings(BaseSettings):
 
     litellm_base_url: str = "http://localhost:4000"
     litellm_api_key: str = "changeme"
+    litellm_config_path: str = "configs/litellm_config.yaml"
 
     redis_url: str = "redis://localhost:6379/0"
+    working_memory_ttl_seconds: int = 86_400
+
+    embedding_cache_dir: str = ""
 
     supabase_url: str = ""
     supabase_service_role_key: str = ""
     supabase_db_url: str = ""
 
+    vector_store_backend: str = "lexical"
+    vector_store_ivf_lists: int = 0
+
     langfuse_host: str = "https://cloud.langfuse.com"
     langfuse_public_key: str = ""
     langfuse_secret_key: str = ""
 
     default_tenant_id: str = "example_tenant"
+    tenant_bundle_dir: str = ""
     runtime_mode: str = "local"
 
     telegram_bot_token: str = ""
@@ -34,6 +42,8 @@ class Settings(BaseSettings):
     n8n_api_key: str = ""
     whisper_model: str = "base"
     daily_budget_usd: float = 2.0
+    spend_ledger_sqlite_path: str = ""
+    spend_ledger_flush_seconds: float = 5.0
 
     @field_validator("runtime_mode")
     @classmethod
@@ -43,6 +53,14 @@ class Settings(BaseSettings):
             raise ValueError("RUNTIME_MODE must be either 'local' or 'production'.")
         return normalized
 
+    @field_validator("vector_store_backend")
+    @classmethod
+    def validate_vector_store_backend(cls, value: str) -> str:
+        normalized = value.lower()
+        if normalized not in {"lexical", "numpy", "pgvector"}:
+            raise ValueError("VECTOR_STORE_BACKEND must be one of 'lexical', 'numpy', 'pgvector'.")
+        return normalized
+
     @model_validator(mode="after")
     def validate_production_credentials(self) -> Settings:
         if self.app_env.lower() in {"prod", "production"}:
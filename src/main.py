@@ -1,31 +1,49 @@
 from __future__ import annotations
 
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator
 from uuid import uuid4
 
 from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
 
+from src.channels.message import UnifiedMessage
 from src.channels.web import WebChannel
 from src.config import settings
 from src.db.client import create_event_store
 from src.db.models import ConversationEvent
 from src.orchestration.coordinator import Coordinator
 
-app = FastAPI(title="Nexus Agent", version="0.1.0")
-
 _coordinator = Coordinator()
 _web_channel = WebChannel()
 _db = create_event_store(settings)
 
 
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    spend_flush = asyncio.create_task(_coordinator.budget.ledger.run_periodic_flush())
+    try:
+        yield
+    finally:
+        spend_flush.cancel()
+        with suppress(asyncio.CancelledError):
+            await spend_flush
+        try:
+            _coordinator.budget.flush()
+        finally:
+            await _coordinator.loop.llm_client.aclose()
+
+
+app = FastAPI(title="Nexus Agent", version="0.1.0", lifespan=lifespan)
+
+
 @app.get("/health")
 async def healthcheck() -> dict[str, str]:
     return {"status": "ok", "env": settings.app_env}
 
 
-@app.post("/chat/web")
-async def web_chat(payload: dict) -> dict:
-    message = _web_channel.receive(payload)
-
+def _store_incoming(message: UnifiedMessage) -> None:
     _db.insert_event(
         ConversationEvent(
             event_id=str(uuid4()),
@@ -36,7 +54,13 @@ async def web_chat(payload: dict) -> dict:
         )
     )
 
-    result = _coordinator.process(message)
+
+@app.post("/chat/web")
+async def web_chat(payload: dict) -> dict:
+    message = _web_channel.receive(payload)
+    _store_incoming(message)
+
+    result = await _coordinator.aprocess(message)
 
     return {
         "tenant_id": message.tenant_id,
@@ -45,6 +69,19 @@ async def web_chat(payload: dict) -> dict:
     }
 
 
+@app.post("/chat/web/stream")
+async def web_chat_stream(payload: dict) -> StreamingResponse:
+    message = _web_channel.receive(payload)
+    _store_incoming(message)
+
+    intent, chunks = _coordinator.stream(message)
+    return StreamingResponse(
+        _web_channel.format_stream(chunks, tenant_name=message.tenant_id),
+        media_type="text/plain; charset=utf-8",
+        headers={"X-Nexus-Intent": intent},
+    )
+
+
 @app.get("/events")
 async def list_events(tenant_id: str | None = None) -> dict:
     return {"items": _db.list_events(tenant_id=tenant_id)}
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from typing import Protocol
+
+from src.config import Settings
+from src.memory.semantic import SemanticMemoryIndex
+from src.memory.vector_store import NumpyVectorStore, VectorStore
+from src.memory.working import Turn, WorkingMemoryStore
+
+
+class WorkingMemory(Protocol):
+    def append(self, session_id: str, role: str, content: str) -> None: ...
+
+    def get(self, session_id: str) -> list[Turn]: ...
+
+    def get_many(self, session_ids: list[str]) -> dict[str, list[Turn]]: ...
+
+    def clear(self, session_id: str) -> None: ...
+
+
+def create_working_memory(settings: Settings, max_turns: int = 12) -> WorkingMemory:
+    if settings.runtime_mode == "local":
+        return WorkingMemoryStore(max_turns=max_turns)
+
+    from src.memory.redis_working import RedisWorkingMemoryStore
+
+    return RedisWorkingMemoryStore.from_url(
+        settings.redis_url,
+        max_turns=max_turns,
+        ttl_seconds=settings.working_memory_ttl_seconds,
+    )
+
+
+def create_vector_store(settings: Settings) -> VectorStore:
+    if settings.vector_store_backend == "numpy":
+        return NumpyVectorStore(ivf_lists=settings.vector_store_ivf_lists)
+    if settings.vector_store_backend == "pgvector":
+        from src.memory.pgvector_store import PgVectorStore
+
+        return PgVectorStore(settings.supabase_db_url)
+    return SemanticMemoryIndex()
@@ -1,10 +1,82 @@
 from __future__ import annotations
 
+import importlib.util
+import math
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import accumulate
+from pathlib import Path
+from typing import Protocol
+
+import yaml
 
 from src.memory.semantic import SemanticSnippet
 from src.memory.working import Turn
 
+BUDGET_POLICY_PATH = Path("configs/policies/budget.yaml")
+
+
+class Tokenizer(Protocol):
+    def count(self, text: str) -> int: ...
+
+
+class CharTokenizer:
+    """One token per character; the historic `max_chars` budget."""
+
+    def count(self, text: str) -> int:
+        return len(text)
+
+
+class ApproxTokenizer:
+    """~4 characters per token, the usual estimate when no BPE vocabulary is available."""
+
+    def __init__(self, chars_per_token: float = 4.0) -> None:
+        self.chars_per_token = chars_per_token
+
+    def count(self, text: str) -> int:
+        return math.ceil(len(text) / self.chars_per_token)
+
+
+class TiktokenTokenizer:
+    def __init__(self, encoding_name: str = "cl100k_base") -> None:
+        import tiktoken
+
+        self._encoding = tiktoken.get_encoding(encoding_name)
+
+    def count(self, text: str) -> int:
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+
+class CachedTokenizer:
+    """Memoizes counts per text, so turns that stay in working memory are counted once."""
+
+    def __init__(self, inner: Tokenizer, maxsize: int = 4096) -> None:
+        self.inner = inner
+        self.count = lru_cache(maxsize=maxsize)(inner.count)
+
+
+_default_tokenizer: CachedTokenizer | None = None
+
+
+def get_default_tokenizer() -> CachedTokenizer:
+    global _default_tokenizer
+    if _default_tokenizer is None:
+        inner: Tokenizer = TiktokenTokenizer() if importlib.util.find_spec("tiktoken") else ApproxTokenizer()
+        _default_tokenizer = CachedTokenizer(inner)
+    return _default_tokenizer
+
+
+@lru_cache(maxsize=8)
+def load_tier_token_budgets(policy_path: Path = BUDGET_POLICY_PATH) -> dict[str, int]:
+    """Per-tier `max_tokens` from budget.yaml."""
+    raw = yaml.safe_load(policy_path.read_text(encoding="utf-8")) or {}
+    return {
+        str(tier): int(tier_cfg["max_tokens"])
+        for tier, tier_cfg in (raw.get("tiers") or {}).items()
+        if tier_cfg and "max_tokens" in tier_cfg
+    }
+
 
 @dataclass
 class ContextPackage:
@@ -19,37 +91,71 @@ def build_context_package(
     semantic_snippets: list[SemanticSnippet],
     max_chars: int = 2500,
     prefer_semantic: bool = False,
+    *,
+    tier: str | None = None,
+    max_tokens: int | None = None,
+    tokenizer: Tokenizer | None = None,
+    policy_path: Path = BUDGET_POLICY_PATH,
 ) -> ContextPackage:
-    """Return context trimmed to a rough character budget.
+    """Return context trimmed to a budget.
+
+    Without `tier`/`max_tokens` the budget is `max_chars` characters. With
+    `tier`, the budget is that tier's `max_tokens` from budget.yaml (an explicit
+    `max_tokens` wins), counted with `tokenizer` (default: tiktoken if
+    installed, else ~4 chars per token).
 
     Default prioritization keeps more recent turns first, then trims semantic snippets.
     Set `prefer_semantic=True` to trim turns more aggressively before removing snippets.
     """
-    packaged_turns = working_turns
-    packaged_summary = summary
-    packaged_snippets = semantic_snippets
+    if max_tokens is None and tier is not None:
+        max_tokens = load_tier_token_budgets(policy_path).get(tier)
+    if max_tokens is None:
+        budget, counter = max_chars, tokenizer or CharTokenizer()
+    else:
+        budget, counter = max_tokens, tokenizer or get_default_tokenizer()
+
+    # Prefix sums: oldest turns are dropped from the front, lowest-ranked snippets from the back.
+    turn_prefix = [0, *accumulate(counter.count(t.role) + counter.count(t.content) for t in working_turns)]
+    snippet_prefix = [0, *accumulate(counter.count(s.text) for s in semantic_snippets)]
+    summary_size = counter.count(summary)
+    turns_total = turn_prefix[-1]
 
-    def _size() -> int:
-        turns_size = sum(len(t.content) + len(t.role) for t in packaged_turns)
-        snippets_size = sum(len(s.text) for s in packaged_snippets)
-        return turns_size + len(packaged_summary) + snippets_size
+    def _drop_oldest_turns(rest: int) -> int:
+        # smallest start with turns_total - turn_prefix[start] + rest <= budget
+        return min(bisect_left(turn_prefix, turns_total + rest - budget), len(working_turns))
+
+    def _keep_snippets(rest: int) -> int:
+        # largest count with snippet_prefix[count] + rest <= budget
+        return max(bisect_right(snippet_prefix, budget - rest) - 1, 0)
 
     if prefer_semantic:
-        while packaged_turns and _size() > max_chars:
-            packaged_turns = packaged_turns[1:]
-        while packaged_snippets and _size() > max_chars:
-            packaged_snippets = packaged_snippets[:-1]
+        turn_start = _drop_oldest_turns(summary_size + snippet_prefix[-1])
+        snippet_count = _keep_snippets(summary_size + turns_total - turn_prefix[turn_start])
     else:
-        while packaged_snippets and _size() > max_chars:
-            packaged_snippets = packaged_snippets[:-1]
-        while packaged_turns and _size() > max_chars:
-            packaged_turns = packaged_turns[1:]
+        snippet_count = _keep_snippets(summary_size + turns_total)
+        turn_start = _drop_oldest_turns(summary_size + snippet_prefix[snippet_count])
 
-    if _size() > max_chars:
-        packaged_summary = packaged_summary[: max(0, max_chars // 3)]
+    packaged_summary = summary
+    size = turns_total - turn_prefix[turn_start] + summary_size + snippet_prefix[snippet_count]
+    if size > budget:
+        packaged_summary = _truncate(summary, max(0, budget // 3), counter)
 
     return ContextPackage(
-        working_turns=packaged_turns,
+        working_turns=working_turns[turn_start:],
         summary=packaged_summary,
-        semantic_snippets=packaged_snippets,
+        semantic_snippets=semantic_snippets[:snippet_count],
     )
+
+
+def _truncate(text: str, limit: int, counter: Tokenizer) -> str:
+    """Longest prefix of `text` whose count is <= `limit` (binary search over the cut point)."""
+    if counter.count(text) <= limit:
+        return text
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if counter.count(text[:mid]) <= limit:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low]
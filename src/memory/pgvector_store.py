@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Iterable
+
+import psycopg
+from psycopg import sql
+
+from src.memory.semantic import SemanticSnippet
+from src.routing.embedding import Embedder, HashingNgramEmbedder
+
+
+def psycopg_conninfo(db_url: str) -> str:
+    """Accept SQLAlchemy-style URLs (`postgresql+psycopg://`) as used in SUPABASE_DB_URL."""
+    scheme, sep, rest = db_url.partition("://")
+    if sep and "+" in scheme:
+        return f"{scheme.split('+', 1)[0]}://{rest}"
+    return db_url
+
+
+def vector_literal(vector: Iterable[float]) -> str:
+    """pgvector text representation, usable in COPY rows and `%s::vector` parameters."""
+    return "[" + ",".join(f"{float(value):.7g}" for value in vector) + "]"
+
+
+class PgVectorStore:
+    """Semantic memory in Postgres/pgvector with an HNSW cosine index.
+
+    Bulk upserts stream rows via `COPY` into a temporary staging table and merge
+    them with one `INSERT ... ON CONFLICT`. Embeddings are computed locally, so
+    the column dimension follows `embedder.dim`.
+    """
+
+    def __init__(
+        self,
+        db_url: str,
+        embedder: Embedder | None = None,
+        table: str = "semantic_memory",
+        hnsw_m: int = 16,
+        hnsw_ef_construction: int = 64,
+        hnsw_ef_search: int = 40,
+        connect: Callable[[], psycopg.Connection[Any]] | None = None,
+    ) -> None:
+        self.embedder = embedder or HashingNgramEmbedder()
+        self.table = table
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construction = hnsw_ef_construction
+        self.hnsw_ef_search = hnsw_ef_search
+        conninfo = psycopg_conninfo(db_url)
+        self._connect = connect or (lambda: psycopg.connect(conninfo, autocommit=True))
+        self._conn: psycopg.Connection[Any] | None = None
+        self._schema_ready = False
+        self._lock = threading.Lock()
+
+    def _connection(self) -> psycopg.Connection[Any]:
+        if self._conn is None or self._conn.closed:
+            self._conn = self._connect()
+            self._schema_ready = False
+        if not self._schema_ready:
+            self._ensure_schema(self._conn)
+            self._schema_ready = True
+        return self._conn
+
+    def _ensure_schema(self, conn: psycopg.Connection[Any]) -> None:
+        table = sql.Identifier(self.table)
+        with conn.transaction():
+            conn.execute("CREATE EXTENSION IF NOT EXISTS vector")
+            conn.execute(
+                sql.SQL(
+                    "CREATE TABLE IF NOT EXISTS {} ("
+                    "snippet_id text PRIMARY KEY, text text NOT NULL, embedding vector({}) NOT NULL)"
+                ).format(table, sql.Literal(self.embedder.dim))
+            )
+            conn.execute(
+                sql.SQL(
+                    "CREATE INDEX IF NOT EXISTS {} ON {} USING hnsw (embedding vector_cosine_ops) "
+                    "WITH (m = {}, ef_construction = {})"
+                ).format(
+                    sql.Identifier(f"{self.table}_embedding_hnsw"),
+                    table,
+                    sql.Literal(self.hnsw_m),
+                    sql.Literal(self.hnsw_ef_construction),
+                )
+            )
+
+    def upsert(self, snippet_id: str, text: str) -> None:
+        self.upsert_many([(snippet_id, text)])
+
+    def upsert_many(self, snippets: Iterable[tuple[str, str]]) -> None:
+        batch = dict(snippets)
+        if not batch:
+            return
+        vectors = self.embedder.embed(list(batch.values()))
+        table = sql.Identifier(self.table)
+        with self._lock:
+            conn = self._connection()
+            with conn.transaction(), conn.cursor() as cur:
+                cur.execute(
+                    sql.SQL("CREATE TEMP TABLE IF NOT EXISTS semantic_memory_staging (LIKE {}) ON COMMIT DELETE ROWS").format(table)
+                )
+                with cur.copy("COPY semantic_memory_staging (snippet_id, text, embedding) FROM STDIN") as copy:
+                    for (snippet_id, text), vector in zip(batch.items(), vectors):
+                        copy.write_row((snippet_id, text, vector_literal(vector)))
+                cur.execute(
+                    sql.SQL(
+                        "INSERT INTO {} (snippet_id, text, embedding) "
+                        "SELECT snippet_id, text, embedding FROM semantic_memory_staging "
+                        "ON CONFLICT (snippet_id) DO UPDATE SET text = EXCLUDED.text, embedding = EXCLUDED.embedding"
+                    ).format(table)
+                )
+
+    def delete(self, snippet_id: str) -> bool:
+        with self._lock:
+            conn = self._connection()
+            with conn.transaction():
+                cur = conn.execute(
+                    sql.SQL("DELETE FROM {} WHERE snippet_id = %s").format(sql.Identifier(self.table)),
+                    (snippet_id,),
+                )
+                return cur.rowcount > 0
+
+    def search(self, query: str, top_k: int = 3) -> list[SemanticSnippet]:
+        if not query.strip() or top_k <= 0:
+            return []
+        query_vector = vector_literal(self.embedder.embed([query])[0])
+        with self._lock:
+            conn = self._connection()
+            with conn.transaction():
+                conn.execute(sql.SQL("SET LOCAL hnsw.ef_search = {}").format(sql.Literal(self.hnsw_ef_search)))
+                rows = conn.execute(
+                    sql.SQL(
+                        "SELECT snippet_id, text, 1 - (embedding <=> %s::vector) AS score FROM {} "
+                        "ORDER BY embedding <=> %s::vector LIMIT %s"
+                    ).format(sql.Identifier(self.table)),
+                    (query_vector, query_vector, top_k),
+                ).fetchall()
+        return [
+            SemanticSnippet(snippet_id=str(snippet_id), text=str(text), score=float(score))
+            for snippet_id, text, score in rows
+            if float(score) > 0.0
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+
+from src.memory.working import Turn
+
+DEFAULT_KEY_PREFIX = "nexus:wm:"
+
+
+def encode_turn(turn: Turn) -> bytes:
+    return orjson.dumps([turn.role, turn.content])
+
+
+def decode_turn(raw: bytes | str) -> Turn:
+    role, content = orjson.loads(raw)
+    return Turn(role=role, content=content)
+
+
+class RedisWorkingMemoryStore:
+    """Redis-backed working memory shared by all workers.
+
+    Each session is a capped list, newest turn first: LPUSH + LTRIM + EXPIRE
+    go out in one pipeline round trip, so a session never exceeds
+    `max_turns` and expires `ttl_seconds` after its last write.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        max_turns: int = 12,
+        ttl_seconds: int = 86_400,
+        key_prefix: str = DEFAULT_KEY_PREFIX,
+    ) -> None:
+        self.client = client
+        self.max_turns = max_turns
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+
+    @classmethod
+    def from_url(cls, redis_url: str, **kwargs: Any) -> RedisWorkingMemoryStore:
+        import redis
+
+        return cls(redis.Redis.from_url(redis_url), **kwargs)
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.key_prefix}{session_id}"
+
+    def append(self, session_id: str, role: str, content: str) -> None:
+        key = self._key(session_id)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.lpush(key, encode_turn(Turn(role=role, content=content)))
+        pipe.ltrim(key, 0, self.max_turns - 1)
+        pipe.expire(key, self.ttl_seconds)
+        pipe.execute()
+
+    def get(self, session_id: str) -> list[Turn]:
+        raw_turns = self.client.lrange(self._key(session_id), 0, self.max_turns - 1)
+        return [decode_turn(raw) for raw in reversed(raw_turns)]
+
+    def get_many(self, session_ids: list[str]) -> dict[str, list[Turn]]:
+        """Fetch several sessions in one pipelined round trip."""
+        pipe = self.client.pipeline(transaction=False)
+        for session_id in session_ids:
+            pipe.lrange(self._key(session_id), 0, self.max_turns - 1)
+        rows = pipe.execute()
+        return {
+            session_id: [decode_turn(raw) for raw in reversed(raw_turns)]
+            for session_id, raw_turns in zip(session_ids, rows)
+        }
+
+    def clear(self, session_id: str) -> None:
+        self.client.delete(self._key(session_id))
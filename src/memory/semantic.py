@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import heapq
 import re
+from collections import defaultdict
 from dataclasses import dataclass
+from typing import Iterable
 
 TOKEN_PATTERN = re.compile(r"\w+", flags=re.UNICODE)
 
@@ -13,32 +16,84 @@ class SemanticSnippet:
     score: float
 
 
+@dataclass(frozen=True)
+class _IndexedSnippet:
+    text: str
+    tokens: frozenset[str]
+    order: int
+
+
 class SemanticMemoryIndex:
-    """Very small lexical similarity index as pgvector placeholder."""
+    """Very small lexical similarity index as pgvector placeholder.
+
+    Snippets are tokenized once on upsert and kept in a token -> snippet_id
+    postings index, so a search only scores snippets sharing a token with the
+    query. Scores are Jaccard similarities; ties keep insertion order.
+    """
 
     def __init__(self) -> None:
-        self._snippets: dict[str, str] = {}
+        self._snippets: dict[str, _IndexedSnippet] = {}
+        self._postings: dict[str, set[str]] = defaultdict(set)
+        self._next_order = 0
+
+    def __len__(self) -> int:
+        return len(self._snippets)
 
     def upsert(self, snippet_id: str, text: str) -> None:
-        self._snippets[snippet_id] = text
+        previous = self._snippets.get(snippet_id)
+        if previous is not None:
+            self._unindex(snippet_id, previous.tokens)
+            order = previous.order
+        else:
+            order = self._next_order
+            self._next_order += 1
+
+        tokens = frozenset(self._tokens(text))
+        self._snippets[snippet_id] = _IndexedSnippet(text=text, tokens=tokens, order=order)
+        for token in tokens:
+            self._postings[token].add(snippet_id)
+
+    def upsert_many(self, snippets: Iterable[tuple[str, str]]) -> None:
+        for snippet_id, text in snippets:
+            self.upsert(snippet_id, text)
+
+    def delete(self, snippet_id: str) -> bool:
+        previous = self._snippets.pop(snippet_id, None)
+        if previous is None:
+            return False
+        self._unindex(snippet_id, previous.tokens)
+        return True
 
     def search(self, query: str, top_k: int = 3) -> list[SemanticSnippet]:
         query_tokens = self._tokens(query)
-        if not query_tokens:
+        if not query_tokens or top_k <= 0:
             return []
 
-        results: list[SemanticSnippet] = []
-        for snippet_id, text in self._snippets.items():
-            snippet_tokens = self._tokens(text)
-            if not snippet_tokens:
-                continue
-            overlap = len(query_tokens & snippet_tokens)
-            if overlap <= 0:
-                continue
-            score = overlap / len(query_tokens | snippet_tokens)
-            results.append(SemanticSnippet(snippet_id=snippet_id, text=text, score=score))
+        overlaps: dict[str, int] = defaultdict(int)
+        for token in query_tokens:
+            for snippet_id in self._postings.get(token, ()):
+                overlaps[snippet_id] += 1
 
-        return sorted(results, key=lambda item: item.score, reverse=True)[:top_k]
+        scored: list[tuple[float, int, str]] = []
+        for snippet_id, overlap in overlaps.items():
+            snippet = self._snippets[snippet_id]
+            # |A ∪ B| = |A| + |B| - |A ∩ B|
+            score = overlap / (len(query_tokens) + len(snippet.tokens) - overlap)
+            scored.append((score, -snippet.order, snippet_id))
+
+        return [
+            SemanticSnippet(snippet_id=snippet_id, text=self._snippets[snippet_id].text, score=score)
+            for score, _, snippet_id in heapq.nlargest(top_k, scored)
+        ]
+
+    def _unindex(self, snippet_id: str, tokens: frozenset[str]) -> None:
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.discard(snippet_id)
+            if not postings:
+                del self._postings[token]
 
     def _tokens(self, text: str) -> set[str]:
         return {token.lower() for token in TOKEN_PATTERN.findall(text)}
@@ -1,20 +1,170 @@
 from __future__ import annotations
 
-from src.memory.working import Turn
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from src.agent.llm_client import LiteLLMClient
+    from src.memory.working import Turn
+
+SEPARATOR = " | "
+
+# (previous digest, lines that dropped out of the window) -> new digest
+OverflowSummarizer = Callable[[str, list[str]], str]
+
+
+def _turn_line(turn: Turn) -> str:
+    content = " ".join(turn.content.split())
+    return f"{turn.role}: {content}"
+
+
+def _truncate(summary: str, max_chars: int) -> str:
+    if len(summary) <= max_chars:
+        return summary
+    return summary[: max_chars - 3].rstrip() + "..."
 
 
 def summarize_turns(turns: list[Turn], max_chars: int = 400) -> str:
     """Build a compact rolling summary from recent turns."""
     if not turns:
         return ""
+    return _truncate(SEPARATOR.join(_turn_line(turn) for turn in turns), max_chars)
 
-    lines: list[str] = []
-    for turn in turns:
-        content = " ".join(turn.content.split())
-        lines.append(f"{turn.role}: {content}")
 
-    summary = " | ".join(lines)
-    if len(summary) <= max_chars:
-        return summary
+_background_executor: ThreadPoolExecutor | None = None
+_background_lock = threading.Lock()
 
-    return summary[: max_chars - 3].rstrip() + "..."
+
+def _get_background_executor() -> ThreadPoolExecutor:
+    global _background_executor
+    with _background_lock:
+        if _background_executor is None:
+            _background_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="summary")
+        return _background_executor
+
+
+def llm_overflow_summarizer(client: LiteLLMClient, model: str = "tier_1", max_tokens: int = 200) -> OverflowSummarizer:
+    """Condense overflowing turns with a cheap model; keeps the old digest if the call fails."""
+
+    def _summarize(digest: str, lines: list[str]) -> str:
+        prompt = (
+            "Fasse den bisherigen Gesprächsverlauf in wenigen Sätzen zusammen.\n"
+            f"Bisherige Zusammenfassung: {digest or '-'}\n"
+            "Neue Nachrichten:\n" + "\n".join(lines)
+        )
+        try:
+            return " ".join(client.complete(model=model, prompt=prompt, max_tokens=max_tokens).split())
+        except Exception:
+            return digest
+
+    return _summarize
+
+
+class RollingSummarizer:
+    """Incremental per-session summary.
+
+    New turns are folded into a bounded window of the last `window_turns` lines;
+    the summary string is cached and only rebuilt when the window changes.
+    Lines that fall out of the window are handed to `overflow_summarizer` (if
+    set) in the background; its digest is prepended once available, truncated to
+    the room the newest window lines leave. Without it the summary simply rolls.
+    """
+
+    def __init__(
+        self,
+        window_turns: int = 12,
+        max_chars: int = 400,
+        overflow_summarizer: OverflowSummarizer | None = None,
+        executor: Executor | None = None,
+    ) -> None:
+        self.max_chars = max_chars
+        self.overflow_summarizer = overflow_summarizer
+        self._executor = executor
+        self._lines: deque[str] = deque(maxlen=window_turns)
+        self._digest = ""
+        self._pending: list[str] = []
+        self._in_flight: Future[str] | None = None
+        self._cached: str | None = ""  # None = rebuild from digest + window on next read
+        # re-entrant: a job that completes immediately runs its callback inside _submit_pending
+        self._lock = threading.RLock()
+
+    @property
+    def digest(self) -> str:
+        return self._digest
+
+    def add(self, turn: Turn) -> None:
+        line = _turn_line(turn)
+        with self._lock:
+            if len(self._lines) == self._lines.maxlen:
+                evicted = self._lines[0]
+                self._lines.append(line)
+                self._cached = None
+                if self.overflow_summarizer is not None:
+                    self._pending.append(evicted)
+                    self._submit_pending()
+                return
+            self._lines.append(line)
+            if self._digest:
+                self._cached = None
+            elif self._cached is not None:
+                # common case: append to the cached string instead of re-joining the window
+                self._cached = f"{self._cached}{SEPARATOR}{line}" if self._cached else line
+
+    def extend(self, turns: list[Turn]) -> None:
+        for turn in turns:
+            self.add(turn)
+
+    def summary(self) -> str:
+        with self._lock:
+            if self._cached is None:
+                self._cached = self._compose() if self._digest else SEPARATOR.join(self._lines)
+            return _truncate(self._cached, self.max_chars)
+
+    def _compose(self) -> str:
+        # Recent lines get the budget first (newest kept); the digest only fills what is left.
+        kept: list[str] = []
+        used = 0
+        for line in reversed(self._lines):
+            cost = len(line) + (len(SEPARATOR) if kept else 0)
+            if used + cost > self.max_chars:
+                if not kept:
+                    return _truncate(line, self.max_chars)
+                break
+            kept.append(line)
+            used += cost
+        kept.reverse()
+        room = self.max_chars - used - (len(SEPARATOR) if kept else 0)
+        if room > 3:
+            kept.insert(0, _truncate(self._digest, room))
+        return SEPARATOR.join(kept)
+
+    def wait(self, timeout: float | None = None) -> None:
+        """Block until background summarization has caught up (tests, shutdown)."""
+        while True:
+            with self._lock:
+                future = self._in_flight
+            if future is None:
+                return
+            future.result(timeout=timeout)
+
+    def _submit_pending(self) -> None:
+        # Called with the lock held; at most one job per session so digests are folded in order.
+        if self._in_flight is not None or not self._pending:
+            return
+        assert self.overflow_summarizer is not None
+        lines, self._pending = self._pending, []
+        executor = self._executor or _get_background_executor()
+        self._in_flight = executor.submit(self.overflow_summarizer, self._digest, lines)
+        self._in_flight.add_done_callback(self._on_digest)
+
+    def _on_digest(self, future: Future[str]) -> None:
+        with self._lock:
+            try:
+                self._digest = future.result() or self._digest
+            except Exception:  # noqa: BLE001 - keep the previous digest
+                pass
+            self._cached = None
+            self._in_flight = None
+            self._submit_pending()
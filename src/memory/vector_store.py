@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import threading
+from typing import Iterable, Protocol
+
+import numpy as np
+
+from src.memory.semantic import SemanticSnippet
+from src.routing.embedding import Embedder, HashingNgramEmbedder
+
+
+class VectorStore(Protocol):
+    """Semantic memory backend; `SemanticMemoryIndex` is the lexical implementation."""
+
+    def upsert(self, snippet_id: str, text: str) -> None: ...
+
+    def upsert_many(self, snippets: Iterable[tuple[str, str]]) -> None: ...
+
+    def delete(self, snippet_id: str) -> bool: ...
+
+    def search(self, query: str, top_k: int = 3) -> list[SemanticSnippet]: ...
+
+
+class NumpyVectorStore:
+    """In-process cosine search over a contiguous float32 matrix.
+
+    With `ivf_lists > 0` an IVF-style coarse quantizer (k-means centroids) is
+    trained once the store holds `ivf_min_rows` snippets and retrained whenever
+    it has doubled since; a search then only scores rows of the `ivf_probes`
+    closest lists. Below that size, or with `ivf_lists=0`, search is exact.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder | None = None,
+        ivf_lists: int = 0,
+        ivf_probes: int = 4,
+        ivf_min_rows: int = 10_000,
+        initial_capacity: int = 1024,
+    ) -> None:
+        self.embedder = embedder or HashingNgramEmbedder()
+        self.ivf_lists = ivf_lists
+        self.ivf_probes = ivf_probes
+        self.ivf_min_rows = max(ivf_min_rows, ivf_lists)
+        self._matrix = np.zeros((max(1, initial_capacity), self.embedder.dim), dtype=np.float32)
+        self._ids: list[str] = []
+        self._texts: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._centroids: np.ndarray | None = None
+        self._assignments = np.zeros(self._matrix.shape[0], dtype=np.int32)
+        # inverted lists: row indices per centroid, and each row's position in its list (-1 = unlisted)
+        self._lists: list[list[int]] = []
+        self._slots = np.full(self._matrix.shape[0], -1, dtype=np.int64)
+        self._trained_rows = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def upsert(self, snippet_id: str, text: str) -> None:
+        self.upsert_many([(snippet_id, text)])
+
+    def upsert_many(self, snippets: Iterable[tuple[str, str]]) -> None:
+        # last write wins within one batch, like repeated upserts
+        batch = dict(snippets)
+        if not batch:
+            return
+        vectors = self.embedder.embed(list(batch.values()))
+        with self._lock:
+            for (snippet_id, text), vector in zip(batch.items(), vectors):
+                row = self._rows.get(snippet_id)
+                if row is None:
+                    row = len(self._ids)
+                    self._ensure_capacity(row + 1)
+                    self._rows[snippet_id] = row
+                    self._ids.append(snippet_id)
+                    self._texts.append(text)
+                else:
+                    self._texts[row] = text
+                self._matrix[row] = vector
+            if self._centroids is not None:
+                start = min(self._rows[snippet_id] for snippet_id in batch)
+                self._assign(start, len(self._ids))
+
+    def delete(self, snippet_id: str) -> bool:
+        with self._lock:
+            row = self._rows.pop(snippet_id, None)
+            if row is None:
+                return False
+            last = len(self._ids) - 1
+            self._unlist(row)
+            if row != last:
+                # swap-remove keeps the live rows contiguous
+                self._matrix[row] = self._matrix[last]
+                self._assignments[row] = self._assignments[last]
+                self._slots[row] = self._slots[last]
+                self._slots[last] = -1
+                if self._slots[row] >= 0:
+                    self._lists[self._assignments[row]][self._slots[row]] = row
+                self._ids[row] = self._ids[last]
+                self._texts[row] = self._texts[last]
+                self._rows[self._ids[row]] = row
+            self._ids.pop()
+            self._texts.pop()
+            return True
+
+    def search(self, query: str, top_k: int = 3) -> list[SemanticSnippet]:
+        return self.search_many([query], top_k=top_k)[0]
+
+    def search_many(self, queries: list[str], top_k: int = 3) -> list[list[SemanticSnippet]]:
+        """Embed all queries in one call and score them in one matrix product (exact mode)."""
+        results: list[list[SemanticSnippet]] = [[] for _ in queries]
+        positions = [i for i, query in enumerate(queries) if query.strip()]
+        if not positions or top_k <= 0:
+            return results
+        query_vectors = self.embedder.embed([queries[i] for i in positions])
+
+        with self._lock:
+            count = len(self._ids)
+            if count == 0:
+                return results
+            self._maybe_train(count)
+            if self._centroids is None:
+                scores = query_vectors @ self._matrix[:count].T
+                for row, position in enumerate(positions):
+                    results[position] = self._top_k(scores[row], np.arange(count), top_k)
+            else:
+                for row, position in enumerate(positions):
+                    candidates = self._probe(query_vectors[row])
+                    scores = self._matrix[candidates] @ query_vectors[row]
+                    results[position] = self._top_k(scores, candidates, top_k)
+        return results
+
+    def _top_k(self, scores: np.ndarray, rows: np.ndarray, top_k: int) -> list[SemanticSnippet]:
+        if scores.shape[0] == 0:
+            return []
+        k = min(top_k, scores.shape[0])
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [
+            SemanticSnippet(snippet_id=self._ids[int(rows[i])], text=self._texts[int(rows[i])], score=float(scores[i]))
+            for i in best
+            if scores[i] > 0.0
+        ]
+
+    def _ensure_capacity(self, rows: int) -> None:
+        capacity = self._matrix.shape[0]
+        if rows <= capacity:
+            return
+        while capacity < rows:
+            capacity *= 2
+        grown = np.zeros((capacity, self._matrix.shape[1]), dtype=np.float32)
+        grown[: len(self._ids)] = self._matrix[: len(self._ids)]
+        self._matrix = grown
+        assignments = np.zeros(capacity, dtype=np.int32)
+        assignments[: len(self._ids)] = self._assignments[: len(self._ids)]
+        self._assignments = assignments
+        slots = np.full(capacity, -1, dtype=np.int64)
+        slots[: len(self._ids)] = self._slots[: len(self._ids)]
+        self._slots = slots
+
+    def _maybe_train(self, count: int) -> None:
+        if self.ivf_lists <= 0 or count < self.ivf_min_rows:
+            if self._centroids is not None:
+                self._centroids = None
+                self._lists = []
+                self._slots[:] = -1
+            return
+        if self._centroids is not None and count < 2 * self._trained_rows:
+            return
+        self._centroids = _kmeans(self._matrix[:count], self.ivf_lists)
+        self._trained_rows = count
+        self._lists = [[] for _ in range(self._centroids.shape[0])]
+        self._slots[:] = -1
+        self._assign(0, count)
+
+    def _assign(self, start: int, stop: int) -> None:
+        assert self._centroids is not None
+        block = self._matrix[start:stop]
+        for row in range(start, stop):
+            self._unlist(row)
+        self._assignments[start:stop] = np.argmax(block @ self._centroids.T, axis=1)
+        for row in range(start, stop):
+            members = self._lists[self._assignments[row]]
+            self._slots[row] = len(members)
+            members.append(row)
+
+    def _unlist(self, row: int) -> None:
+        slot = int(self._slots[row])
+        if slot < 0:
+            return
+        members = self._lists[self._assignments[row]]
+        moved = members.pop()
+        if moved != row:
+            members[slot] = moved
+            self._slots[moved] = slot
+        self._slots[row] = -1
+
+    def _probe(self, query_vector: np.ndarray) -> np.ndarray:
+        assert self._centroids is not None
+        probes = min(self.ivf_probes, self._centroids.shape[0])
+        closest = np.argpartition(-(self._centroids @ query_vector), probes - 1)[:probes]
+        # only the probed lists are touched; sorted so ties rank like the exact scan
+        candidates = np.fromiter((row for centroid in closest for row in self._lists[centroid]), dtype=np.int64)
+        candidates.sort()
+        return candidates
+
+
+def _kmeans(matrix: np.ndarray, lists: int, iterations: int = 8, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on L2-normalized rows; deterministic for a given matrix."""
+    rng = np.random.default_rng(seed)
+    lists = min(lists, matrix.shape[0])
+    centroids = matrix[rng.choice(matrix.shape[0], size=lists, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = np.argmax(matrix @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, matrix)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        filled = norms[:, 0] > 0
+        # empty lists keep their previous centroid
+        centroids[filled] = sums[filled] / norms[filled]
+    return centroids
@@ -1,27 +1,147 @@
 from __future__ import annotations
 
-from collections import defaultdict, deque
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
 from dataclasses import dataclass
+from typing import Callable
 
+from src.memory.summary import OverflowSummarizer, RollingSummarizer
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class Turn:
     role: str
     content: str
 
 
+class _Session:
+    __slots__ = ("turns", "last_access", "summarizer")
+
+    def __init__(self, max_turns: int, now: float, summarizer: RollingSummarizer) -> None:
+        self.turns: deque[Turn] = deque(maxlen=max_turns)
+        self.last_access = now
+        self.summarizer = summarizer
+
+
+@dataclass
+class WorkingMemoryStats:
+    sessions: int
+    turns: int
+    approx_bytes: int
+    evicted_lru: int
+    expired_idle: int
+
+
 class WorkingMemoryStore:
-    """In-memory working memory abstraction (Redis replacement for local/dev tests)."""
+    """In-memory working memory abstraction (Redis replacement for local/dev tests).
+
+    Sessions are kept in LRU order and bounded by `max_sessions`; sessions idle
+    for longer than `idle_ttl_seconds` expire. Reads of unknown sessions do not
+    allocate anything. Each session carries a `RollingSummarizer` that folds in
+    turns as they are appended; turns leaving the `max_turns` window go to
+    `overflow_summarizer` (e.g. `llm_overflow_summarizer`) in the background.
+    """
 
-    def __init__(self, max_turns: int = 12) -> None:
+    def __init__(
+        self,
+        max_turns: int = 12,
+        max_sessions: int = 100_000,
+        idle_ttl_seconds: float | None = 86_400.0,
+        clock: Callable[[], float] = time.monotonic,
+        summary_max_chars: int = 400,
+        overflow_summarizer: OverflowSummarizer | None = None,
+    ) -> None:
         self.max_turns = max_turns
-        self._store: dict[str, deque[Turn]] = defaultdict(lambda: deque(maxlen=self.max_turns))
+        self.summary_max_chars = summary_max_chars
+        self.overflow_summarizer = overflow_summarizer
+        self.max_sessions = max_sessions
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._clock = clock
+        self._store: OrderedDict[str, _Session] = OrderedDict()
+        self._lock = threading.Lock()
+        self._evicted_lru = 0
+        self._expired_idle = 0
 
     def append(self, session_id: str, role: str, content: str) -> None:
-        self._store[session_id].append(Turn(role=role, content=content))
+        with self._lock:
+            now = self._clock()
+            self._expire_idle(now)
+            session = self._store.get(session_id)
+            if session is None:
+                summarizer = RollingSummarizer(self.max_turns, self.summary_max_chars, self.overflow_summarizer)
+                session = self._store[session_id] = _Session(self.max_turns, now, summarizer)
+                while len(self._store) > self.max_sessions:
+                    self._store.popitem(last=False)
+                    self._evicted_lru += 1
+            else:
+                self._store.move_to_end(session_id)
+                session.last_access = now
+            turn = Turn(role=role, content=content)
+            session.turns.append(turn)
+            # under the store lock so the summary sees turns in the same order as `turns`
+            session.summarizer.add(turn)
 
     def get(self, session_id: str) -> list[Turn]:
-        return list(self._store[session_id])
+        with self._lock:
+            now = self._clock()
+            self._expire_idle(now)
+            session = self._store.get(session_id)
+            if session is None:
+                return []
+            self._store.move_to_end(session_id)
+            session.last_access = now
+            return list(session.turns)
+
+    def summary(self, session_id: str) -> str:
+        """Cached rolling summary of the session; "" for unknown sessions."""
+        with self._lock:
+            session = self._store.get(session_id)
+        return session.summarizer.summary() if session is not None else ""
+
+    def summarizer(self, session_id: str) -> RollingSummarizer | None:
+        with self._lock:
+            session = self._store.get(session_id)
+        return session.summarizer if session is not None else None
+
+    def get_many(self, session_ids: list[str]) -> dict[str, list[Turn]]:
+        return {session_id: self.get(session_id) for session_id in session_ids}
 
     def clear(self, session_id: str) -> None:
-        self._store.pop(session_id, None)
+        with self._lock:
+            self._store.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def stats(self) -> WorkingMemoryStats:
+        """Session/turn counts plus a rough byte estimate (O(sessions), meant for metrics)."""
+        with self._lock:
+            self._expire_idle(self._clock())
+            turns = 0
+            approx_bytes = sys.getsizeof(self._store)
+            for session_id, session in self._store.items():
+                turns += len(session.turns)
+                approx_bytes += sys.getsizeof(session_id) + sys.getsizeof(session) + sys.getsizeof(session.turns)
+                for turn in session.turns:
+                    approx_bytes += sys.getsizeof(turn) + sys.getsizeof(turn.content)
+            return WorkingMemoryStats(
+                sessions=len(self._store),
+                turns=turns,
+                approx_bytes=approx_bytes,
+                evicted_lru=self._evicted_lru,
+                expired_idle=self._expired_idle,
+            )
+
+    def _expire_idle(self, now: float) -> None:
+        # LRU order == last-access order, so expired sessions are all at the front.
+        if self.idle_ttl_seconds is None:
+            return
+        cutoff = now - self.idle_ttl_seconds
+        while self._store:
+            oldest = next(iter(self._store.values()))
+            if oldest.last_access > cutoff:
+                break
+            self._store.popitem(last=False)
+            self._expired_idle += 1
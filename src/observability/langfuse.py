@@ -28,6 +28,7 @@ class DecisionLog:
     token_in: int
     token_out: int
     created_at: str
+    time_to_first_token_ms: int | None = None
 
 
 class InMemoryLangfuseClient:
@@ -60,6 +61,9 @@ class InMemoryLangfuseClient:
             token_in=int(payload.get("token_in", 0)),
             token_out=int(payload.get("token_out", 0)),
             created_at=str(payload.get("created_at", datetime.now(tz=timezone.utc).isoformat())),
+            time_to_first_token_ms=(
+                int(payload["time_to_first_token_ms"]) if payload.get("time_to_first_token_ms") is not None else None
+            ),
         )
         self._logs.append(log)
         return log
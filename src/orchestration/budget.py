@@ -5,6 +5,16 @@ from pathlib import Path
 
 import yaml
 
+from src.orchestration.spend_ledger import InMemorySpendBackend, SpendLedger, SpendReservation
+
+
+BUDGET_POLICY_PATH = Path("configs/policies/budget.yaml")
+
+
+def load_daily_cap(policy_path: Path = BUDGET_POLICY_PATH) -> float:
+    raw = yaml.safe_load(policy_path.read_text(encoding="utf-8")) or {}
+    return float(raw.get("daily_cap_usd", 2.0))
+
 
 @dataclass
 class BudgetSelection:
@@ -13,11 +23,27 @@ class BudgetSelection:
 
 
 class BudgetAgent:
-    def __init__(self, policy_path: Path = Path("configs/policies/budget.yaml")) -> None:
+    """Model selection per tier and the tenant's daily spend against `daily_cap_usd`.
+
+    Spend lives in a `SpendLedger` (per tenant, model and UTC day); without one
+    an in-memory ledger is used, which only sees this process. Spend methods
+    take the tenant per call and fall back to `tenant_id` when it is omitted.
+    """
+
+    def __init__(
+        self,
+        policy_path: Path = BUDGET_POLICY_PATH,
+        ledger: SpendLedger | None = None,
+        tenant_id: str = "default",
+    ) -> None:
         raw = yaml.safe_load(policy_path.read_text(encoding="utf-8")) or {}
         self.tiers = raw.get("tiers", {})
         self.daily_cap = float(raw.get("daily_cap_usd", 2.0))
-        self._daily_spend = 0.0
+        self.ledger = ledger or SpendLedger(InMemorySpendBackend(), daily_cap_usd=self.daily_cap)
+        self.tenant_id = tenant_id
+        self._tier_by_model = {
+            str(model): tier_name for tier_name, tier_cfg in self.tiers.items() for model in (tier_cfg or {}).get("models", [])
+        }
 
     def select_model(self, task_tier: str, task_description: str = "") -> BudgetSelection:
         _ = task_description
@@ -25,16 +51,45 @@ class BudgetAgent:
         models = tier_cfg.get("models", ["openai/gpt-4.1-mini"])
         return BudgetSelection(model_name=models[0], max_tokens=int(tier_cfg.get("max_tokens", 800)))
 
-    def track_usage(self, model: str, tokens_in: int, tokens_out: int, cost: float) -> None:
-        _ = (model, tokens_in, tokens_out)
-        self._daily_spend += max(0.0, float(cost))
+    def cost_for(self, model: str, tokens_in: int, tokens_out: int) -> float:
+        """USD cost from the tier's `cost_per_1k_tokens`; `model` may also be a tier name, unknown models are priced like tier_2."""
+        tier_cfg = self.tiers.get(self._tier_by_model.get(model, model)) or self.tiers.get("tier_2", {})
+        rate = float(tier_cfg.get("cost_per_1k_tokens", 0.0))
+        return (max(0, tokens_in) + max(0, tokens_out)) / 1000 * rate
+
+    def track_usage(
+        self,
+        model: str,
+        tokens_in: int,
+        tokens_out: int,
+        cost: float | None = None,
+        tenant_id: str | None = None,
+    ) -> None:
+        usd = self.cost_for(model, tokens_in, tokens_out) if cost is None else float(cost)
+        self.ledger.record(tenant_id or self.tenant_id, model, max(0.0, usd))
+
+    def reserve(self, model: str, estimated_tokens: int, tenant_id: str | None = None) -> SpendReservation | None:
+        """Reserve the estimated cost of a call; None if it would exceed the tenant's daily cap."""
+        return self.ledger.reserve(tenant_id or self.tenant_id, model, self.cost_for(model, estimated_tokens, 0))
+
+    def settle(self, reservation: SpendReservation, tokens_in: int, tokens_out: int, cost: float | None = None) -> None:
+        usd = self.cost_for(reservation.model, tokens_in, tokens_out) if cost is None else float(cost)
+        self.ledger.settle(reservation, usd)
+
+    def release(self, reservation: SpendReservation) -> None:
+        """Drop a reservation whose call produced no billable output."""
+        self.ledger.release(reservation)
+
+    def flush(self) -> None:
+        self.ledger.flush()
 
-    def get_daily_spend(self) -> float:
-        return round(self._daily_spend, 6)
+    def get_daily_spend(self, tenant_id: str | None = None) -> float:
+        return round(self.ledger.spent(tenant_id or self.tenant_id), 6)
 
-    def check_budget(self) -> str:
-        if self._daily_spend > self.daily_cap:
+    def check_budget(self, tenant_id: str | None = None) -> str:
+        spend = self.ledger.committed(tenant_id or self.tenant_id)
+        if spend > self.daily_cap:
             return "exceeded"
-        if self._daily_spend >= 0.8 * self.daily_cap:
+        if spend >= 0.8 * self.daily_cap:
             return "warning"
         return "ok"
@@ -1,22 +1,57 @@
 from __future__ import annotations
 
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator
+
+import yaml
+
 from src.agent.loop import AgentLoop
 from src.agent.structured import AgentResponse
 from src.channels.message import UnifiedMessage
-from src.orchestration.budget import BudgetAgent
+from src.config import settings
+from src.orchestration.budget import BudgetAgent, load_daily_cap
 from src.orchestration.guardian import GuardianAgent
 from src.orchestration.manager import ManagerAgent
-from src.orchestration.specialists import CoderAgent, ContextBundle, OpsAgent, ResearchAgent, WriterAgent
+from src.orchestration.messages import TaskRequest, TaskResult
+from src.orchestration.spend_ledger import create_spend_ledger
+from src.orchestration.specialists import (
+    CoderAgent,
+    ContextBundle,
+    OpsAgent,
+    ResearchAgent,
+    SpecialistAgent,
+    WriterAgent,
+)
 from src.routing.models import RiskLevel, RoutingDecision, Tier
 
 
 class Coordinator:
-    def __init__(self) -> None:
+    def __init__(self, nexus_config_path: Path = Path("configs/nexus.yaml")) -> None:
+        raw = yaml.safe_load(nexus_config_path.read_text(encoding="utf-8")) or {}
+        self.max_specialists = max(1, int(raw.get("multi_agent", {}).get("max_specialists", 3)))
+        self.task_timeout_seconds = float(raw.get("agent", {}).get("react_timeout_seconds", 30))
+
         self.manager = ManagerAgent()
-        self.budget = BudgetAgent()
+        # one ledger for all tenants; the loop reserves and books spend per message.tenant_id
+        self.budget = BudgetAgent(ledger=create_spend_ledger(settings, daily_cap_usd=load_daily_cap()))
         self.guardian = GuardianAgent()
-        self.loop = AgentLoop()
-        self.specialists = [ResearchAgent(), CoderAgent(), WriterAgent(), OpsAgent()]
+        self.loop = AgentLoop(budget=self.budget)
+        self.specialists = [
+            ResearchAgent(loop=self.loop),
+            CoderAgent(loop=self.loop),
+            WriterAgent(loop=self.loop),
+            OpsAgent(loop=self.loop),
+        ]
+        # Shared across requests; each request is additionally capped at max_specialists.
+        self._executor_workers = self.max_specialists * 4
+        self._executor = ThreadPoolExecutor(max_workers=self._executor_workers, thread_name_prefix="specialist")
+        # Timed-out specialist calls keep running in their thread; they are tracked so
+        # new tasks are rejected instead of queueing behind them once the pool is saturated.
+        self._abandoned: set[Future[TaskResult]] = set()
+        self._abandoned_lock = threading.Lock()
 
     def _simple_route(self, text: str) -> RoutingDecision:
         lowered = text.lower()
@@ -38,30 +73,116 @@ class Coordinator:
             should_delegate=False,
         )
 
+    def _loop_event(self, message: UnifiedMessage, decision: RoutingDecision) -> dict:
+        return {
+            "request_id": message.message_id or "req",
+            "tenant_id": message.tenant_id,
+            "sender_id": message.sender_id,
+            "channel": message.channel,
+            "text": message.text,
+            "intent": decision.intent,
+            "tier": decision.tier.value,
+        }
+
     def process(self, message: UnifiedMessage) -> AgentResponse:
         decision = self._simple_route(message.text)
 
         if not decision.should_delegate:
-            result = self.loop.process(
-                {
-                    "request_id": message.message_id or "req",
-                    "tenant_id": message.tenant_id,
-                    "sender_id": message.sender_id,
-                    "channel": message.channel,
-                    "text": message.text,
-                    "intent": decision.intent,
-                    "tier": decision.tier.value,
-                }
-            )
+            result = self.loop.process(self._loop_event(message, decision))
             return AgentResponse(text=result["text"], intent=result["intent"], confidence=0.8, citations=[])
 
+        return self._delegate(message, decision)
+
+    async def aprocess(self, message: UnifiedMessage) -> AgentResponse:
+        """Async variant of `process` that never blocks the event loop."""
+        decision = self._simple_route(message.text)
+
+        if not decision.should_delegate:
+            result = await self.loop.aprocess(self._loop_event(message, decision))
+            return AgentResponse(text=result["text"], intent=result["intent"], confidence=0.8, citations=[])
+
+        return await self._adelegate(message, decision)
+
+    def stream(self, message: UnifiedMessage) -> tuple[str, AsyncIterator[str]]:
+        """Route `message` and return its intent plus an async iterator of reply chunks.
+
+        Single-agent replies are streamed token by token; delegated requests are
+        assembled first and emitted as one chunk.
+        """
+        decision = self._simple_route(message.text)
+        if not decision.should_delegate:
+            return decision.intent, self.loop.astream(self._loop_event(message, decision))
+
+        async def _delegated() -> AsyncIterator[str]:
+            response = await self._adelegate(message, decision)
+            yield response.text
+
+        return decision.intent, _delegated()
+
+    def _delegate(self, message: UnifiedMessage, decision: RoutingDecision) -> AgentResponse:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._adelegate(message, decision))
+        raise RuntimeError("Coordinator.process() cannot delegate inside a running event loop; use aprocess().")
+
+    async def _adelegate(self, message: UnifiedMessage, decision: RoutingDecision) -> AgentResponse:
+        """Fan tasks out to specialists concurrently and assemble results in task order.
+
+        At most `max_specialists` tasks run at once per request. A task that
+        exceeds `task_timeout_seconds` (counted from its start) becomes a failed
+        TaskResult, so the remaining results are still returned.
+        """
         request_id = message.message_id or "req"
         tasks = self.manager.decompose(message.text, decision, request_id=request_id)
         context = ContextBundle(request_id=request_id, tenant_id=message.tenant_id, channel=message.channel, sender_id=message.sender_id)
+        semaphore = asyncio.Semaphore(self.max_specialists)
+
+        results = await asyncio.gather(
+            *(
+                self._run_specialist(self.specialists[i % len(self.specialists)], task, context, semaphore)
+                for i, task in enumerate(tasks)
+            )
+        )
+        return self.manager.assemble(list(results), decision.intent)
+
+    async def _run_specialist(
+        self,
+        specialist: SpecialistAgent,
+        task: TaskRequest,
+        context: ContextBundle,
+        semaphore: asyncio.Semaphore,
+    ) -> TaskResult:
+        async with semaphore:
+            with self._abandoned_lock:
+                saturated = len(self._abandoned) >= self._executor_workers - self.max_specialists
+            if saturated:
+                error = "overloaded: specialist pool is busy with timed-out tasks"
+            else:
+                future = self._executor.submit(specialist.execute, task, context)
+                try:
+                    return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.task_timeout_seconds)
+                except asyncio.TimeoutError:
+                    error = "timeout"
+                    self._track_abandoned(future)
+                except Exception as exc:  # noqa: BLE001
+                    error = f"{type(exc).__name__}: {exc}"
+        return TaskResult(
+            task_id=task.task_id,
+            from_agent=specialist.name,
+            to_agent="manager",
+            payload={"error": error},
+            success=False,
+        )
+
+    def _track_abandoned(self, future: Future[TaskResult]) -> None:
+        with self._abandoned_lock:
+            if future.done():
+                return
+            self._abandoned.add(future)
 
-        results = []
-        for i, task in enumerate(tasks):
-            specialist = self.specialists[i % len(self.specialists)]
-            results.append(specialist.execute(task, context))
+        def _release(done: Future[TaskResult]) -> None:
+            with self._abandoned_lock:
+                self._abandoned.discard(done)
 
-        return self.manager.assemble(results, decision.intent)
+        future.add_done_callback(_release)
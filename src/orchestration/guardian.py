@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+import posixpath
+import re
+import shlex
 from enum import Enum
 from pathlib import Path
+from typing import Any, Iterable
+from urllib.parse import urlsplit
 
 import yaml
 from pydantic import BaseModel
 
-from src.tools.firewall import validate_tool_call
+from src.tools.firewall import ToolCallFirewall
 
 
 class GuardianOutcome(str, Enum):
@@ -18,33 +23,299 @@ class GuardianOutcome(str, Enum):
 class GuardianVerdict(BaseModel):
     outcome: GuardianOutcome
     reason: str
+    alert: bool = False
 
 
-class GuardianAgent:
-    def __init__(self, policy_path: Path = Path("configs/policies/guardian.yaml")) -> None:
-        raw = yaml.safe_load(policy_path.read_text(encoding="utf-8")) or {}
-        self.rules = raw.get("rules", {})
+_SEVERITY = {GuardianOutcome.APPROVED: 0, GuardianOutcome.NEEDS_CONFIRMATION: 1, GuardianOutcome.BLOCKED: 2}
 
-    def review(self, tool_name: str, args: dict, risk_level: str) -> GuardianVerdict:
-        if not validate_tool_call(tool_name, args, {"tools": {tool_name: {"enabled": True}}}):
-            return GuardianVerdict(outcome=GuardianOutcome.BLOCKED, reason="Firewall rejected tool call")
+_RISK_ACTIONS = {
+    "auto_approve": GuardianOutcome.APPROVED,
+    "log_and_approve": GuardianOutcome.APPROVED,
+    "require_user_confirmation": GuardianOutcome.NEEDS_CONFIRMATION,
+    "block_and_alert": GuardianOutcome.BLOCKED,
+}
 
-        command = str(args.get("command") or args.get("cmd") or "")
-        blocked = self.rules.get("shell_commands", {}).get("blocked", [])
-        if any(item in command for item in blocked):
-            return GuardianVerdict(outcome=GuardianOutcome.BLOCKED, reason="Blocked shell command pattern")
+COMMAND_ARG_KEYS = ("command", "cmd")
+PATH_ARG_KEYS = frozenset({"path", "paths", "file", "filename", "file_path", "dir", "directory", "source", "destination", "target"})
+URL_ARG_KEYS = frozenset({"url", "urls", "endpoint", "href"})
 
-        require_confirmation = self.rules.get("shell_commands", {}).get("require_confirmation", [])
-        if any(item in command for item in require_confirmation):
-            return GuardianVerdict(
-                outcome=GuardianOutcome.NEEDS_CONFIRMATION,
-                reason="Command requires user confirmation",
-            )
+# shell operators separate commands; `sudo rm` and `/bin/rm` are both `rm` at command position
+_SHELL_SEGMENT_SPLIT = re.compile(r"\|\||&&|[;|&\n`]|\$\(|\)")
+_COMMAND_PREFIXES = frozenset({"sudo", "env", "nohup", "exec", "time", "nice", "xargs"})
+# `sh -c "<payload>"` runs the payload as its own command line
+_SHELLS = frozenset({"sh", "bash", "zsh", "dash"})
+_MAX_SHELL_NESTING = 4
+_REDIRECTION_PREFIX = re.compile(r"^\d*(?:>>|>|<)&?")
+_ENV_ASSIGNMENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*=")
+# `mkfs.ext4` and `docker-compose` are variants of the `mkfs` / `docker` patterns
+_COMMAND_VARIANT_SPLIT = re.compile(r"[.-]")
+_LONG_FLAGS = {"--recursive": "r", "--force": "f"}
+
+
+def _shell_tokens(raw: str) -> list[str]:
+    try:
+        return shlex.split(raw, posix=True)
+    except ValueError:
+        # unbalanced quotes, e.g. a quoted payload cut at an operator: drop the stray quotes
+        return [token.strip("'\"") for token in raw.split() if token.strip("'\"")]
+
+
+def _shell_payload(tokens: list[str], position: int) -> str | None:
+    for index in range(position + 1, len(tokens)):
+        flag = tokens[index]
+        if not flag.startswith("-") or flag.startswith("--"):
+            return None
+        if "c" in flag[1:]:
+            return tokens[index + 1] if index + 1 < len(tokens) else None
+    return None
+
+
+def _command_segments(command: str, nesting: int = 0) -> list[list[str]]:
+    """Simple commands of `command`, each starting at its command position (prefixes and `VAR=x` dropped)."""
+    segments: list[list[str]] = []
+    for raw in _SHELL_SEGMENT_SPLIT.split(command):
+        tokens = _shell_tokens(raw)
+        position = 0
+        while position < len(tokens) and (tokens[position] in _COMMAND_PREFIXES or _ENV_ASSIGNMENT.match(tokens[position])):
+            position += 1
+        tokens = tokens[position:]
+        if not tokens:
+            continue
+        tokens[0] = posixpath.basename(tokens[0]) or tokens[0]
+        segments.append(tokens)
+        if tokens[0] in _SHELLS and nesting < _MAX_SHELL_NESTING:
+            payload = _shell_payload(tokens, 0)
+            if payload:
+                segments.extend(_command_segments(payload, nesting + 1))
+    return segments
+
+
+def _path_token(token: str) -> str:
+    """`>/etc/x`, `2>>'/tmp/y'` -> the path; plain tokens unchanged."""
+    return _REDIRECTION_PREFIX.sub("", token).strip("'\"")
+
+
+def _normalize_domain(domain: str) -> str:
+    return domain.lower().strip(".")
+
+
+def _flag_set(flags: Iterable[str]) -> frozenset[str]:
+    """Letters of short flags (`-rf`, `-r -f`) and known long flags; case-insensitive, so `-R` == `-r`."""
+    letters: set[str] = set()
+    for flag in flags:
+        if flag in _LONG_FLAGS:
+            letters.add(_LONG_FLAGS[flag])
+        elif flag.startswith("-") and not flag.startswith("--"):
+            letters.update(flag[1:].lower())
+    return frozenset(letters)
+
+
+def _is_subsequence(needle: tuple[str, ...], haystack: list[str]) -> bool:
+    remaining = iter(haystack)
+    return all(word in remaining for word in needle)
+
+
+class CommandMatcher:
+    """Matches command patterns ("rm -rf", "apt install", "dd") at command position.
+
+    A pattern's head matches the command name itself or a `.`/`-` variant of it
+    (`mkfs` covers `mkfs.ext4`, `docker` covers `docker-compose`). Flags in the
+    pattern must all be set in any order or grouping (`rm -rf` covers `rm -fr`,
+    `rm -r -f`, `rm -Rfv`); other pattern words must follow in order among the
+    arguments. Arguments never match as commands (`echo dd` is not `dd`).
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self._by_head: dict[str, list[tuple[str, frozenset[str], tuple[str, ...]]]] = {}
+        for pattern in patterns:
+            tokens = str(pattern).split()
+            if tokens:
+                flags = _flag_set(t for t in tokens[1:] if t.startswith("-"))
+                words = tuple(t for t in tokens[1:] if not t.startswith("-"))
+                self._by_head.setdefault(tokens[0], []).append((str(pattern), flags, words))
+
+    def first_match(self, segments: list[list[str]]) -> str | None:
+        for tokens in segments:
+            head = tokens[0]
+            variant = _COMMAND_VARIANT_SPLIT.split(head, maxsplit=1)[0]
+            candidates = self._by_head.get(head, [])
+            if variant != head:
+                candidates = candidates + self._by_head.get(variant, [])
+            if not candidates:
+                continue
+            args = tokens[1:]
+            flags = _flag_set(a for a in args if a.startswith("-"))
+            words = [a for a in args if not a.startswith("-")]
+            for pattern, pattern_flags, pattern_words in candidates:
+                if pattern_flags <= flags and _is_subsequence(pattern_words, words):
+                    return pattern
+        return None
+
+
+class PathPrefixTrie:
+    """Component-wise path prefixes: `/etc` covers `/etc/passwd` but not `/etcetera`."""
+
+    _END = ""
+
+    def __init__(self, prefixes: Iterable[str] = ()) -> None:
+        self._root: dict[str, Any] = {}
+        for prefix in prefixes:
+            self.add(prefix)
+
+    @staticmethod
+    def _parts(path: str) -> list[str]:
+        return [part for part in posixpath.normpath(path).split("/") if part]
 
-        if risk_level in {"high", "critical"}:
+    def add(self, prefix: str) -> None:
+        node = self._root
+        for part in self._parts(prefix):
+            node = node.setdefault(part, {})
+        node[self._END] = True
+
+    def covers(self, path: str) -> bool:
+        node = self._root
+        if self._END in node:
+            return True
+        for part in self._parts(path):
+            node = node.get(part)
+            if node is None:
+                return False
+            if self._END in node:
+                return True
+        return False
+
+    def __bool__(self) -> bool:
+        return bool(self._root)
+
+
+def _domain_candidates(host: str) -> list[str]:
+    parts = host.split(".")
+    return [".".join(parts[i:]) for i in range(len(parts))]
+
+
+class GuardianPolicy:
+    """guardian.yaml rules compiled once: command matchers, path tries, domain sets, risk actions."""
+
+    def __init__(self, rules: dict[str, Any]) -> None:
+        shell = rules.get("shell_commands") or {}
+        self.blocked_commands = CommandMatcher(shell.get("blocked") or [])
+        self.confirm_commands = CommandMatcher(shell.get("require_confirmation") or [])
+
+        files = rules.get("file_operations") or {}
+        self.sandbox_roots = [posixpath.normpath(str(p)) for p in files.get("sandboxed_paths") or []]
+        self.sandboxed_paths = PathPrefixTrie(self.sandbox_roots)
+        self.blocked_paths = PathPrefixTrie(str(p) for p in files.get("blocked_paths") or [])
+
+        http = rules.get("http_requests") or {}
+        self.blocked_domains = frozenset(_normalize_domain(str(d)) for d in http.get("blocked_domains") or [])
+        self.known_domains: set[str] = {_normalize_domain(str(d)) for d in http.get("allowed_domains") or []}
+        self.confirm_new_domains = bool(http.get("require_confirmation_for_new_domains", False))
+
+        self.risk_actions = {
+            str(level): (_RISK_ACTIONS.get(str(action), GuardianOutcome.APPROVED), str(action))
+            for level, action in (rules.get("risk_levels") or {}).items()
+        }
+        self.firewall = ToolCallFirewall({})
+
+    def remember_domain(self, domain: str) -> None:
+        """Mark a domain as known (e.g. after the user confirmed a request to it)."""
+        self.known_domains.add(_normalize_domain(domain))
+
+    def review(self, tool_name: str, args: dict, risk_level: str) -> GuardianVerdict:
+        firewall = self.firewall.scan(args)
+        if not firewall.allowed:
             return GuardianVerdict(
-                outcome=GuardianOutcome.NEEDS_CONFIRMATION,
-                reason="High risk action requires confirmation",
+                outcome=GuardianOutcome.BLOCKED,
+                reason="Firewall rejected tool call: " + ", ".join(firewall.reasons),
             )
 
-        return GuardianVerdict(outcome=GuardianOutcome.APPROVED, reason="Policy checks passed")
+        outcome, reason = GuardianOutcome.APPROVED, "Policy checks passed"
+
+        def escalate(candidate: GuardianOutcome, why: str) -> None:
+            nonlocal outcome, reason
+            if _SEVERITY[candidate] > _SEVERITY[outcome]:
+                outcome, reason = candidate, why
+
+        command = next((str(args[key]) for key in COMMAND_ARG_KEYS if args.get(key)), "")
+        segments = _command_segments(command) if command else []
+        if segments:
+            pattern = self.blocked_commands.first_match(segments)
+            if pattern is not None:
+                return GuardianVerdict(outcome=GuardianOutcome.BLOCKED, reason=f"Blocked shell command pattern: {pattern}")
+            pattern = self.confirm_commands.first_match(segments)
+            if pattern is not None:
+                escalate(GuardianOutcome.NEEDS_CONFIRMATION, f"Command requires user confirmation: {pattern}")
+
+        for path in self._paths(args, segments):
+            if self.blocked_paths.covers(path):
+                return GuardianVerdict(outcome=GuardianOutcome.BLOCKED, reason=f"Blocked path: {path}")
+            if self.sandboxed_paths and not self.sandboxed_paths.covers(path):
+                escalate(GuardianOutcome.NEEDS_CONFIRMATION, f"Path outside sandbox: {path}")
+
+        for host in self._hosts(args):
+            if any(candidate in self.blocked_domains for candidate in _domain_candidates(host)):
+                return GuardianVerdict(outcome=GuardianOutcome.BLOCKED, reason=f"Blocked domain: {host}")
+            if self.confirm_new_domains and not any(c in self.known_domains for c in _domain_candidates(host)):
+                escalate(GuardianOutcome.NEEDS_CONFIRMATION, f"Request to new domain: {host}")
+
+        risk_outcome, action = self.risk_actions.get(risk_level, (None, ""))
+        if risk_outcome is None and risk_level in {"high", "critical"}:
+            risk_outcome, action = GuardianOutcome.NEEDS_CONFIRMATION, "require_user_confirmation"
+        if risk_outcome is GuardianOutcome.BLOCKED:
+            return GuardianVerdict(outcome=risk_outcome, reason=f"Risk level {risk_level}: {action}", alert=True)
+        if risk_outcome is GuardianOutcome.NEEDS_CONFIRMATION:
+            escalate(risk_outcome, "High risk action requires confirmation")
+
+        return GuardianVerdict(outcome=outcome, reason=reason)
+
+    def _paths(self, args: dict, segments: list[list[str]]) -> list[str]:
+        raw: list[str] = []
+        for key, value in args.items():
+            if str(key).lower() in PATH_ARG_KEYS:
+                raw.extend(value if isinstance(value, list) else [value])
+        for tokens in segments:
+            for token in tokens[1:]:
+                path = _path_token(token)
+                if path.startswith(("/", "./", "../", "~")):
+                    raw.append(path)
+        base = self.sandbox_roots[0] if self.sandbox_roots else "/"
+        # relative paths are taken relative to the sandbox root, so `../..` escapes are caught;
+        # `~` is unknown here and therefore never inside the sandbox
+        return [
+            posixpath.normpath(posixpath.join(base, f"/{p}" if p.startswith("~") else p))
+            for p in raw
+            if isinstance(p, str) and p
+        ]
+
+    def _hosts(self, args: dict) -> list[str]:
+        urls: list[str] = []
+        for key, value in args.items():
+            values = value if isinstance(value, list) else [value]
+            if str(key).lower() in URL_ARG_KEYS:
+                urls.extend(v for v in values if isinstance(v, str))
+            elif isinstance(value, str) and value.startswith(("http://", "https://")):
+                urls.append(value)
+        hosts: list[str] = []
+        for url in urls:
+            try:
+                host = urlsplit(url if "://" in url else f"//{url}").hostname
+            except ValueError:
+                host = None
+            if host:
+                hosts.append(_normalize_domain(host))
+        return hosts
+
+
+class GuardianAgent:
+    def __init__(self, policy_path: Path = Path("configs/policies/guardian.yaml")) -> None:
+        raw = yaml.safe_load(policy_path.read_text(encoding="utf-8")) or {}
+        self.rules = raw.get("rules", {})
+        self.policy = GuardianPolicy(self.rules)
+
+    def review(self, tool_name: str, args: dict, risk_level: str) -> GuardianVerdict:
+        return self.policy.review(tool_name, args, risk_level)
+
+    def review_many(self, calls: Iterable[tuple[str, dict, str]]) -> list[GuardianVerdict]:
+        """Review the (tool_name, args, risk_level) steps of a plan, in order."""
+        review = self.policy.review
+        return [review(tool_name, args, risk_level) for tool_name, args, risk_level in calls]
@@ -19,10 +19,16 @@ class SpecialistAgent:
     name: str
     system_prompt_snippet: str
     allowed_plugins: list[str] = field(default_factory=list)
+    # Shared loop injected by the Coordinator; specialists hold no per-call state.
+    loop: AgentLoop | None = None
+
+    def _get_loop(self) -> AgentLoop:
+        if self.loop is None:
+            self.loop = AgentLoop()
+        return self.loop
 
     def execute(self, task: TaskRequest, context: ContextBundle) -> TaskResult:
-        loop = AgentLoop()
-        result = loop.process(
+        result = self._get_loop().process(
             {
                 "request_id": context.request_id,
                 "tenant_id": context.tenant_id,
@@ -43,20 +49,20 @@ class SpecialistAgent:
 
 
 class ResearchAgent(SpecialistAgent):
-    def __init__(self) -> None:
-        super().__init__("research", "Research and source synthesis", ["web_search", "knowledge_base"])
+    def __init__(self, loop: AgentLoop | None = None) -> None:
+        super().__init__("research", "Research and source synthesis", ["web_search", "knowledge_base"], loop=loop)
 
 
 class CoderAgent(SpecialistAgent):
-    def __init__(self) -> None:
-        super().__init__("coder", "Coding and debugging", ["github", "terminal"])
+    def __init__(self, loop: AgentLoop | None = None) -> None:
+        super().__init__("coder", "Coding and debugging", ["github", "terminal"], loop=loop)
 
 
 class WriterAgent(SpecialistAgent):
-    def __init__(self) -> None:
-        super().__init__("writer", "Writing and communication", ["knowledge_base"])
+    def __init__(self, loop: AgentLoop | None = None) -> None:
+        super().__init__("writer", "Writing and communication", ["knowledge_base"], loop=loop)
 
 
 class OpsAgent(SpecialistAgent):
-    def __init__(self) -> None:
-        super().__init__("ops", "Infrastructure and automations", ["n8n", "terminal"])
+    def __init__(self, loop: AgentLoop | None = None) -> None:
+        super().__init__("ops", "Infrastructure and automations", ["n8n", "terminal"], loop=loop)
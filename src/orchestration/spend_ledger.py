@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Protocol
+
+from src.config import Settings
+
+RESERVED_FIELD = "__reserved__"
+TOTAL_FIELD = "__total__"
+DEFAULT_KEY_PREFIX = "nexus:spend:"
+# counters outlive their day a little so late flushes and reports still find them
+DEFAULT_TTL_SECONDS = 3 * 86_400
+
+SpendKey = tuple[str, str, str]  # (day, tenant_id, model)
+
+
+def utc_day(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime(timestamp))
+
+
+class SpendBackend(Protocol):
+    """Shared spend counters per (day, tenant); reservations are held separately from spend."""
+
+    def add(self, increments: dict[SpendKey, float]) -> None: ...
+
+    def by_model(self, day: str, tenant_id: str) -> dict[str, float]: ...
+
+    def reserved(self, day: str, tenant_id: str) -> float: ...
+
+    def reserve(self, day: str, tenant_id: str, amount: float, cap: float, unflushed: float = 0.0) -> bool: ...
+
+    def settle(self, day: str, tenant_id: str, model: str, reserved: float, actual: float) -> None: ...
+
+
+class InMemorySpendBackend:
+    """Process-local backend for tests and single-worker local runs."""
+
+    def __init__(self) -> None:
+        self._spend: dict[tuple[str, str], dict[str, float]] = {}
+        self._reserved: dict[tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, increments: dict[SpendKey, float]) -> None:
+        with self._lock:
+            for (day, tenant_id, model), usd in increments.items():
+                models = self._spend.setdefault((day, tenant_id), {})
+                models[model] = models.get(model, 0.0) + usd
+
+    def by_model(self, day: str, tenant_id: str) -> dict[str, float]:
+        with self._lock:
+            return dict(self._spend.get((day, tenant_id), {}))
+
+    def reserved(self, day: str, tenant_id: str) -> float:
+        with self._lock:
+            return self._reserved.get((day, tenant_id), 0.0)
+
+    def reserve(self, day: str, tenant_id: str, amount: float, cap: float, unflushed: float = 0.0) -> bool:
+        with self._lock:
+            spent = sum(self._spend.get((day, tenant_id), {}).values())
+            reserved = self._reserved.get((day, tenant_id), 0.0)
+            if spent + reserved + unflushed + amount > cap:
+                return False
+            self._reserved[(day, tenant_id)] = reserved + amount
+            return True
+
+    def settle(self, day: str, tenant_id: str, model: str, reserved: float, actual: float) -> None:
+        with self._lock:
+            self._reserved[(day, tenant_id)] = max(0.0, self._reserved.get((day, tenant_id), 0.0) - reserved)
+            models = self._spend.setdefault((day, tenant_id), {})
+            models[model] = models.get(model, 0.0) + actual
+
+
+class RedisSpendBackend:
+    """One hash per (day, tenant): a field per model plus running total and reservations.
+
+    Increments use HINCRBYFLOAT in a single MULTI pipeline. Reservations are a
+    WATCH/MULTI check-and-set on the hash, so concurrent workers cannot reserve
+    past the cap together.
+    """
+
+    def __init__(self, client: Any, key_prefix: str = DEFAULT_KEY_PREFIX, ttl_seconds: int = DEFAULT_TTL_SECONDS) -> None:
+        self.client = client
+        self.key_prefix = key_prefix
+        self.ttl_seconds = ttl_seconds
+
+    @classmethod
+    def from_url(cls, redis_url: str, **kwargs: Any) -> RedisSpendBackend:
+        import redis
+
+        return cls(redis.Redis.from_url(redis_url), **kwargs)
+
+    def _key(self, day: str, tenant_id: str) -> str:
+        return f"{self.key_prefix}{day}:{tenant_id}"
+
+    def add(self, increments: dict[SpendKey, float]) -> None:
+        if not increments:
+            return
+        pipe = self.client.pipeline(transaction=True)
+        for (day, tenant_id, model), usd in increments.items():
+            key = self._key(day, tenant_id)
+            pipe.hincrbyfloat(key, model, usd)
+            pipe.hincrbyfloat(key, TOTAL_FIELD, usd)
+            pipe.expire(key, self.ttl_seconds)
+        pipe.execute()
+
+    def by_model(self, day: str, tenant_id: str) -> dict[str, float]:
+        raw = self.client.hgetall(self._key(day, tenant_id))
+        out: dict[str, float] = {}
+        for field, value in raw.items():
+            name = field.decode("utf-8") if isinstance(field, bytes) else str(field)
+            if name not in {TOTAL_FIELD, RESERVED_FIELD}:
+                out[name] = float(value)
+        return out
+
+    def reserved(self, day: str, tenant_id: str) -> float:
+        return float(self.client.hget(self._key(day, tenant_id), RESERVED_FIELD) or 0.0)
+
+    def reserve(self, day: str, tenant_id: str, amount: float, cap: float, unflushed: float = 0.0) -> bool:
+        key = self._key(day, tenant_id)
+
+        def _check_and_reserve(pipe: Any) -> bool:
+            spent, reserved = pipe.hmget(key, TOTAL_FIELD, RESERVED_FIELD)
+            if float(spent or 0.0) + float(reserved or 0.0) + unflushed + amount > cap:
+                return False
+            pipe.multi()
+            pipe.hincrbyfloat(key, RESERVED_FIELD, amount)
+            pipe.expire(key, self.ttl_seconds)
+            return True
+
+        return bool(self.client.transaction(_check_and_reserve, key, value_from_callable=True))
+
+    def settle(self, day: str, tenant_id: str, model: str, reserved: float, actual: float) -> None:
+        key = self._key(day, tenant_id)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hincrbyfloat(key, RESERVED_FIELD, -reserved)
+        pipe.hincrbyfloat(key, model, actual)
+        pipe.hincrbyfloat(key, TOTAL_FIELD, actual)
+        pipe.expire(key, self.ttl_seconds)
+        pipe.execute()
+
+
+class SqliteSpendBackend:
+    """Local single-host backend: one row per (day, tenant, model) in a WAL-mode SQLite file.
+
+    WAL lets uvicorn workers on the same host read while one writes;
+    reservations run in `BEGIN IMMEDIATE` transactions, which serializes
+    writers across processes.
+    """
+
+    def __init__(self, path: Path, busy_timeout_ms: int = 5000) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=busy_timeout_ms / 1000)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS spend ("
+            "day TEXT NOT NULL, tenant_id TEXT NOT NULL, model TEXT NOT NULL, usd REAL NOT NULL DEFAULT 0, "
+            "PRIMARY KEY (day, tenant_id, model))"
+        )
+        self._lock = threading.Lock()
+
+    _UPSERT = "INSERT INTO spend (day, tenant_id, model, usd) VALUES (?, ?, ?, ?) ON CONFLICT (day, tenant_id, model) DO UPDATE SET usd = usd + excluded.usd"
+
+    def add(self, increments: dict[SpendKey, float]) -> None:
+        if not increments:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(self._UPSERT, [(*key, usd) for key, usd in increments.items()])
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def by_model(self, day: str, tenant_id: str) -> dict[str, float]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT model, usd FROM spend WHERE day = ? AND tenant_id = ? AND model != ?",
+                (day, tenant_id, RESERVED_FIELD),
+            ).fetchall()
+        return {model: float(usd) for model, usd in rows}
+
+    def reserved(self, day: str, tenant_id: str) -> float:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT usd FROM spend WHERE day = ? AND tenant_id = ? AND model = ?",
+                (day, tenant_id, RESERVED_FIELD),
+            ).fetchone()
+        return float(row[0]) if row else 0.0
+
+    def reserve(self, day: str, tenant_id: str, amount: float, cap: float, unflushed: float = 0.0) -> bool:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                (current,) = self._conn.execute(
+                    "SELECT COALESCE(SUM(usd), 0) FROM spend WHERE day = ? AND tenant_id = ?", (day, tenant_id)
+                ).fetchone()
+                if float(current) + unflushed + amount > cap:
+                    self._conn.execute("ROLLBACK")
+                    return False
+                self._conn.execute(self._UPSERT, (day, tenant_id, RESERVED_FIELD, amount))
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return True
+
+    def settle(self, day: str, tenant_id: str, model: str, reserved: float, actual: float) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(self._UPSERT, (day, tenant_id, RESERVED_FIELD, -reserved))
+                self._conn.execute(self._UPSERT, (day, tenant_id, model, actual))
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+@dataclass(frozen=True)
+class SpendReservation:
+    day: str
+    tenant_id: str
+    model: str
+    amount: float
+
+
+class SpendLedger:
+    """Daily spend per tenant and model against `daily_cap_usd`.
+
+    `record` batches increments in memory and flushes them to the backend
+    once `flush_interval_seconds` passed (or `max_pending` keys accumulated);
+    `run_periodic_flush` flushes on the same interval without new traffic.
+    Requests that must not overshoot the cap go through `reserve` ->
+    `settle`: the estimate is reserved atomically in the backend and replaced
+    by the actual cost in one backend operation. Days are UTC.
+    """
+
+    def __init__(
+        self,
+        backend: SpendBackend,
+        daily_cap_usd: float,
+        flush_interval_seconds: float = 5.0,
+        max_pending: int = 256,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.backend = backend
+        self.daily_cap_usd = daily_cap_usd
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_pending = max_pending
+        self._clock = clock
+        self._pending: dict[SpendKey, float] = {}
+        self._last_flush = clock()
+        self._lock = threading.Lock()
+
+    def today(self) -> str:
+        return utc_day(self._clock())
+
+    def record(self, tenant_id: str, model: str, cost_usd: float) -> None:
+        if cost_usd <= 0:
+            return
+        key = (self.today(), tenant_id, model)
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0.0) + cost_usd
+            due = len(self._pending) >= self.max_pending or self._clock() - self._last_flush >= self.flush_interval_seconds
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = self._clock()
+        if not pending:
+            return
+        try:
+            self.backend.add(pending)
+        except Exception:
+            # keep the increments for the next flush instead of losing spend
+            with self._lock:
+                for key, usd in pending.items():
+                    self._pending[key] = self._pending.get(key, 0.0) + usd
+            raise
+
+    async def run_periodic_flush(self) -> None:
+        """Flush every `flush_interval_seconds` until cancelled, so idle workers publish their spend too."""
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception:  # noqa: BLE001 - increments stay pending for the next attempt
+                pass
+
+    def _unflushed(self, day: str, tenant_id: str) -> float:
+        with self._lock:
+            return sum(usd for (d, t, _), usd in self._pending.items() if d == day and t == tenant_id)
+
+    def spent_by_model(self, tenant_id: str, day: str | None = None) -> dict[str, float]:
+        day = day or self.today()
+        totals = self.backend.by_model(day, tenant_id)
+        with self._lock:
+            for (d, t, model), usd in self._pending.items():
+                if d == day and t == tenant_id:
+                    totals[model] = totals.get(model, 0.0) + usd
+        return totals
+
+    def spent(self, tenant_id: str, day: str | None = None) -> float:
+        return sum(self.spent_by_model(tenant_id, day).values())
+
+    def committed(self, tenant_id: str, day: str | None = None) -> float:
+        """Spend plus outstanding reservations, i.e. what counts against the cap."""
+        day = day or self.today()
+        return self.spent(tenant_id, day) + self.backend.reserved(day, tenant_id)
+
+    def reserve(self, tenant_id: str, model: str, estimated_cost_usd: float) -> SpendReservation | None:
+        """Atomically reserve `estimated_cost_usd`; None if that would exceed the daily cap."""
+        day = self.today()
+        amount = max(0.0, estimated_cost_usd)
+        if not self.backend.reserve(day, tenant_id, amount, self.daily_cap_usd, unflushed=self._unflushed(day, tenant_id)):
+            return None
+        return SpendReservation(day=day, tenant_id=tenant_id, model=model, amount=amount)
+
+    def settle(self, reservation: SpendReservation, actual_cost_usd: float) -> None:
+        self.backend.settle(reservation.day, reservation.tenant_id, reservation.model, reservation.amount, max(0.0, actual_cost_usd))
+
+    def release(self, reservation: SpendReservation) -> None:
+        self.settle(reservation, 0.0)
+
+
+def create_spend_ledger(settings: Settings, daily_cap_usd: float) -> SpendLedger:
+    if settings.runtime_mode == "local":
+        backend: SpendBackend = (
+            SqliteSpendBackend(Path(settings.spend_ledger_sqlite_path))
+            if settings.spend_ledger_sqlite_path
+            else InMemorySpendBackend()
+        )
+    else:
+        backend = RedisSpendBackend.from_url(settings.redis_url)
+    return SpendLedger(backend, daily_cap_usd=daily_cap_usd, flush_interval_seconds=settings.spend_ledger_flush_seconds)
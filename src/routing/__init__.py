@@ -1,34 +1,71 @@
 from __future__ import annotations
 
-from typing import Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterable
 
+from src.routing.cache import RoutingDecisionCache, get_decision_cache, normalize_message
+from src.routing.embedding import decision_from_matches, embedding_route, get_default_embedding_router
 from src.routing.keyword import keyword_route
 from src.routing.llm_classifier import classify_with_llm_fallback
 from src.routing.models import RiskLevel, RoutingDecision
 from src.routing.semantic import semantic_route
+from src.tenant.compiled import cached_fingerprint
 from src.tenant.models import TenantContext
-from src.tools.registry import ToolRegistry
+from src.tools.permissions import get_permission_table
+from src.tools.registry import get_registry_snapshot
 
+PARALLEL_BATCH_THRESHOLD = 20_000
 
-def route(message: str, tenant_context: TenantContext) -> RoutingDecision:
-    """Run the 4-step routing pipeline: keyword -> semantic -> llm_classifier.
-
-    After classification, enriches the decision with tenant-specific
-    risk_mapping overrides and tools_to_load.
-    """
-    intents_config = tenant_context.config.intents
 
+def classify(message: str, intents_config: dict[str, Any]) -> RoutingDecision:
+    """Run the classification steps: keyword -> semantic -> llm_classifier."""
     # Step 1: Keyword pre-filter (free, <1ms)
     decision = keyword_route(message, intents_config)
 
-    # Step 2: Semantic router (free, <10ms)
+    # Step 2: Semantic router (free, <10ms): lexical overlap, then local embeddings
     if decision is None:
         decision = semantic_route(message, intents_config)
+    if decision is None:
+        decision = embedding_route(message, intents_config)
 
     # Step 3: LLM classifier fallback (only for ambiguous queries)
     if decision is None:
         decision = classify_with_llm_fallback(message, intents_config)
+    return decision
+
+
+def classify_many(messages: list[str], intents_config: dict[str, Any]) -> list[RoutingDecision]:
+    """`classify` for many messages; embedding lookups for the leftovers are batched."""
+    decisions: list[RoutingDecision | None] = []
+    for message in messages:
+        decision = keyword_route(message, intents_config)
+        if decision is None:
+            decision = semantic_route(message, intents_config)
+        decisions.append(decision)
 
+    pending = [i for i, decision in enumerate(decisions) if decision is None]
+    if pending:
+        matches = get_default_embedding_router().search_many([messages[i] for i in pending], intents_config)
+        for position, match in zip(pending, matches):
+            decision = decision_from_matches(match, intents_config)
+            if decision is None:
+                decision = classify_with_llm_fallback(messages[position], intents_config)
+            decisions[position] = decision
+
+    return [decision for decision in decisions if decision is not None]
+
+
+def _classify_chunk(args: tuple[list[str], dict[str, Any]]) -> list[RoutingDecision]:
+    messages, intents_config = args
+    return classify_many(messages, intents_config)
+
+
+def _enrich(
+    decision: RoutingDecision,
+    tenant_context: TenantContext,
+    channel: str | None = None,
+    granted_scopes: Iterable[str] | None = None,
+) -> RoutingDecision:
     # Apply tenant-specific risk mapping overrides
     risk_override = tenant_context.risk_mapping.get(decision.intent)
     if risk_override:
@@ -40,11 +77,83 @@ def route(message: str, tenant_context: TenantContext) -> RoutingDecision:
         except ValueError:
             pass  # Invalid risk level in config, keep original
 
-    # Attach tools_to_load from tenant tool registry
-    registry = ToolRegistry(tenant_context.config.tools)
-    tools_for_intent = registry.get_tools_for_intent(decision.intent)
-    decision = decision.model_copy(update={
-        "tools_to_load": [t["name"] for t in tools_for_intent],
-    })
+    # Attach tools_to_load from the shared tenant tool registry snapshot
+    registry = get_registry_snapshot(tenant_context.config.tools)
+    tools_to_load = list(registry.tool_names_for_intent(decision.intent))
 
-    return decision
+    # Drop tools the caller may not use on this channel before they reach the prompt
+    if channel is not None and granted_scopes is not None:
+        tools_to_load = get_permission_table(tenant_context.config.tools).authorize_many(
+            tools_to_load, granted_scopes, channel, decision.risk_level.value
+        ).allowed
+
+    return decision.model_copy(update={"tools_to_load": tools_to_load})
+
+
+def route(
+    message: str,
+    tenant_context: TenantContext,
+    decision_cache: RoutingDecisionCache | None = None,
+    *,
+    channel: str | None = None,
+    granted_scopes: Iterable[str] | None = None,
+) -> RoutingDecision:
+    """Run the 4-step routing pipeline: keyword -> semantic -> llm_classifier.
+
+    Classification results are cached per (tenant, intents fingerprint,
+    normalized message). After classification, enriches the decision with
+    tenant-specific risk_mapping overrides and tools_to_load. With `channel`
+    and `granted_scopes`, tools_to_load only keeps tools the caller is
+    permitted to use there.
+    """
+    intents_config = tenant_context.config.intents
+    cache = decision_cache or get_decision_cache()
+    fingerprint = cached_fingerprint(intents_config)
+
+    decision = cache.get(tenant_context.tenant_id, fingerprint, message)
+    if decision is None:
+        decision = classify(message, intents_config)
+        cache.put(tenant_context.tenant_id, fingerprint, message, decision)
+
+    return _enrich(decision, tenant_context, channel, granted_scopes)
+
+
+def route_batch(
+    messages: list[str],
+    tenant_context: TenantContext,
+    workers: int | None = None,
+    parallel_threshold: int = PARALLEL_BATCH_THRESHOLD,
+    *,
+    channel: str | None = None,
+    granted_scopes: Iterable[str] | None = None,
+) -> list[RoutingDecision]:
+    """Route many messages for one tenant; results equal `[route(m, ctx) for m in messages]`.
+
+    Messages are de-duplicated on the decision-cache key and classified once
+    each, sharing the tenant's compiled matchers and indexes. With `workers`
+    set and at least `parallel_threshold` unique messages, classification is
+    fanned out over a process pool. The decision cache is neither read nor
+    filled, so bulk replays do not evict live traffic.
+    """
+    intents_config = tenant_context.config.intents
+    if granted_scopes is not None:
+        granted_scopes = frozenset(granted_scopes)
+
+    unique_messages: dict[str, str] = {}
+    for message in messages:
+        unique_messages.setdefault(normalize_message(message), message)
+    originals = list(unique_messages.values())
+
+    if workers and workers > 1 and len(originals) >= parallel_threshold:
+        chunk_size = -(-len(originals) // (workers * 4))
+        chunks = [(originals[i : i + chunk_size], intents_config) for i in range(0, len(originals), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            classified = [decision for chunk in pool.map(_classify_chunk, chunks) for decision in chunk]
+    else:
+        classified = classify_many(originals, intents_config)
+
+    enriched = {
+        key: _enrich(decision, tenant_context, channel, granted_scopes)
+        for key, decision in zip(unique_messages.keys(), classified)
+    }
+    return [enriched[normalize_message(message)].model_copy() for message in messages]
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+from src.routing.models import RoutingDecision
+
+CacheKey = tuple[str, str, str]
+
+
+def normalize_message(message: str) -> str:
+    """Cache-key normalization that cannot change a routing outcome.
+
+    Every router lower-cases its input and ignores surrounding whitespace, so
+    those are folded; inner whitespace is kept because multi-word keywords
+    match on it.
+    """
+    return message.strip().lower()
+
+
+@dataclass
+class DecisionCacheStats:
+    hits: int
+    misses: int
+    size: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class RoutingDecisionCache:
+    """Bounded LRU + TTL cache of classification results.
+
+    Keys are (tenant_id, intents fingerprint, normalized message). A changed
+    intents config yields a new fingerprint, so stale entries are never hit and
+    simply age out; `invalidate_tenant` drops them eagerly on reload.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10_000,
+        ttl_seconds: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[CacheKey, tuple[float, RoutingDecision]] = OrderedDict()
+        self._keys_by_tenant: dict[str, set[CacheKey]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, tenant_id: str, fingerprint: str, message: str) -> RoutingDecision | None:
+        key = (tenant_id, fingerprint, normalize_message(message))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, tenant_id: str, fingerprint: str, message: str, decision: RoutingDecision) -> None:
+        key = (tenant_id, fingerprint, normalize_message(message))
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, decision)
+            self._entries.move_to_end(key)
+            self._keys_by_tenant.setdefault(tenant_id, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+
+    def invalidate_tenant(self, tenant_id: str) -> int:
+        """Drop all entries of `tenant_id`; returns the number of evicted decisions."""
+        with self._lock:
+            keys = self._keys_by_tenant.pop(tenant_id, set())
+            for key in keys:
+                self._entries.pop(key, None)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_tenant.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> DecisionCacheStats:
+        return DecisionCacheStats(hits=self.hits, misses=self.misses, size=len(self._entries))
+
+    def _remove(self, key: CacheKey) -> None:
+        self._entries.pop(key, None)
+        tenant_keys = self._keys_by_tenant.get(key[0])
+        if tenant_keys is not None:
+            tenant_keys.discard(key)
+            if not tenant_keys:
+                self._keys_by_tenant.pop(key[0], None)
+
+
+_default_cache = RoutingDecisionCache()
+
+
+def get_decision_cache() -> RoutingDecisionCache:
+    return _default_cache
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import os
+import zlib
+from pathlib import Path
+from typing import Any, Protocol
+
+import numpy as np
+
+from src.routing.confidence import clamp_confidence
+from src.routing.models import GroundingMode, RiskLevel, RoutingDecision, Tier
+from src.tenant.compiled import CompiledConfigCache, config_fingerprint
+
+DEFAULT_MIN_SIMILARITY = 0.55
+
+
+class Embedder(Protocol):
+    """Embedding backend: maps texts to rows of a float32 matrix."""
+
+    signature: str
+    dim: int
+
+    def embed(self, texts: list[str]) -> np.ndarray: ...
+
+
+class HashingNgramEmbedder:
+    """Local character n-gram embedder using the hashing trick (no model, no network).
+
+    Each word is padded (`<wort>`) and split into n-grams; every n-gram is hashed
+    with crc32 into one of `dim` buckets with a hash-derived sign. crc32 keeps
+    vectors stable across processes, which the on-disk cache relies on.
+    """
+
+    def __init__(self, dim: int = 512, min_n: int = 3, max_n: int = 5) -> None:
+        self.dim = dim
+        self.min_n = min_n
+        self.max_n = max_n
+        self.signature = f"hash-ngram-v1-{dim}-{min_n}-{max_n}"
+
+    def _ngrams(self, text: str) -> list[str]:
+        grams: list[str] = []
+        for word in text.lower().split():
+            padded = f"<{word}>"
+            for n in range(self.min_n, self.max_n + 1):
+                grams.extend(padded[i : i + n] for i in range(max(1, len(padded) - n + 1)))
+        return grams
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for gram in self._ngrams(text):
+                hashed = zlib.crc32(gram.encode("utf-8"))
+                matrix[row, hashed % self.dim] += 1.0 if (hashed >> 31) & 1 else -1.0
+        return _l2_normalize(matrix)
+
+
+def _l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
+
+
+class EmbeddingRouterIndex:
+    """All intent seed phrases of one tenant as a contiguous, L2-normalized float32 matrix."""
+
+    def __init__(self, intents_config: dict[str, Any], embedder: Embedder, cache_dir: Path | None = None) -> None:
+        self.intent_names: list[str] = []
+        phrases: list[str] = []
+        row_intents: list[int] = []
+        for intent_name, intent_meta in intents_config.get("intents", {}).items():
+            seed_phrases = [str(p) for p in intent_meta.get("examples") or intent_meta.get("keywords") or [] if str(p).strip()]
+            if not seed_phrases:
+                continue
+            intent_idx = len(self.intent_names)
+            self.intent_names.append(intent_name)
+            phrases.extend(seed_phrases)
+            row_intents.extend([intent_idx] * len(seed_phrases))
+
+        self.row_intents = np.asarray(row_intents, dtype=np.int32)
+        self.matrix = self._load_or_embed(phrases, intents_config, embedder, cache_dir)
+
+    @staticmethod
+    def _load_or_embed(
+        phrases: list[str], intents_config: dict[str, Any], embedder: Embedder, cache_dir: Path | None
+    ) -> np.ndarray:
+        if not phrases:
+            return np.zeros((0, embedder.dim), dtype=np.float32)
+
+        cache_path = None
+        if cache_dir is not None:
+            cache_path = cache_dir / f"{embedder.signature}-{config_fingerprint(intents_config)}.npy"
+            if cache_path.exists():
+                try:
+                    cached = np.load(cache_path, mmap_mode="r")
+                    if cached.shape == (len(phrases), embedder.dim):
+                        return cached
+                except (OSError, ValueError):
+                    pass  # corrupt cache file, recompute below
+
+        matrix = np.ascontiguousarray(embedder.embed(phrases), dtype=np.float32)
+        if cache_path is not None:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_name(f"{cache_path.stem}.{os.getpid()}.tmp.npy")
+            np.save(tmp_path, matrix)
+            tmp_path.replace(cache_path)
+        return matrix
+
+    def search(self, query_vector: np.ndarray, top_k: int = 3) -> list[tuple[str, float]]:
+        """Best cosine similarity per intent for the `top_k` closest seed phrases."""
+        if self.matrix.shape[0] == 0:
+            return []
+        scores = self.matrix @ query_vector
+        k = min(top_k, scores.shape[0])
+        top_rows = np.argpartition(-scores, k - 1)[:k]
+        top_rows = top_rows[np.argsort(-scores[top_rows], kind="stable")]
+
+        results: list[tuple[str, float]] = []
+        seen: set[int] = set()
+        for row in top_rows:
+            intent_idx = int(self.row_intents[row])
+            if intent_idx in seen:
+                continue
+            seen.add(intent_idx)
+            results.append((self.intent_names[intent_idx], float(scores[row])))
+        return results
+
+
+class EmbeddingRouter:
+    """Per-tenant embedding indexes for one embedder, optionally persisted under `cache_dir`."""
+
+    def __init__(self, embedder: Embedder | None = None, cache_dir: Path | None = None) -> None:
+        self.embedder = embedder or HashingNgramEmbedder()
+        self.cache_dir = cache_dir
+        self._indexes: CompiledConfigCache[EmbeddingRouterIndex] = CompiledConfigCache(
+            lambda intents_config: EmbeddingRouterIndex(intents_config, self.embedder, self.cache_dir)
+        )
+
+    def index_for(self, intents_config: dict[str, Any]) -> EmbeddingRouterIndex:
+        return self._indexes.get(intents_config)
+
+    def invalidate(self, intents_config: dict[str, Any] | None = None) -> None:
+        self._indexes.invalidate(intents_config)
+
+    def search(self, message: str, intents_config: dict[str, Any], top_k: int = 3) -> list[tuple[str, float]]:
+        return self.search_many([message], intents_config, top_k=top_k)[0]
+
+    def search_many(
+        self, messages: list[str], intents_config: dict[str, Any], top_k: int = 3
+    ) -> list[list[tuple[str, float]]]:
+        """Embed all non-blank messages in one call, then score each against the tenant index."""
+        index = self.index_for(intents_config)
+        results: list[list[tuple[str, float]]] = [[] for _ in messages]
+        positions = [i for i, message in enumerate(messages) if message.strip()]
+        if not positions:
+            return results
+        queries = self.embedder.embed([messages[i] for i in positions])
+        for row, position in enumerate(positions):
+            results[position] = index.search(queries[row], top_k=top_k)
+        return results
+
+
+_default_router: EmbeddingRouter | None = None
+
+
+def get_default_embedding_router() -> EmbeddingRouter:
+    global _default_router
+    if _default_router is None:
+        from src.config import settings
+
+        cache_dir = Path(settings.embedding_cache_dir) if settings.embedding_cache_dir else None
+        _default_router = EmbeddingRouter(cache_dir=cache_dir)
+    return _default_router
+
+
+def embedding_route(
+    message: str,
+    intents_config: dict[str, Any],
+    router: EmbeddingRouter | None = None,
+    min_similarity: float = DEFAULT_MIN_SIMILARITY,
+) -> RoutingDecision | None:
+    """Nearest-example routing on local embeddings; None below `min_similarity`."""
+    matches = (router or get_default_embedding_router()).search(message, intents_config, top_k=3)
+    return decision_from_matches(matches, intents_config, min_similarity=min_similarity)
+
+
+def decision_from_matches(
+    matches: list[tuple[str, float]],
+    intents_config: dict[str, Any],
+    min_similarity: float = DEFAULT_MIN_SIMILARITY,
+) -> RoutingDecision | None:
+    if not matches:
+        return None
+
+    best_intent, similarity = matches[0]
+    if similarity < min_similarity:
+        return None
+
+    meta = intents_config.get("intents", {})[best_intent]
+    tier = Tier(meta.get("default_tier", Tier.TIER_2.value))
+    return RoutingDecision(
+        intent=best_intent,
+        tier=tier,
+        risk_level=RiskLevel(meta.get("risk_level", RiskLevel.MEDIUM.value)),
+        confidence=round(clamp_confidence(similarity), 3),
+        rationale=f"embedding similarity {similarity:.2f} for intent '{best_intent}'",
+        grounding_mode=GroundingMode(meta.get("grounding_mode", GroundingMode.OPEN.value)),
+        plugins_to_load=list(meta.get("plugins", [])),
+        should_delegate=tier == Tier.TIER_3,
+    )
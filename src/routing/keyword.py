@@ -1,42 +1,149 @@
 from __future__ import annotations
 
-import re
-from functools import lru_cache
+from collections import deque
 from typing import Any
 
 from src.routing.models import GroundingMode, RiskLevel, RoutingDecision, Tier
+from src.tenant.compiled import CompiledConfigCache
 
-WORD_BOUNDARY_TEMPLATE = r"(?<!\w){token}(?!\w)"
 
+def _is_word_char(char: str) -> bool:
+    # Same character class as the regex `\w` for str patterns.
+    return char.isalnum() or char == "_"
 
-@lru_cache(maxsize=1024)
-def _compile_keyword_pattern(keyword: str) -> re.Pattern[str]:
-    escaped = re.escape(keyword.strip().lower())
-    if not escaped:
-        return re.compile(r"a^")
-    pattern = WORD_BOUNDARY_TEMPLATE.format(token=escaped)
-    return re.compile(pattern, flags=re.IGNORECASE)
+
+def _normalize_keyword(keyword: Any) -> str:
+    return str(keyword).strip().lower()
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over all keywords of one intents config.
+
+    A single pass over the message finds every keyword occurrence (including
+    overlapping ones such as "kurs buchen" and "buchen") and applies the same
+    word-boundary rule as `(?<!\\w)keyword(?!\\w)`. Cost is O(len(text) + hits),
+    independent of the number of keywords.
+    """
+
+    def __init__(self, intents_config: dict[str, Any]) -> None:
+        intents = intents_config.get("intents", {})
+
+        # intent -> number of configured keywords (duplicates and empty entries included)
+        self.keyword_totals: dict[str, int] = {}
+        # normalized keyword -> [(intent, multiplicity)]
+        self._postings: dict[str, list[tuple[str, int]]] = {}
+
+        for intent_name, intent_meta in intents.items():
+            keywords = intent_meta.get("keywords", [])
+            if not keywords:
+                continue
+            self.keyword_totals[intent_name] = len(keywords)
+
+            counts: dict[str, int] = {}
+            for keyword in keywords:
+                normalized = _normalize_keyword(keyword)
+                if normalized:
+                    counts[normalized] = counts.get(normalized, 0) + 1
+            for normalized, multiplicity in counts.items():
+                self._postings.setdefault(normalized, []).append((intent_name, multiplicity))
+
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[tuple[str, ...]] = [()]
+        self._build_automaton()
+
+    def _build_automaton(self) -> None:
+        for keyword in self._postings:
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            self._output[state] = (*self._output[state], keyword)
+
+        queue: deque[int] = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = (*self._output[child], *self._output[self._fail[child]])
+
+    def matched_keywords(self, text: str) -> set[str]:
+        """Return the normalized keywords found in `text` (expected lower-cased)."""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        text_len = len(text)
+
+        found: set[str] = set()
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not output[state]:
+                continue
+
+            after_ok = index + 1 >= text_len or not _is_word_char(text[index + 1])
+            for keyword in output[state]:
+                if keyword in found:
+                    continue
+                start = index - len(keyword) + 1
+                before_ok = start == 0 or not _is_word_char(text[start - 1])
+                if before_ok and after_ok:
+                    found.add(keyword)
+        return found
+
+    def intent_hits(self, text: str) -> dict[str, int]:
+        """Per-intent count of matched keyword entries, in one pass over `text`."""
+        hits: dict[str, int] = {}
+        for keyword in self.matched_keywords(text):
+            for intent_name, multiplicity in self._postings[keyword]:
+                hits[intent_name] = hits.get(intent_name, 0) + multiplicity
+        return hits
+
+
+_MATCHER_CACHE: CompiledConfigCache[KeywordMatcher] = CompiledConfigCache(KeywordMatcher)
+
+
+def get_keyword_matcher(intents_config: dict[str, Any]) -> KeywordMatcher:
+    """Return the compiled matcher for `intents_config`, building it on first use."""
+    return _MATCHER_CACHE.get(intents_config)
+
+
+def invalidate_keyword_matchers(intents_config: dict[str, Any] | None = None) -> None:
+    _MATCHER_CACHE.invalidate(intents_config)
 
 
 def keyword_route(message: str, intents_config: dict[str, Any]) -> RoutingDecision | None:
     text = message.lower()
     intents = intents_config.get("intents", {})
+    matcher = get_keyword_matcher(intents_config)
+    hits = matcher.intent_hits(text)
+    if not hits:
+        return None
 
     best_intent: str | None = None
     best_score = 0.0
     best_match_count = 0
 
-    for intent_name, intent_meta in intents.items():
-        keywords = intent_meta.get("keywords", [])
-        if not keywords:
-            continue
-
-        patterns = [_compile_keyword_pattern(str(keyword)) for keyword in keywords]
-        matches = sum(1 for pattern in patterns if pattern.search(text))
+    # Iterate in config order so ties resolve to the first declared intent.
+    for intent_name, total in matcher.keyword_totals.items():
+        matches = hits.get(intent_name, 0)
         if matches == 0:
             continue
 
-        score = matches / len(patterns)
+        score = matches / total
         if score > best_score:
             best_score = score
             best_intent = intent_name
@@ -5,6 +5,7 @@ from typing import Any
 
 from src.routing.confidence import clamp_confidence
 from src.routing.models import GroundingMode, RiskLevel, RoutingDecision, Tier
+from src.tenant.compiled import CompiledConfigCache
 
 TOKEN_PATTERN = re.compile(r"\w+", flags=re.UNICODE)
 
@@ -13,6 +14,66 @@ def _tokenize(text: str) -> set[str]:
     return {token.lower() for token in TOKEN_PATTERN.findall(text)}
 
 
+class SemanticRouterIndex:
+    """Inverted index over intent seed tokens (token -> intents postings).
+
+    Seed tokens come from intent `examples`, falling back to `keywords`.
+    Scoring only touches intents that share a token with the message.
+    """
+
+    def __init__(self, intents_config: dict[str, Any]) -> None:
+        self.intent_names: list[str] = []
+        self.candidate_sizes: list[int] = []
+        self.postings: dict[str, list[int]] = {}
+
+        for intent_name, intent_meta in intents_config.get("intents", {}).items():
+            seed_phrases = intent_meta.get("examples") or intent_meta.get("keywords") or []
+            candidate_tokens: set[str] = set()
+            for phrase in seed_phrases:
+                candidate_tokens.update(_tokenize(str(phrase)))
+            if not candidate_tokens:
+                continue
+
+            intent_idx = len(self.intent_names)
+            self.intent_names.append(intent_name)
+            self.candidate_sizes.append(len(candidate_tokens))
+            for token in candidate_tokens:
+                self.postings.setdefault(token, []).append(intent_idx)
+
+    def best_match(self, message_tokens: set[str]) -> tuple[str, float] | None:
+        """Return (intent, overlap) with the highest overlap; ties go to the first declared intent."""
+        overlaps: dict[int, int] = {}
+        for token in message_tokens:
+            for intent_idx in self.postings.get(token, ()):
+                overlaps[intent_idx] = overlaps.get(intent_idx, 0) + 1
+        if not overlaps:
+            return None
+
+        best_idx = -1
+        best_overlap = 0.0
+        for intent_idx, shared in overlaps.items():
+            overlap = shared / self.candidate_sizes[intent_idx]
+            if overlap > best_overlap or (overlap == best_overlap and intent_idx < best_idx):
+                best_overlap = overlap
+                best_idx = intent_idx
+
+        if best_idx < 0:
+            return None
+        return self.intent_names[best_idx], best_overlap
+
+
+_INDEX_CACHE: CompiledConfigCache[SemanticRouterIndex] = CompiledConfigCache(SemanticRouterIndex)
+
+
+def get_semantic_index(intents_config: dict[str, Any]) -> SemanticRouterIndex:
+    """Return the cached index for `intents_config`, building it on first use."""
+    return _INDEX_CACHE.get(intents_config)
+
+
+def invalidate_semantic_indexes(intents_config: dict[str, Any] | None = None) -> None:
+    _INDEX_CACHE.invalidate(intents_config)
+
+
 def semantic_route(message: str, intents_config: dict[str, Any]) -> RoutingDecision | None:
     """Simple lexical-overlap semantic fallback.
 
@@ -22,31 +83,12 @@ def semantic_route(message: str, intents_config: dict[str, Any]) -> RoutingDecis
     if not message_tokens:
         return None
 
-    intents = intents_config.get("intents", {})
-    best_intent: str | None = None
-    best_overlap = 0.0
-
-    for intent_name, intent_meta in intents.items():
-        seed_phrases = intent_meta.get("examples") or intent_meta.get("keywords") or []
-        if not seed_phrases:
-            continue
-
-        candidate_tokens: set[str] = set()
-        for phrase in seed_phrases:
-            candidate_tokens.update(_tokenize(str(phrase)))
-
-        if not candidate_tokens:
-            continue
-
-        overlap = len(message_tokens & candidate_tokens) / len(candidate_tokens)
-        if overlap > best_overlap:
-            best_overlap = overlap
-            best_intent = intent_name
-
-    if not best_intent or best_overlap <= 0:
+    match = get_semantic_index(intents_config).best_match(message_tokens)
+    if match is None:
         return None
+    best_intent, best_overlap = match
 
-    meta = intents[best_intent]
+    meta = intents_config.get("intents", {})[best_intent]
     return RoutingDecision(
         intent=best_intent,
         tier=Tier(meta.get("default_tier", Tier.TIER_2.value)),
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import pickle
+from dataclasses import fields
+from pathlib import Path
+
+from src.tenant.models import Tenant, TenantConfig
+
+BUNDLE_MAGIC = b"NXTB"
+BUNDLE_FORMAT_VERSION = 1
+BUNDLE_SUFFIX = ".bundle"
+_HASH_SIZE = 16
+_HEADER_SIZE = len(BUNDLE_MAGIC) + 1 + 2 * _HASH_SIZE
+
+
+def _schema_hash() -> bytes:
+    schema = repr(
+        (
+            BUNDLE_FORMAT_VERSION,
+            [(f.name, str(f.type)) for f in fields(Tenant)],
+            [(f.name, str(f.type)) for f in fields(TenantConfig)],
+        )
+    )
+    return hashlib.blake2b(schema.encode("utf-8"), digest_size=_HASH_SIZE).digest()
+
+
+SCHEMA_HASH = _schema_hash()
+
+
+def compute_source_hash(paths: list[Path]) -> bytes:
+    """Content hash of the YAML files a merged config was built from (missing files included)."""
+    digest = hashlib.blake2b(digest_size=_HASH_SIZE)
+    for path in paths:
+        digest.update(str(path.name).encode("utf-8"))
+        try:
+            digest.update(path.read_bytes())
+        except FileNotFoundError:
+            digest.update(b"\x00missing")
+        digest.update(b"\x00")
+    return digest.digest()
+
+
+def bundle_path(bundle_root: Path, tenant_id: str) -> Path:
+    return bundle_root / f"{tenant_id}{BUNDLE_SUFFIX}"
+
+
+def write_bundle(path: Path, config: TenantConfig, source_hash: bytes) -> None:
+    """Write `config` as a versioned snapshot: magic, format version, schema hash, source hash, pickle."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = pickle.dumps(config, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with tmp_path.open("wb") as handle:
+        handle.write(BUNDLE_MAGIC)
+        handle.write(bytes([BUNDLE_FORMAT_VERSION]))
+        handle.write(SCHEMA_HASH)
+        handle.write(source_hash)
+        handle.write(payload)
+    tmp_path.replace(path)
+
+
+def read_bundle(path: Path, expected_source_hash: bytes) -> TenantConfig | None:
+    """Load a snapshot via mmap; None when missing, corrupt, from another schema, or stale.
+
+    Bundles are trusted build artifacts written by scripts/compile_tenant_bundles.py
+    next to the YAML they were compiled from.
+    """
+    try:
+        with path.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if len(mapped) <= _HEADER_SIZE or mapped[: len(BUNDLE_MAGIC)] != BUNDLE_MAGIC:
+                return None
+            offset = len(BUNDLE_MAGIC)
+            if mapped[offset] != BUNDLE_FORMAT_VERSION:
+                return None
+            offset += 1
+            if mapped[offset : offset + _HASH_SIZE] != SCHEMA_HASH:
+                return None
+            offset += _HASH_SIZE
+            if mapped[offset : offset + _HASH_SIZE] != expected_source_hash:
+                return None
+            offset += _HASH_SIZE
+            with memoryview(mapped) as view, view[offset:] as payload:
+                config = pickle.loads(payload)
+    # OSError: unreadable/truncated file; ImportError/AttributeError: pickled class moved or renamed;
+    # TypeError/KeyError/IndexError: corrupt payload failing inside a reduce call
+    except (OSError, ValueError, TypeError, KeyError, IndexError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    return config if isinstance(config, TenantConfig) else None
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+# a JSON-compatible config value: usually a dict section, sometimes a list (e.g. KB entries)
+ConfigSection = dict[str, Any] | list[Any]
+
+
+def config_fingerprint(section: Any) -> str:
+    """Stable content hash of a (JSON-compatible) config section."""
+    encoded = json.dumps(section, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+class CompiledConfigCache(Generic[T]):
+    """Memoizes objects compiled from a tenant config section (a dict or a list).
+
+    Lookups hit on object identity first; the hit is only used while the
+    section's `repr` still equals the snapshot taken when it was compiled, so
+    in-place edits are picked up (a C-level repr is about half the cost of the
+    content fingerprint). A new or edited section is fingerprinted by content:
+    a reload with identical data reuses the compiled object, changed data gets
+    compiled fresh.
+    """
+
+    def __init__(self, build: Callable[[Any], T], maxsize: int = 256) -> None:
+        self._build = build
+        self.maxsize = maxsize
+        # id(section) -> (section, fingerprint, repr snapshot); holding the section keeps its id from being reused
+        self._by_identity: OrderedDict[int, tuple[ConfigSection, str, str]] = OrderedDict()
+        self._by_fingerprint: OrderedDict[str, T] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, section: ConfigSection) -> T:
+        snapshot = repr(section)
+        with self._lock:
+            entry = self._by_identity.get(id(section))
+            if entry is not None and entry[0] is section and entry[2] == snapshot:
+                compiled = self._by_fingerprint.get(entry[1])
+                if compiled is not None:
+                    self._by_identity.move_to_end(id(section))
+                    self._by_fingerprint.move_to_end(entry[1])
+                    return compiled
+
+        fingerprint = config_fingerprint(section)
+        with self._lock:
+            compiled = self._by_fingerprint.get(fingerprint)
+        if compiled is None:
+            compiled = self._build(section)
+
+        with self._lock:
+            compiled = self._by_fingerprint.setdefault(fingerprint, compiled)
+            self._by_fingerprint.move_to_end(fingerprint)
+            self._by_identity[id(section)] = (section, fingerprint, snapshot)
+            self._by_identity.move_to_end(id(section))
+            while len(self._by_fingerprint) > self.maxsize:
+                self._by_fingerprint.popitem(last=False)
+            while len(self._by_identity) > self.maxsize:
+                self._by_identity.popitem(last=False)
+        return compiled
+
+    def invalidate(self, section: ConfigSection | None = None) -> None:
+        """Drop the entry for `section`, or everything when no section is given."""
+        with self._lock:
+            if section is None:
+                self._by_identity.clear()
+                self._by_fingerprint.clear()
+                return
+            entry = self._by_identity.pop(id(section), None)
+            fingerprint = entry[1] if entry is not None and entry[0] is section else config_fingerprint(section)
+            self._by_fingerprint.pop(fingerprint, None)
+
+    def __len__(self) -> int:
+        return len(self._by_fingerprint)
+
+
+_FINGERPRINTS: CompiledConfigCache[str] = CompiledConfigCache(config_fingerprint, maxsize=1024)
+
+
+def cached_fingerprint(section: dict[str, Any]) -> str:
+    """`config_fingerprint` memoized on section identity (cheap for an already-seen, unchanged config)."""
+    return _FINGERPRINTS.get(section)
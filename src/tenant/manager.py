@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 import json
+import os
 import re
-from dataclasses import fields
+import threading
+from collections import OrderedDict
+from copy import deepcopy
+from dataclasses import dataclass, fields
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 try:
     import yaml  # type: ignore
@@ -12,6 +16,7 @@ except ModuleNotFoundError:  # pragma: no cover
     yaml = None
 
 from src.config import settings
+from src.tenant.bundle import bundle_path, compute_source_hash, read_bundle
 from src.tenant.models import Tenant, TenantConfig, TenantContext, TenantMembership
 
 
@@ -29,16 +34,66 @@ class TenantIdError(ValueError):
 
 LIST_MERGE_KEYS = {"scopes", "allowed_channels", "keywords"}
 TENANT_ID_PATTERN = re.compile(r"^[a-zA-Z0-9_-]+$")
+MERGED_CONFIG_FILES = ("intents.yaml", "tools.yaml", "channels.yaml", "prompt_template.yaml")
+
+FileSignature = tuple[int, int, int] | None
+
+
+def _file_signature(path: Path) -> FileSignature:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def _invalidate_routing_decisions(tenant_id: str) -> None:
+    from src.routing.cache import get_decision_cache
+
+    get_decision_cache().invalidate_tenant(tenant_id)
+
+
+@dataclass(frozen=True)
+class _CachedTenantConfig:
+    signature: tuple[FileSignature, ...]
+    config: TenantConfig
 
 
 class TenantManager:
-    """Loads tenant-aware configuration with defaults + override merging."""
+    """Loads tenant-aware configuration with defaults + override merging.
 
-    def __init__(self, config_root: Path | None = None, default_tenant_id: str | None = None) -> None:
+    Merged configs are cached per tenant (LRU, `max_cached_tenants`) and
+    revalidated on every load by the mtime/size/inode of the files they were
+    built from. A reload swaps in a complete new TenantConfig, so readers see
+    either the old or the new object, never a partial one. Returned configs
+    are shared and must be treated as read-only. Parsed defaults are shared
+    across tenants.
+
+    With `bundle_root` set, a cache miss first tries the tenant's compiled
+    snapshot (see scripts/compile_tenant_bundles.py) and falls back to YAML
+    when the snapshot is missing or stale.
+    """
+
+    def __init__(
+        self,
+        config_root: Path | None = None,
+        default_tenant_id: str | None = None,
+        max_cached_tenants: int = 1024,
+        on_reload: Callable[[str], None] | None = _invalidate_routing_decisions,
+        bundle_root: Path | None = None,
+    ) -> None:
         self.config_root = config_root or Path("configs")
         self.defaults_root = self.config_root / "defaults"
         self.tenants_root = self.config_root / "tenants"
         self.default_tenant_id = default_tenant_id or settings.default_tenant_id
+        self.max_cached_tenants = max_cached_tenants
+        self.on_reload = on_reload
+        if bundle_root is None and settings.tenant_bundle_dir:
+            bundle_root = Path(settings.tenant_bundle_dir)
+        self.bundle_root = bundle_root
+        self._config_cache: OrderedDict[str, _CachedTenantConfig] = OrderedDict()
+        self._defaults_cache: dict[Path, tuple[FileSignature, dict[str, Any]]] = {}
+        self._lock = threading.Lock()
 
     def resolve_tenant_id(self, membership: TenantMembership | None = None, tenant_id: str | None = None) -> str:
         if tenant_id:
@@ -72,6 +127,60 @@ class TenantManager:
         if not tenant_root.exists():
             raise TenantNotFoundError(f"Tenant '{tenant_id}' not found in {self.tenants_root}")
 
+        signature = self._config_signature(tenant_root)
+        with self._lock:
+            cached = self._config_cache.get(tenant_id)
+            if cached is not None and cached.signature == signature:
+                self._config_cache.move_to_end(tenant_id)
+                return cached.config
+
+        config = self._load_bundle(tenant_id, tenant_root) or self._build_tenant_config(tenant_id, tenant_root)
+        with self._lock:
+            self._config_cache[tenant_id] = _CachedTenantConfig(signature=signature, config=config)
+            self._config_cache.move_to_end(tenant_id)
+            while len(self._config_cache) > self.max_cached_tenants:
+                self._config_cache.popitem(last=False)
+
+        if cached is not None and self.on_reload is not None:
+            self.on_reload(tenant_id)
+        return config
+
+    def invalidate(self, tenant_id: str | None = None) -> None:
+        """Force a re-read of one tenant (or all tenants and defaults) on next load."""
+        with self._lock:
+            if tenant_id is None:
+                self._config_cache.clear()
+                self._defaults_cache.clear()
+            else:
+                self._config_cache.pop(tenant_id, None)
+
+    def cached_tenant_ids(self) -> list[str]:
+        with self._lock:
+            return list(self._config_cache)
+
+    def source_paths(self, tenant_root: Path) -> list[Path]:
+        """All files a tenant's merged config is built from."""
+        paths = [tenant_root / "tenant.yaml"]
+        for filename in MERGED_CONFIG_FILES:
+            paths.append(self.defaults_root / filename)
+            paths.append(tenant_root / filename)
+        return paths
+
+    def _config_signature(self, tenant_root: Path) -> tuple[FileSignature, ...]:
+        return tuple(_file_signature(path) for path in self.source_paths(tenant_root))
+
+    def _load_bundle(self, tenant_id: str, tenant_root: Path) -> TenantConfig | None:
+        if self.bundle_root is None:
+            return None
+        source_hash = compute_source_hash(self.source_paths(tenant_root))
+        return read_bundle(bundle_path(self.bundle_root, tenant_id), source_hash)
+
+    def build_tenant_config(self, tenant_id: str) -> TenantConfig:
+        """Merge a tenant's config from YAML, bypassing cache and bundles."""
+        self._validate_tenant_id(tenant_id)
+        return self._build_tenant_config(tenant_id, (self.tenants_root / tenant_id).resolve())
+
+    def _build_tenant_config(self, tenant_id: str, tenant_root: Path) -> TenantConfig:
         tenant_data = self._read_yaml(tenant_root / "tenant.yaml")
         tenant = self._validate_tenant_data(tenant_id, tenant_data)
 
@@ -113,10 +222,22 @@ class TenantManager:
             raise TenantConfigError(f"Invalid tenant.yaml for '{tenant_id}': {exc}") from exc
 
     def _merge_default_and_tenant(self, filename: str, tenant_root: Path) -> dict[str, Any]:
-        default_data = self._read_yaml(self.defaults_root / filename)
+        # Copy the shared parsed defaults so merged configs never alias each other.
+        default_data = deepcopy(self._read_default_yaml(self.defaults_root / filename))
         tenant_data = self._read_yaml(tenant_root / filename, allow_missing=True)
         return self._deep_merge(default_data, tenant_data)
 
+    def _read_default_yaml(self, path: Path) -> dict[str, Any]:
+        signature = _file_signature(path)
+        with self._lock:
+            cached = self._defaults_cache.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        data = self._read_yaml(path)
+        with self._lock:
+            self._defaults_cache[path] = (signature, data)
+        return data
+
     def _read_yaml(self, path: Path, allow_missing: bool = False) -> dict[str, Any]:
         if not path.exists():
             if allow_missing:
@@ -34,3 +34,4 @@ class TenantContext:
     tenant_id: str
     config: TenantConfig
     metadata: dict[str, Any] = field(default_factory=dict)
+    risk_mapping: dict[str, str] = field(default_factory=dict)
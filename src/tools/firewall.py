@@ -1,41 +1,174 @@
 from __future__ import annotations
 
 import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
 from typing import Any
 
-from src.tools.registry import ToolRegistry
+from src.tenant.compiled import CompiledConfigCache
+from src.tools.registry import ToolRegistrySnapshot, get_registry_snapshot
 
-PROMPT_INJECTION_PATTERNS = [
-    re.compile(r"\b(ignore|disregard|override)\b.{0,40}\b(instruction|previous|system)\b", re.IGNORECASE),
-    re.compile(r"\byou are now\b", re.IGNORECASE),
-]
+PROMPT_INJECTION_RULES: dict[str, str] = {
+    "prompt_injection.ignore_instructions": r"\b(?:ignore|disregard|override)\b.{0,40}\b(?:instruction|previous|system)\b",
+    "prompt_injection.role_override": r"\byou are now\b",
+}
+PROMPT_INJECTION_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in PROMPT_INJECTION_RULES.values()]
 
 SHELL_INJECTION_PATTERN = re.compile(r"(?:;|&&|\|\||`|\$\(|\n)")
 SHELL_LIKE_ARG_KEYS = {"command", "cmd", "script", "query"}
 
+DEFAULT_MAX_STRING_CHARS = 32_768
+DEFAULT_MAX_DEPTH = 16
+
+
+def _group_name(index: int) -> str:
+    return f"r{index}"
+
+
+# one alternation instead of one search per pattern; group name -> rule name
+_RULE_BY_GROUP = {_group_name(i): rule for i, rule in enumerate(PROMPT_INJECTION_RULES)}
+_COMBINED_INJECTION_PATTERN = re.compile(
+    "|".join(f"(?P<{_group_name(i)}>{pattern})" for i, pattern in enumerate(PROMPT_INJECTION_RULES.values())),
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True)
+class FirewallViolation:
+    rule: str
+    path: str
+    detail: str = ""
+
+
+@dataclass
+class FirewallResult:
+    allowed: bool
+    violations: list[FirewallViolation] = field(default_factory=list)
+
+    @property
+    def reasons(self) -> list[str]:
+        return [f"{v.rule} at {v.path}" if v.path else v.rule for v in self.violations]
+
 
 def _looks_like_injection(value: str) -> bool:
-    return any(pattern.search(value) for pattern in PROMPT_INJECTION_PATTERNS)
+    return _COMBINED_INJECTION_PATTERN.search(value) is not None
 
 
-def validate_tool_call(tool_name: str, args: dict[str, Any], tenant_tools_config: dict[str, Any]) -> bool:
-    if not isinstance(args, dict):
-        return False
+class ToolCallFirewall:
+    """Per-tenant firewall compiled once from the tenant tools config.
+
+    All string leaves of the arguments (nested dicts/lists included) are scanned
+    in one traversal with the combined injection pattern; shell metacharacters
+    are only checked in values under shell-like keys. Of strings longer than
+    `max_string_chars` only the first and last `max_string_chars // 2`
+    characters are scanned; tools with `firewall: {reject_long_arguments: true}`
+    reject such strings instead. Nesting deeper than `max_depth` is rejected.
+    `rule_counts` records how often each rule fired.
+    """
 
-    enabled_tools = ToolRegistry(tenant_tools_config).enabled_tools()
-    tool_cfg = enabled_tools.get(tool_name)
-    if not tool_cfg:
-        return False
+    def __init__(
+        self,
+        tenant_tools_config: dict[str, Any],
+        max_string_chars: int = DEFAULT_MAX_STRING_CHARS,
+        max_depth: int = DEFAULT_MAX_DEPTH,
+    ) -> None:
+        self.registry: ToolRegistrySnapshot = get_registry_snapshot(tenant_tools_config)
+        self.max_string_chars = max_string_chars
+        self.max_depth = max_depth
+        self.reject_long_arguments = frozenset(
+            str(name)
+            for name, cfg in (tenant_tools_config.get("tools") or {}).items()
+            if ((cfg or {}).get("firewall") or {}).get("reject_long_arguments")
+        )
+        self.rule_counts: Counter[str] = Counter()
+        self._counts_lock = threading.Lock()
 
-    for key, value in args.items():
-        if not isinstance(value, str):
-            continue
+    def check(self, tool_name: str, args: Any) -> FirewallResult:
+        if not isinstance(args, dict):
+            return self._result([FirewallViolation(rule="invalid_arguments", path="", detail=type(args).__name__)])
+        if not self.registry.is_enabled(tool_name):
+            return self._result([FirewallViolation(rule="tool_disabled", path="", detail=tool_name)])
+        return self._result(self._scan(args, reject_long=tool_name in self.reject_long_arguments))
 
-        if _looks_like_injection(value):
-            return False
+    def scan(self, args: Any) -> FirewallResult:
+        """Argument checks only, for callers that verified tool enablement themselves."""
+        if not isinstance(args, dict):
+            return self._result([FirewallViolation(rule="invalid_arguments", path="", detail=type(args).__name__)])
+        return self._result(self._scan(args))
 
-        # command injection checks are scoped to shell-like fields only
-        if key.lower() in SHELL_LIKE_ARG_KEYS and SHELL_INJECTION_PATTERN.search(value):
-            return False
+    def stats(self) -> dict[str, int]:
+        with self._counts_lock:
+            return dict(self.rule_counts)
 
-    return True
+    def _result(self, violations: list[FirewallViolation]) -> FirewallResult:
+        if violations:
+            with self._counts_lock:
+                self.rule_counts.update(v.rule for v in violations)
+        return FirewallResult(allowed=not violations, violations=violations)
+
+    def _scan(self, args: dict[str, Any], reject_long: bool = False) -> list[FirewallViolation]:
+        violations: list[FirewallViolation] = []
+        # (value, path, depth, shell_like)
+        stack: list[tuple[Any, str, int, bool]] = [(args, "", 0, False)]
+        while stack:
+            value, path, depth, shell_like = stack.pop()
+            if isinstance(value, str):
+                violations.extend(self._scan_string(value, path, shell_like, reject_long))
+                continue
+            if not isinstance(value, (dict, list, tuple)):
+                continue
+            if depth >= self.max_depth:
+                violations.append(FirewallViolation(rule="argument_too_deep", path=path))
+                continue
+            if isinstance(value, dict):
+                for key, child in value.items():
+                    key_text = str(key)
+                    child_path = f"{path}.{key_text}" if path else key_text
+                    # command injection checks are scoped to shell-like fields only
+                    stack.append((child, child_path, depth + 1, shell_like or key_text.lower() in SHELL_LIKE_ARG_KEYS))
+            else:
+                for index, child in enumerate(value):
+                    stack.append((child, f"{path}[{index}]", depth + 1, shell_like))
+        return violations
+
+    def _scan_string(self, value: str, path: str, shell_like: bool, reject_long: bool = False) -> list[FirewallViolation]:
+        parts = (value,)
+        if len(value) > self.max_string_chars:
+            if reject_long:
+                return [FirewallViolation(rule="argument_too_long", path=path, detail=str(len(value)))]
+            # bounded scan of head and tail: injected instructions sit at the start or end of a payload
+            half = self.max_string_chars // 2
+            parts = (value[:half], value[-half:])
+
+        violations: list[FirewallViolation] = []
+        seen: set[str] = set()
+        for part in parts:
+            for match in _COMBINED_INJECTION_PATTERN.finditer(part):
+                rule = _RULE_BY_GROUP[match.lastgroup or ""]
+                if rule not in seen:
+                    seen.add(rule)
+                    violations.append(FirewallViolation(rule=rule, path=path, detail=match.group(0)[:80]))
+        if shell_like:
+            for part in parts:
+                match = SHELL_INJECTION_PATTERN.search(part)
+                if match is not None:
+                    violations.append(FirewallViolation(rule="shell_injection", path=path, detail=repr(match.group(0))))
+                    break
+        return violations
+
+
+_FIREWALLS: CompiledConfigCache[ToolCallFirewall] = CompiledConfigCache(ToolCallFirewall)
+
+
+def get_firewall(tenant_tools_config: dict[str, Any]) -> ToolCallFirewall:
+    """Compiled firewall for a tenant tools config (shared while the config is unchanged)."""
+    return _FIREWALLS.get(tenant_tools_config)
+
+
+def inspect_tool_call(tool_name: str, args: dict[str, Any], tenant_tools_config: dict[str, Any]) -> FirewallResult:
+    return get_firewall(tenant_tools_config).check(tool_name, args)
+
+
+def validate_tool_call(tool_name: str, args: dict[str, Any], tenant_tools_config: dict[str, Any]) -> bool:
+    return inspect_tool_call(tool_name, args, tenant_tools_config).allowed
@@ -1,30 +1,134 @@
 from __future__ import annotations
 
-from typing import Any
+from dataclasses import dataclass, field
+from typing import Any, Iterable
 
+from src.tenant.compiled import CompiledConfigCache
 
-def _tool_cfg(tool_name: str, tenant_tools_config: dict[str, Any]) -> dict[str, Any]:
-    return tenant_tools_config.get("tools", {}).get(tool_name, {})
+ALL_CHANNELS = 0  # channel mask of tools without `allowed_channels`
+
+
+@dataclass(frozen=True, slots=True)
+class ToolPermission:
+    scopes: frozenset[str] = frozenset()
+    channel_mask: int = ALL_CHANNELS
+    # None: fall back to the tenant's global high-risk policy
+    require_confirmation: bool | None = None
+
+
+_DEFAULT_PERMISSION = ToolPermission()
+
+
+@dataclass
+class ToolAuthorization:
+    allowed: list[str] = field(default_factory=list)
+    needs_confirmation: list[str] = field(default_factory=list)
+    denied: list[str] = field(default_factory=list)
+
+
+class PermissionTable:
+    """Per-tenant permission matrix compiled from the tools config.
+
+    Each tool maps to a frozenset of required scopes, a bitmask of allowed
+    channels and its confirmation policy; tools missing from the config need
+    no scopes and are allowed on every channel.
+    """
+
+    def __init__(self, tenant_tools_config: dict[str, Any]) -> None:
+        self.channel_bits: dict[str, int] = {}
+        self.require_confirm_for_high_risk = bool(
+            tenant_tools_config.get("global", {}).get("require_confirm_for_high_risk", True)
+        )
+        tools: dict[str, ToolPermission] = {}
+        for tool_name, cfg in (tenant_tools_config.get("tools") or {}).items():
+            cfg = cfg or {}
+            mask = ALL_CHANNELS
+            for channel in cfg.get("allowed_channels") or []:
+                mask |= self.channel_bits.setdefault(str(channel), 1 << len(self.channel_bits))
+            per_tool_required = cfg.get("require_confirmation")
+            tools[str(tool_name)] = ToolPermission(
+                scopes=frozenset(cfg.get("scopes") or []),
+                channel_mask=mask,
+                require_confirmation=per_tool_required if isinstance(per_tool_required, bool) else None,
+            )
+        self.tools = tools
+
+    def permission(self, tool_name: str) -> ToolPermission:
+        return self.tools.get(tool_name, _DEFAULT_PERMISSION)
+
+    def check_scope(self, tool_name: str, granted_scopes: Iterable[str]) -> bool:
+        return self.permission(tool_name).scopes.issubset(granted_scopes)
+
+    def check_channel(self, tool_name: str, channel: str) -> bool:
+        mask = self.permission(tool_name).channel_mask
+        return mask == ALL_CHANNELS or bool(mask & self.channel_bits.get(channel, 0))
+
+    def needs_confirmation(self, tool_name: str, risk_level: str) -> bool:
+        required = self.permission(tool_name).require_confirmation
+        if required is not None:
+            return required
+        return self.require_confirm_for_high_risk and risk_level == "high"
+
+    def check_confirmation(self, tool_name: str, confirmed: bool, risk_level: str) -> bool:
+        return confirmed or not self.needs_confirmation(tool_name, risk_level)
+
+    def authorize_many(
+        self,
+        tool_names: Iterable[str],
+        granted_scopes: Iterable[str],
+        channel: str,
+        risk_level: str,
+        confirmed: bool = False,
+    ) -> ToolAuthorization:
+        """Split `tool_names` (order kept) by scope and channel in one pass.
+
+        Tools that pass but still need user confirmation at `risk_level` are in
+        both `allowed` and `needs_confirmation`; they can be loaded, but not
+        executed before the user confirms.
+        """
+        granted = granted_scopes if isinstance(granted_scopes, frozenset) else frozenset(granted_scopes)
+        channel_bit = self.channel_bits.get(channel, 0)
+        high_risk_default = self.require_confirm_for_high_risk and risk_level == "high"
+        result = ToolAuthorization()
+        for tool_name in tool_names:
+            perm = self.tools.get(tool_name, _DEFAULT_PERMISSION)
+            if not perm.scopes <= granted or (perm.channel_mask != ALL_CHANNELS and not perm.channel_mask & channel_bit):
+                result.denied.append(tool_name)
+                continue
+            result.allowed.append(tool_name)
+            required = high_risk_default if perm.require_confirmation is None else perm.require_confirmation
+            if required and not confirmed:
+                result.needs_confirmation.append(tool_name)
+        return result
+
+
+_TABLES: CompiledConfigCache[PermissionTable] = CompiledConfigCache(PermissionTable)
+
+
+def get_permission_table(tenant_tools_config: dict[str, Any]) -> PermissionTable:
+    return _TABLES.get(tenant_tools_config)
 
 
 def check_scope(tool_name: str, granted_scopes: set[str], tenant_tools_config: dict[str, Any]) -> bool:
-    required = set(_tool_cfg(tool_name, tenant_tools_config).get("scopes", []))
-    return required.issubset(granted_scopes)
+    return get_permission_table(tenant_tools_config).check_scope(tool_name, granted_scopes)
 
 
 def check_channel(tool_name: str, channel: str, tenant_tools_config: dict[str, Any]) -> bool:
-    allowed = _tool_cfg(tool_name, tenant_tools_config).get("allowed_channels", [])
-    return channel in allowed if allowed else True
+    return get_permission_table(tenant_tools_config).check_channel(tool_name, channel)
 
 
 def check_confirmation(tool_name: str, confirmed: bool, risk_level: str, tenant_tools_config: dict[str, Any]) -> bool:
-    cfg = _tool_cfg(tool_name, tenant_tools_config)
+    return get_permission_table(tenant_tools_config).check_confirmation(tool_name, confirmed, risk_level)
 
-    per_tool_required = cfg.get("require_confirmation")
-    if isinstance(per_tool_required, bool):
-        return confirmed if per_tool_required else True
 
-    require_confirm_for_high_risk = tenant_tools_config.get("global", {}).get("require_confirm_for_high_risk", True)
-    if require_confirm_for_high_risk and risk_level == "high":
-        return confirmed
-    return True
+def authorize_many(
+    tool_names: Iterable[str],
+    granted_scopes: Iterable[str],
+    channel: str,
+    risk_level: str,
+    tenant_tools_config: dict[str, Any],
+    confirmed: bool = False,
+) -> ToolAuthorization:
+    return get_permission_table(tenant_tools_config).authorize_many(
+        tool_names, granted_scopes, channel, risk_level, confirmed=confirmed
+    )
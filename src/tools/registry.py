@@ -1,34 +1,90 @@
 from __future__ import annotations
 
-from copy import deepcopy
-from typing import Any
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from src.tenant.compiled import CompiledConfigCache
 
 CORE_TOOLS = {"human_escalation", "kb_search"}
 
 
-class ToolRegistry:
-    def __init__(self, tenant_tools_config: dict[str, Any]) -> None:
-        self.tenant_tools_config = tenant_tools_config
+def _freeze(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
 
-    def enabled_tools(self) -> dict[str, dict[str, Any]]:
-        tool_cfg = deepcopy(self.tenant_tools_config.get("tools", {}))
-        enabled = {name: cfg for name, cfg in tool_cfg.items() if cfg.get("enabled", True)}
 
-        for core_tool in CORE_TOOLS:
+@dataclass(frozen=True)
+class ToolRegistrySnapshot:
+    """Immutable, precomputed view of one tenant tools config.
+
+    Shared read-only across requests; a changed tools config compiles a new
+    snapshot instead of mutating this one.
+    """
+
+    enabled: Mapping[str, Mapping[str, Any]]
+    intent_tools: Mapping[str, tuple[str, ...]]
+    all_enabled_names: tuple[str, ...]
+
+    @classmethod
+    def from_config(cls, tenant_tools_config: dict[str, Any]) -> ToolRegistrySnapshot:
+        tool_cfg = tenant_tools_config.get("tools", {})
+        enabled = {name: _freeze(cfg) for name, cfg in tool_cfg.items() if cfg.get("enabled", True)}
+
+        for core_tool in sorted(CORE_TOOLS):
             # Only auto-add when tool is truly absent; respect explicit tenant disable.
             if core_tool not in tool_cfg:
-                enabled[core_tool] = {"enabled": True, "description": f"Implicit core tool: {core_tool}"}
+                enabled[core_tool] = _freeze({"enabled": True, "description": f"Implicit core tool: {core_tool}"})
 
-        return enabled
+        intent_tools = {
+            intent: tuple(name for name in names if name in enabled)
+            for intent, names in tenant_tools_config.get("intent_tools", {}).items()
+            if names
+        }
+        return cls(
+            enabled=MappingProxyType(enabled),
+            intent_tools=MappingProxyType(intent_tools),
+            all_enabled_names=tuple(enabled),
+        )
 
-    def get_tools_for_intent(self, intent: str) -> list[dict[str, Any]]:
-        enabled = self.enabled_tools()
-        intent_map = self.tenant_tools_config.get("intent_tools", {})
-        configured_names = intent_map.get(intent)
+    def is_enabled(self, tool_name: str) -> bool:
+        return tool_name in self.enabled
+
+    def tool_names_for_intent(self, intent: str) -> tuple[str, ...]:
+        return self.intent_tools.get(intent, self.all_enabled_names)
 
-        if configured_names:
-            selected_names = [name for name in configured_names if name in enabled]
-        else:
-            selected_names = list(enabled.keys())
 
-        return [{"name": name, **enabled[name]} for name in selected_names]
+_SNAPSHOT_CACHE: CompiledConfigCache[ToolRegistrySnapshot] = CompiledConfigCache(ToolRegistrySnapshot.from_config)
+
+
+def get_registry_snapshot(tenant_tools_config: dict[str, Any]) -> ToolRegistrySnapshot:
+    """Return the shared snapshot for `tenant_tools_config`, compiling it on first use."""
+    return _SNAPSHOT_CACHE.get(tenant_tools_config)
+
+
+class ToolRegistry:
+    def __init__(self, tenant_tools_config: dict[str, Any]) -> None:
+        self.tenant_tools_config = tenant_tools_config
+
+    @property
+    def snapshot(self) -> ToolRegistrySnapshot:
+        return get_registry_snapshot(self.tenant_tools_config)
+
+    def enabled_tools(self) -> dict[str, dict[str, Any]]:
+        """Mutable copy of the enabled tools; hot paths should read `snapshot` instead."""
+        return {name: _thaw(cfg) for name, cfg in self.snapshot.enabled.items()}
+
+    def get_tools_for_intent(self, intent: str) -> list[dict[str, Any]]:
+        snapshot = self.snapshot
+        return [{"name": name, **_thaw(snapshot.enabled[name])} for name in snapshot.tool_names_for_intent(intent)]
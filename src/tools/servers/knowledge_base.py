@@ -1,39 +1,392 @@
 from __future__ import annotations
 
+import hashlib
+import heapq
 import json
+import math
+import os
+import pickle
 import re
+import threading
+from collections import Counter, OrderedDict
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable
+
+from src.memory.vector_store import NumpyVectorStore
+from src.routing.cache import normalize_message
+from src.routing.embedding import Embedder
+from src.tenant.compiled import CompiledConfigCache
 
 TOKEN_RE = re.compile(r"\w+", flags=re.UNICODE)
 
+_UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+# longest first; stripped at most twice, never below _MIN_STEM characters
+_SUFFIXES = ("ungen", "heiten", "keiten", "ung", "heit", "keit", "ern", "em", "en", "er", "es", "e", "n", "s")
+_MIN_STEM = 4
+
+INDEX_MAGIC = b"NXKB"
+INDEX_FORMAT_VERSION = 1
+_HASH_SIZE = 16
+_HEADER_SIZE = len(INDEX_MAGIC) + 1 + _HASH_SIZE
+
+
+def normalize_token(token: str) -> str:
+    """Lowercase, fold umlauts/ß and strip common German inflection suffixes."""
+    term = token.lower().translate(_UMLAUTS)
+    for _ in range(2):
+        for suffix in _SUFFIXES:
+            if term.endswith(suffix) and len(term) - len(suffix) >= _MIN_STEM:
+                term = term[: -len(suffix)]
+                break
+        else:
+            break
+    return term
+
+
+def analyze(text: str) -> list[str]:
+    return [normalize_token(token) for token in TOKEN_RE.findall(text)]
+
+
+def _entry_text(entry: dict[str, Any]) -> str:
+    return f"{entry.get('title', '')} {entry.get('snippet', '')}"
+
+
+class KnowledgeBaseIndex:
+    """BM25 over an inverted index of KB entries (title + snippet).
+
+    Entries are analyzed once on `add`; a query only touches the postings of
+    its own terms and top-k is taken with a heap. Ties keep insertion order.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._order: dict[str, int] = {}
+        self._doc_len: dict[str, int] = {}
+        self._postings: dict[str, dict[str, int]] = {}
+        self._total_len = 0
+        self._next_order = 0
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[dict[str, Any]]) -> KnowledgeBaseIndex:
+        index = cls()
+        index.add_many(entries)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def copy(self) -> KnowledgeBaseIndex:
+        """Independent copy (entries themselves are shared), for copy-on-write updates."""
+        clone = type(self)(k1=self.k1, b=self.b)
+        clone._entries = dict(self._entries)
+        clone._order = dict(self._order)
+        clone._doc_len = dict(self._doc_len)
+        clone._postings = {term: dict(postings) for term, postings in self._postings.items()}
+        clone._total_len = self._total_len
+        clone._next_order = self._next_order
+        return clone
+
+    def order(self, entry_id: str) -> int:
+        """Insertion position of `entry_id`, the tie-break for equal scores (unknown ids sort last)."""
+        return self._order.get(entry_id, self._next_order)
+
+    def add(self, entry: dict[str, Any]) -> str:
+        """Index `entry` (replacing one with the same `id`); returns its id."""
+        entry_id = str(entry.get("id") or f"#{self._next_order}")
+        if entry_id in self._entries:
+            order = self._order[entry_id]
+            self._unindex(entry_id)
+        else:
+            order = self._next_order
+            self._next_order += 1
+
+        terms = Counter(analyze(_entry_text(entry)))
+        self._entries[entry_id] = entry
+        self._order[entry_id] = order
+        self._doc_len[entry_id] = sum(terms.values())
+        self._total_len += self._doc_len[entry_id]
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[entry_id] = tf
+        return entry_id
+
+    def add_many(self, entries: Iterable[dict[str, Any]]) -> None:
+        for entry in entries:
+            self.add(entry)
+
+    def remove(self, entry_id: str) -> bool:
+        if entry_id not in self._entries:
+            return False
+        self._unindex(entry_id)
+        del self._entries[entry_id]
+        del self._order[entry_id]
+        return True
+
+    def search(self, query: str, top_k: int = 3) -> list[dict[str, Any]]:
+        return [entry for _, entry in self.search_scored(query, top_k=top_k)]
+
+    def search_scored(self, query: str, top_k: int = 3) -> list[tuple[float, dict[str, Any]]]:
+        return [(score, self._entries[entry_id]) for entry_id, score in self.rank(query, top_k=top_k)]
+
+    def get(self, entry_id: str) -> dict[str, Any] | None:
+        return self._entries.get(entry_id)
+
+    def rank(self, query: str, top_k: int = 3) -> list[tuple[str, float]]:
+        """(entry_id, BM25 score) of the best `top_k` entries."""
+        terms = set(analyze(query))
+        if not terms or not self._entries or top_k <= 0:
+            return []
+
+        doc_count = len(self._entries)
+        avg_len = self._total_len / doc_count or 1.0
+        scores: dict[str, float] = {}
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1.0 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for entry_id, tf in postings.items():
+                norm = self.k1 * (1.0 - self.b + self.b * self._doc_len[entry_id] / avg_len)
+                scores[entry_id] = scores.get(entry_id, 0.0) + idf * tf * (self.k1 + 1.0) / (tf + norm)
+
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], -self._order[item[0]]))
+
+    def _unindex(self, entry_id: str) -> None:
+        entry = self._entries[entry_id]
+        for term in set(analyze(_entry_text(entry))):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(entry_id, None)
+            if not postings:
+                del self._postings[term]
+        self._total_len -= self._doc_len.pop(entry_id)
+
+    def save(self, path: Path, source_hash: bytes = b"\x00" * _HASH_SIZE) -> None:
+        """Write magic, format version, source hash and the pickled index (atomic replace)."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        state = (self.k1, self.b, self._entries, self._order, self._doc_len, self._postings, self._total_len, self._next_order)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with tmp_path.open("wb") as handle:
+            handle.write(INDEX_MAGIC)
+            handle.write(bytes([INDEX_FORMAT_VERSION]))
+            handle.write(source_hash)
+            handle.write(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL))
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path, expected_source_hash: bytes | None = None) -> KnowledgeBaseIndex | None:
+        """Load an index file; None when missing, corrupt, from another format, or stale."""
+        try:
+            raw = path.read_bytes()
+            if len(raw) <= _HEADER_SIZE or not raw.startswith(INDEX_MAGIC) or raw[len(INDEX_MAGIC)] != INDEX_FORMAT_VERSION:
+                return None
+            if expected_source_hash is not None and raw[len(INDEX_MAGIC) + 1 : _HEADER_SIZE] != expected_source_hash:
+                return None
+            state = pickle.loads(raw[_HEADER_SIZE:])
+            index = cls(k1=state[0], b=state[1])
+            (_, _, index._entries, index._order, index._doc_len, index._postings, index._total_len, index._next_order) = state
+        # same fallbacks as tenant bundles: unreadable file, corrupt or unresolvable pickle
+        except (OSError, ValueError, TypeError, KeyError, IndexError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+        return index
+
+
+def kb_source_hash(path: Path) -> bytes:
+    return hashlib.blake2b(path.read_bytes(), digest_size=_HASH_SIZE).digest()
+
 
-def _tokens(text: str) -> set[str]:
-    return {t.lower() for t in TOKEN_RE.findall(text)}
+def _file_signature(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+_kb_lock = threading.Lock()
+_kb_entries: dict[Path, tuple[tuple[int, int] | None, list[dict[str, Any]]]] = {}
+_kb_indexes: dict[Path, tuple[tuple[int, int] | None, KnowledgeBaseIndex]] = {}
 
 
 def load_kb_entries(path: Path) -> list[dict[str, Any]]:
+    """Entries of a tenant's kb_seed file; re-read only when the file changed.
+
+    The returned list is shared (treat it as read-only, like loaded tenant
+    configs); `kb_search` recognizes it and uses the file's cached index.
+    """
+    signature = _file_signature(path)
+    with _kb_lock:
+        cached = _kb_entries.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
     raw = path.read_text(encoding="utf-8")
     data = json.loads(raw or "{}")
-    return data.get("entries", [])
+    entries = data.get("entries", [])
+    with _kb_lock:
+        _kb_entries[path] = (signature, entries)
+    return entries
+
+
+def get_kb_index(kb_path: Path, index_path: Path | None = None) -> KnowledgeBaseIndex:
+    """Per-tenant index for `kb_path`, rebuilt when the file changes.
+
+    With `index_path`, a persisted index for the same file content is loaded
+    instead of re-analyzing the entries, and fresh builds are written there.
+    """
+    signature = _file_signature(kb_path)
+    with _kb_lock:
+        cached = _kb_indexes.get(kb_path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    index = None
+    source_hash = kb_source_hash(kb_path) if index_path is not None else None
+    if index_path is not None:
+        index = KnowledgeBaseIndex.load(index_path, source_hash)
+    if index is None:
+        index = KnowledgeBaseIndex.from_entries(load_kb_entries(kb_path))
+        if index_path is not None and source_hash is not None:
+            try:
+                index.save(index_path, source_hash)
+            except OSError:
+                pass  # persisting is an optimization; the rebuilt index is still served
+
+    with _kb_lock:
+        _kb_indexes[kb_path] = (signature, index)
+    return index
+
+
+# Other entry lists: identical content shares one index; the cache re-checks content on every lookup.
+_ENTRY_INDEXES: CompiledConfigCache[KnowledgeBaseIndex] = CompiledConfigCache(KnowledgeBaseIndex.from_entries, maxsize=64)
+
+
+def _loaded_kb_path(kb_entries: list[dict[str, Any]]) -> Path | None:
+    """Path of the kb_seed file whose current `load_kb_entries` list is `kb_entries`, if any."""
+    with _kb_lock:
+        for path, (_, entries) in _kb_entries.items():
+            if entries is kb_entries:
+                return path
+    return None
 
 
 def kb_search(query: str, kb_entries: list[dict[str, Any]], top_k: int = 3) -> list[dict[str, Any]]:
-    q = _tokens(query)
-    if not q:
-        return []
-
-    scored: list[tuple[float, dict[str, Any]]] = []
-    for item in kb_entries:
-        hay = f"{item.get('title','')} {item.get('snippet','')}"
-        t = _tokens(hay)
-        if not t:
-            continue
-        overlap = len(q & t)
-        if overlap <= 0:
-            continue
-        score = overlap / len(q | t)
-        scored.append((score, item))
-
-    scored.sort(key=lambda x: x[0], reverse=True)
-    return [item for _, item in scored[:top_k]]
+    path = _loaded_kb_path(kb_entries)
+    if path is not None and load_kb_entries(path) is kb_entries:
+        # shared list from `load_kb_entries` for an unchanged file: use the per-file index
+        return get_kb_index(path).search(query, top_k=top_k)
+    return _ENTRY_INDEXES.get(kb_entries).search(query, top_k=top_k)
+
+
+class HybridKnowledgeRetriever:
+    """BM25 + local-embedding retrieval fused with reciprocal rank fusion.
+
+    Each ranker contributes `1 / (rrf_k + rank)` for its top `candidate_k`
+    entries. Results are cached per (query, top_k) in a bounded LRU that is
+    cleared whenever the KB changes through `add`/`remove`. Updates replace the
+    BM25 index copy-on-write, so queries score a snapshot without holding the lock.
+    """
+
+    def __init__(
+        self,
+        entries: Iterable[dict[str, Any]] = (),
+        embedder: Embedder | None = None,
+        rrf_k: int = 60,
+        candidate_k: int = 20,
+        cache_size: int = 1024,
+    ) -> None:
+        self.rrf_k = rrf_k
+        self.candidate_k = candidate_k
+        self.cache_size = cache_size
+        self.bm25 = KnowledgeBaseIndex()
+        self.vectors = NumpyVectorStore(embedder=embedder, initial_capacity=64)
+        self._cache: OrderedDict[tuple[str, int], list[dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.add_many(entries)
+
+    def __len__(self) -> int:
+        return len(self.bm25)
+
+    def add(self, entry: dict[str, Any]) -> str:
+        return self.add_many([entry])[0]
+
+    def add_many(self, entries: Iterable[dict[str, Any]]) -> list[str]:
+        with self._lock:
+            bm25 = self.bm25.copy()
+            batch = [(bm25.add(entry), entry) for entry in entries]
+            self.vectors.upsert_many((entry_id, _entry_text(entry)) for entry_id, entry in batch)
+            self.bm25 = bm25
+            self._invalidate()
+        return [entry_id for entry_id, _ in batch]
+
+    def remove(self, entry_id: str) -> bool:
+        with self._lock:
+            bm25 = self.bm25.copy()
+            removed = bm25.remove(entry_id)
+            self.vectors.delete(entry_id)
+            self.bm25 = bm25
+            self._invalidate()
+        return removed
+
+    def search(self, query: str, top_k: int = 3) -> list[dict[str, Any]]:
+        key = (normalize_message(query), top_k)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return list(cached)
+            self.misses += 1
+            bm25, generation = self.bm25, self._generation
+        results = self._fuse(bm25, query, top_k)
+        with self._lock:
+            # a write during scoring may have changed the KB: return, but do not cache
+            if generation == self._generation:
+                self._cache[key] = results
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return list(results)
+
+    def _invalidate(self) -> None:
+        self._cache.clear()
+        self._generation += 1
+
+    def _fuse(self, bm25: KnowledgeBaseIndex, query: str, top_k: int) -> list[dict[str, Any]]:
+        if top_k <= 0:
+            return []
+        scores: dict[str, float] = {}
+        for rank, (entry_id, _) in enumerate(bm25.rank(query, top_k=self.candidate_k), start=1):
+            scores[entry_id] = 1.0 / (self.rrf_k + rank)
+        for rank, snippet in enumerate(self.vectors.search(query, top_k=self.candidate_k), start=1):
+            scores[snippet.snippet_id] = scores.get(snippet.snippet_id, 0.0) + 1.0 / (self.rrf_k + rank)
+
+        # equal fused scores: fall back to insertion order; vector hits missing from the snapshot are dropped
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], -bm25.order(item[0])))
+        return [entry for entry_id, _ in best if (entry := bm25.get(entry_id)) is not None]
+
+
+_hybrid_retrievers: dict[Path, tuple[tuple[int, int] | None, HybridKnowledgeRetriever]] = {}
+
+
+def get_hybrid_retriever(kb_path: Path) -> HybridKnowledgeRetriever:
+    """Per-tenant hybrid retriever; a changed kb_seed file yields a fresh one (and an empty result cache)."""
+    signature = _file_signature(kb_path)
+    with _kb_lock:
+        cached = _hybrid_retrievers.get(kb_path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    retriever = HybridKnowledgeRetriever(load_kb_entries(kb_path))
+    with _kb_lock:
+        _hybrid_retrievers[kb_path] = (signature, retriever)
+    return retriever
+
+
+def kb_hybrid_search(query: str, kb_path: Path, top_k: int = 3) -> list[dict[str, Any]]:
+    """Hybrid search over a tenant's kb_seed file; entries keep their `KB-...` ids for citations."""
+    return get_hybrid_retriever(kb_path).search(query, top_k=top_k)
@@ -1,11 +1,74 @@
 from __future__ import annotations
 
 import json
-from typing import Any
+from json.encoder import py_encode_basestring
+from typing import Any, Iterable
 
+# iterencode without _one_shot yields chunks lazily, so encoding stops as soon as a budget is hit
+_ENCODER = json.JSONEncoder(ensure_ascii=False)
+_ROW_SEPARATOR_BYTES = len(_ENCODER.item_separator.encode("utf-8"))
 
-def _json_size_bytes(value: Any) -> int:
-    return len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+def _envelope_overhead(empty_data: Any) -> int:
+    return len(json.dumps({"truncated": True, "data": empty_data}, ensure_ascii=False).encode("utf-8"))
+
+
+_STRING_ENVELOPE_BYTES = _envelope_overhead("")
+_ROWS_ENVELOPE_BYTES = _envelope_overhead([])
+
+
+def _bounded_size_bytes(value: Any, limit: int) -> int | None:
+    """Encoded size of `value`, or None as soon as it exceeds `limit`."""
+    used = 0
+    for chunk in _ENCODER.iterencode(value):
+        used += len(chunk.encode("utf-8"))
+        if used > limit:
+            return None
+    return used
+
+
+def _measure_rows(rows: list[Any], limit: int) -> tuple[list[int], bool]:
+    """Encoded sizes of the leading rows whose `[...]` encoding fits `limit`, and whether all rows do."""
+    sizes: list[int] = []
+    used = 2  # "[" + "]"
+    for row in rows:
+        separator = _ROW_SEPARATOR_BYTES if sizes else 0
+        size = _bounded_size_bytes(row, limit - used - separator)
+        if size is None:
+            return sizes, False
+        sizes.append(size)
+        used += separator + size
+    return sizes, True
+
+
+def _rows_within(sizes: list[int], limit: int) -> int:
+    used = 0
+    for count, size in enumerate(sizes):
+        used += size + (_ROW_SEPARATOR_BYTES if count else 0)
+        if used > limit:
+            return count
+    return len(sizes)
+
+
+def _json_prefix(chunks: Iterable[str], limit: int) -> str:
+    """Longest prefix of the JSON text whose escaped form fits `limit` bytes; cuts only between characters."""
+    kept: list[str] = []
+    used = 0
+    for chunk in chunks:
+        # cost inside the envelope string: escaped, without the surrounding quotes
+        size = len(py_encode_basestring(chunk).encode("utf-8")) - 2
+        if used + size <= limit:
+            kept.append(chunk)
+            used += size
+            continue
+        for char in chunk:
+            size = len(py_encode_basestring(char).encode("utf-8")) - 2
+            if used + size > limit:
+                break
+            kept.append(char)
+            used += size
+        break
+    return "".join(kept)
 
 
 def trim_result(tool_name: str, raw_result: Any, tenant_tools_config: dict[str, Any]) -> Any:
@@ -29,11 +92,19 @@ def trim_result(tool_name: str, raw_result: Any, tenant_tools_config: dict[str,
             if isinstance(row, dict)
         ]
 
-    if _json_size_bytes(trimmed) <= max_bytes:
+    # Results are only encoded up to the byte budget, never in full.
+    if isinstance(trimmed, list):
+        sizes, fits = _measure_rows(trimmed, max_bytes)
+        if fits:
+            return trimmed
+        # deterministic fallback: as many whole rows as fit into the envelope
+        # (the envelope budget is smaller, so no row past the measured ones can fit)
+        row_count = _rows_within(sizes, max_bytes - _ROWS_ENVELOPE_BYTES)
+        if row_count:
+            return {"truncated": True, "data": trimmed[:row_count]}
+    elif _bounded_size_bytes(trimmed, max_bytes) is not None:
         return trimmed
 
-    # deterministic fallback when trimmed payload is still too large
-    payload = json.dumps(trimmed, ensure_ascii=False)
-    overhead = _json_size_bytes({"truncated": True, "data": ""})
-    keep = max(0, max_bytes - overhead)
-    return {"truncated": True, "data": payload[:keep]}
+    # deterministic fallback when not even one row fits: prefix of the JSON text
+    keep = max(0, max_bytes - _STRING_ENVELOPE_BYTES)
+    return {"truncated": True, "data": _json_prefix(_ENCODER.iterencode(trimmed), keep)}
@@ -39,3 +39,159 @@ def test_agent_loop_uses_litellm_call(monkeypatch):
     monkeypatch.setattr(loop, "_call_litellm", fake_call)
     out = loop.process({"intent": "general", "tier": "tier_1", "text": "hi"})
     assert out["text"].startswith("mocked:tier_1")
+
+
+def _mock_litellm_client(seen: list):
+    import httpx
+
+    from src.agent.llm_client import LiteLLMClient
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json={"choices": [{"message": {"content": "pooled reply"}}]})
+
+    return LiteLLMClient(
+        base_url="http://litellm.test",
+        api_key="k",
+        tier_timeouts={"tier_1": 10.0, "tier_3": 30.0},
+        transport=httpx.MockTransport(handler),
+    )
+
+
+def test_load_tier_timeouts_from_litellm_config() -> None:
+    from pathlib import Path
+
+    from src.agent.llm_client import load_tier_timeouts
+
+    timeouts = load_tier_timeouts(Path("configs/litellm_config.yaml"))
+    assert timeouts == {"tier_1": 10.0, "tier_2": 20.0, "tier_3": 30.0}
+
+
+async def test_async_agent_loop_reuses_pooled_client() -> None:
+    from src.agent.loop import AgentLoop
+    from src.observability.langfuse import InMemoryLangfuseClient
+
+    seen: list = []
+    client = _mock_litellm_client(seen)
+    logger = InMemoryLangfuseClient()
+    loop = AgentLoop(logger=logger, llm_client=client)
+
+    first = await loop.aprocess({"tier": "tier_3", "text": "hi", "intent": "general"})
+    pooled = client.async_client()
+    await loop.aprocess({"tier": "tier_1", "text": "hi again"})
+
+    assert first["text"] == "pooled reply"
+    assert client.async_client() is pooled
+    assert [r.extensions["timeout"]["read"] for r in seen] == [30.0, 10.0]
+    assert seen[0].headers["Authorization"] == "Bearer k"
+    assert len(logger.logs()) == 2
+    await client.aclose()
+
+
+def test_async_client_closes_clients_of_finished_loops() -> None:
+    import asyncio
+
+    client = _mock_litellm_client([])
+
+    async def _client():
+        return client.async_client()
+
+    first = asyncio.run(_client())
+
+    async def _switch_and_close():
+        second = client.async_client()
+        await asyncio.sleep(0)
+        assert first.is_closed and second is not first
+        await client.aclose()
+        return second
+
+    assert asyncio.run(_switch_and_close()).is_closed
+
+def test_sync_agent_loop_uses_same_client_settings() -> None:
+    from src.agent.loop import AgentLoop
+
+    seen: list = []
+    loop = AgentLoop(llm_client=_mock_litellm_client(seen))
+
+    assert loop.process({"tier": "tier_2", "text": "hi"})["text"] == "pooled reply"
+    assert seen[0].extensions["timeout"]["read"] == 8.0
+
+
+async def test_agent_loop_streams_sse_deltas_and_logs_ttft() -> None:
+    import httpx
+
+    from src.agent.llm_client import LiteLLMClient
+    from src.agent.loop import AgentLoop
+    from src.observability.langfuse import InMemoryLangfuseClient
+
+    sse_body = (
+        'data: {"choices": [{"delta": {"role": "assistant"}}]}\n\n'
+        'data: {"choices": [{"delta": {"content": "Hal"}}]}\n\n'
+        'data: {"choices": [{"delta": {"content": "lo"}}]}\n\n'
+        "data: [DONE]\n\n"
+    )
+    seen: list = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, text=sse_body, headers={"content-type": "text/event-stream"})
+
+    client = LiteLLMClient(base_url="http://litellm.test", api_key="k", transport=httpx.MockTransport(handler))
+    logger = InMemoryLangfuseClient()
+    loop = AgentLoop(logger=logger, llm_client=client)
+
+    chunks = [chunk async for chunk in loop.astream({"tier": "tier_1", "text": "hi"})]
+
+    assert chunks == ["Hal", "lo"]
+    assert b'"stream":true' in seen[0].content.replace(b" ", b"")
+    log = logger.logs()[0]
+    assert log["response_text"] == "Hallo"
+    assert log["time_to_first_token_ms"] is not None
+    assert log["time_to_first_token_ms"] <= log["latency_ms"]
+    await client.aclose()
+
+
+async def test_aborted_stream_still_logs_partial_reply() -> None:
+    import httpx
+
+    from src.agent.llm_client import LiteLLMClient
+    from src.agent.loop import AgentLoop
+    from src.observability.langfuse import InMemoryLangfuseClient
+
+    sse_body = 'data: {"choices": [{"delta": {"content": "Hal"}}]}\n\ndata: {"choices": [{"delta": {"content": "lo"}}]}\n\n'
+    client = LiteLLMClient(
+        base_url="http://litellm.test",
+        api_key="k",
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, text=sse_body)),
+    )
+    logger = InMemoryLangfuseClient()
+    stream = AgentLoop(logger=logger, llm_client=client).astream({"tier": "tier_1", "text": "hi"})
+
+    assert await stream.__anext__() == "Hal"
+    await stream.aclose()
+
+    [log] = logger.logs()
+    assert log["response_text"] == "Hal"
+    assert log["time_to_first_token_ms"] is not None
+    await client.aclose()
+
+
+def test_agent_loop_reserves_and_books_spend_per_tenant() -> None:
+    from src.agent.loop import BUDGET_EXCEEDED_REPLY, AgentLoop
+    from src.observability.langfuse import InMemoryLangfuseClient
+    from src.orchestration.budget import BudgetAgent
+    from src.orchestration.spend_ledger import InMemorySpendBackend, SpendLedger
+
+    budget = BudgetAgent(ledger=SpendLedger(InMemorySpendBackend(), daily_cap_usd=0.003))
+    budget.track_usage("tier_3", 0, 0, cost=0.0029, tenant_id="tenant_a")
+    seen: list = []
+    loop = AgentLoop(logger=InMemoryLangfuseClient(), llm_client=_mock_litellm_client(seen), budget=budget)
+
+    assert loop.process({"tier": "tier_3", "text": "hi", "tenant_id": "tenant_a"})["text"] == BUDGET_EXCEEDED_REPLY
+    assert seen == []
+    assert budget.get_daily_spend("tenant_a") == 0.0029
+
+    assert loop.process({"tier": "tier_3", "text": "hi", "tenant_id": "tenant_b"})["text"] == "pooled reply"
+    assert len(seen) == 1
+    assert 0 < budget.get_daily_spend("tenant_b") < 0.001
+    assert budget.ledger.committed("tenant_b") == budget.ledger.spent("tenant_b")
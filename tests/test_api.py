@@ -33,3 +33,18 @@ def test_web_chat_and_events_flow() -> None:
     items = events_response.json()["items"]
     assert len(items) >= 1
     assert items[-1]["sender_id"] == "web-u1"
+
+
+def test_web_chat_stream_sends_disclosure_first() -> None:
+    with client.stream(
+        "POST",
+        "/chat/web/stream",
+        json={"sender_id": "web-u2", "tenant_id": "example_tenant", "text": "Hallo", "message_id": "m2"},
+    ) as response:
+        assert response.status_code == 200
+        assert response.headers["x-nexus-intent"] == "general"
+        body = "".join(response.iter_text())
+
+    disclosure = "Hinweis: Du schreibst mit dem KI-Assistenten von example_tenant.\n\n"
+    assert body.startswith(disclosure)
+    assert body[len(disclosure):].strip()
@@ -24,3 +24,19 @@ def test_analyze_decisions_recommends_lower_threshold_when_over_escalating() ->
     assert report.false_passes == 0
     assert report.false_escalations == 2
     assert report.recommended_low_conf_threshold < 0.35
+
+
+def test_replay_routing_uses_current_tenant_config(project_root) -> None:
+    from scripts.calibrate import replay_routing
+    from src.tenant.manager import TenantManager
+
+    context = TenantManager(config_root=project_root / "configs").load_tenant_context(tenant_id="example_tenant")
+    records = [
+        {"input_text": "Wie sind die Öffnungszeiten?", "expected_intent": "faq", "predicted_intent": "booking"},
+        {"input_text": "Ich will den Kurs buchen", "expected_intent": "booking"},
+    ]
+
+    replayed = replay_routing(records, context)
+
+    assert [row["predicted_intent"] for row in replayed] == ["faq", "booking"]
+    assert analyze_decisions(replayed).false_passes == 0
@@ -1,9 +1,20 @@
+import os
 import unittest
 
-from src.memory.context import build_context_package
+try:
+    import fakeredis
+except ModuleNotFoundError:  # pragma: no cover
+    fakeredis = None
+
+from src.config import Settings
+from src.memory.client import create_vector_store
+from src.memory.context import ApproxTokenizer, CachedTokenizer, build_context_package, load_tier_token_budgets
+from src.memory.pgvector_store import PgVectorStore, psycopg_conninfo, vector_literal
 from src.memory.semantic import SemanticMemoryIndex
-from src.memory.summary import summarize_turns
-from src.memory.working import WorkingMemoryStore
+from src.memory.summary import RollingSummarizer, summarize_turns
+from src.memory.vector_store import NumpyVectorStore
+from src.memory.redis_working import RedisWorkingMemoryStore
+from src.memory.working import Turn, WorkingMemoryStore
 
 
 class TestWorkingMemory(unittest.TestCase):
@@ -18,6 +29,58 @@ class TestWorkingMemory(unittest.TestCase):
         self.assertEqual(turns[0].content, "hello")
         self.assertEqual(turns[1].content, "need help")
 
+    def test_get_unknown_session_does_not_allocate(self) -> None:
+        store = WorkingMemoryStore()
+        self.assertEqual(store.get("nobody"), [])
+        self.assertEqual(len(store), 0)
+
+    def test_lru_cap_and_idle_expiry(self) -> None:
+        now = [0.0]
+        store = WorkingMemoryStore(max_turns=2, max_sessions=2, idle_ttl_seconds=10, clock=lambda: now[0])
+        store.append("a", "user", "1")
+        store.append("b", "user", "2")
+        store.get("a")
+        store.append("c", "user", "3")
+
+        self.assertEqual(store.get("b"), [])
+        self.assertEqual(store.get("a"), [Turn("user", "1")])
+
+        now[0] = 5.0
+        store.append("c", "user", "4")
+        now[0] = 12.0
+        stats = store.stats()
+
+        self.assertEqual((stats.sessions, stats.turns), (1, 2))
+        self.assertEqual((stats.evicted_lru, stats.expired_idle), (1, 1))
+        self.assertGreater(stats.approx_bytes, 0)
+        self.assertFalse(hasattr(Turn("user", "x"), "__dict__"))
+
+
+@unittest.skipIf(fakeredis is None, "fakeredis not installed")
+class TestRedisWorkingMemory(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = fakeredis.FakeRedis()
+        self.store = RedisWorkingMemoryStore(self.client, max_turns=2, ttl_seconds=60)
+
+    def test_capped_list_keeps_latest_turns_in_order(self) -> None:
+        self.store.append("s1", "user", "hi")
+        self.store.append("s1", "assistant", "hällo")
+        self.store.append("s1", "user", "need help")
+
+        self.assertEqual(self.store.get("s1"), [Turn("assistant", "hällo"), Turn("user", "need help")])
+        self.assertEqual(self.client.llen("nexus:wm:s1"), 2)
+        self.assertTrue(0 < self.client.ttl("nexus:wm:s1") <= 60)
+
+    def test_get_many_and_clear(self) -> None:
+        self.store.append("s1", "user", "a")
+        self.store.append("s2", "user", "b")
+        self.store.clear("s2")
+
+        batch = self.store.get_many(["s1", "s2", "unknown"])
+
+        self.assertEqual(batch, {"s1": [Turn("user", "a")], "s2": [], "unknown": []})
+        self.assertEqual(self.store.get_many([]), {})
+
 
 class TestSummary(unittest.TestCase):
     def test_summarize_compacts_text(self) -> None:
@@ -28,6 +91,39 @@ class TestSummary(unittest.TestCase):
         summary = summarize_turns(store.get("s1"), max_chars=120)
         self.assertIn("user: Ich brauche einen Termin", summary)
 
+    def test_session_summary_matches_full_rebuild(self) -> None:
+        store = WorkingMemoryStore(max_turns=3, summary_max_chars=60)
+        for i in range(5):
+            store.append("s1", "user", f"Nachricht   {i}")
+            self.assertEqual(store.summary("s1"), summarize_turns(store.get("s1"), max_chars=60))
+        self.assertEqual(store.summary("unknown"), "")
+
+    def test_overflow_is_summarized_in_background(self) -> None:
+        calls: list[tuple[str, list[str]]] = []
+
+        def fake_llm(digest: str, lines: list[str]) -> str:
+            calls.append((digest, lines))
+            return f"{len(calls)} Zusammenfassung(en)"
+
+        store = WorkingMemoryStore(max_turns=2, overflow_summarizer=fake_llm)
+        for i in range(4):
+            store.append("s1", "user", f"m{i}")
+        store.summarizer("s1").wait(timeout=5)
+
+        self.assertEqual([line for _, lines in calls for line in lines], ["user: m0", "user: m1"])
+        self.assertTrue(store.summary("s1").startswith(f"{len(calls)} Zusammenfassung(en) | user: m2"))
+
+
+    def test_long_digest_does_not_push_out_recent_turns(self) -> None:
+        summarizer = RollingSummarizer(window_turns=2, max_chars=60, overflow_summarizer=lambda d, lines: "D" * 800)
+        for i in range(3):
+            summarizer.add(Turn("user", f"neue Nachricht {i}"))
+        summarizer.wait(timeout=5)
+
+        summary = summarizer.summary()
+        self.assertLessEqual(len(summary), 60)
+        self.assertTrue(summary.endswith("user: neue Nachricht 1 | user: neue Nachricht 2"))
+        self.assertTrue(summary.startswith("DDD"))
 
 class TestSemanticMemory(unittest.TestCase):
     def test_search_returns_ranked_snippets(self) -> None:
@@ -40,6 +136,108 @@ class TestSemanticMemory(unittest.TestCase):
         self.assertGreaterEqual(len(results), 1)
         self.assertEqual(results[0].snippet_id, "a")
 
+    def test_upsert_many_delete_and_reindex(self) -> None:
+        index = SemanticMemoryIndex()
+        index.upsert_many([("a", "Termin Bochum"), ("b", "Termin Essen"), ("c", "Preise Kurs")])
+
+        self.assertEqual([s.snippet_id for s in index.search("Termin", top_k=5)], ["a", "b"])
+        self.assertAlmostEqual(index.search("Termin Bochum")[0].score, 1.0)
+
+        self.assertTrue(index.delete("a"))
+        self.assertFalse(index.delete("a"))
+        index.upsert("b", "Preise Essen")
+
+        self.assertEqual(index.search("Termin"), [])
+        self.assertEqual([s.snippet_id for s in index.search("Preise", top_k=5)], ["b", "c"])
+        self.assertEqual(len(index), 2)
+
+
+class TestVectorStore(unittest.TestCase):
+    SNIPPETS = [
+        ("a", "Nageldesign Basiskurs in Bochum"),
+        ("b", "Öffnungszeiten Montag bis Freitag"),
+        ("c", "Preise für den Aufbaukurs"),
+    ]
+
+    def test_numpy_store_ranks_delete_and_upsert(self) -> None:
+        store = NumpyVectorStore(initial_capacity=1)
+        store.upsert_many(self.SNIPPETS)
+
+        results = store.search("Nageldesign Kurs Bochum", top_k=2)
+        self.assertEqual(results[0].snippet_id, "a")
+        self.assertLessEqual(results[0].score, 1.0 + 1e-6)
+
+        self.assertTrue(store.delete("a"))
+        self.assertFalse(store.delete("a"))
+        store.upsert("c", "Nageldesign Kurs in Bochum")
+
+        self.assertEqual(len(store), 2)
+        self.assertEqual(store.search("Nageldesign Kurs Bochum")[0].snippet_id, "c")
+        self.assertEqual(store.search("Öffnungszeiten Freitag")[0].snippet_id, "b")
+        self.assertEqual(store.search("   "), [])
+
+    def test_ivf_search_finds_exact_duplicates(self) -> None:
+        texts = [(f"doc{i}", f"Eintrag {i} Thema {i % 37} Kategorie {i % 11}") for i in range(400)]
+        store = NumpyVectorStore(ivf_lists=8, ivf_probes=2, ivf_min_rows=100)
+        store.upsert_many(texts)
+
+        for snippet_id, text in texts[::50]:
+            self.assertEqual(store.search(text, top_k=1)[0].snippet_id, snippet_id)
+
+        store.upsert("neu", "Völlig neuer Eintrag über Gelnägel")
+        self.assertEqual(store.search("Völlig neuer Eintrag über Gelnägel", top_k=1)[0].snippet_id, "neu")
+
+    def test_ivf_lists_track_upserts_and_deletes(self) -> None:
+        store = NumpyVectorStore(ivf_lists=8, ivf_probes=2, ivf_min_rows=100)
+        store.upsert_many((f"doc{i}", f"Eintrag {i} Thema {i % 37}") for i in range(300))
+        store.search("Eintrag 1")
+        for i in range(0, 300, 7):
+            store.delete(f"doc{i}")
+        store.upsert_many([("doc1", "Gelnägel Kurs"), ("extra", "Eintrag extra Thema 3")])
+
+        listed = sorted(row for members in store._lists for row in members)
+        self.assertEqual(listed, list(range(len(store))))
+        for members in store._lists:
+            for slot, row in enumerate(members):
+                self.assertEqual(store._slots[row], slot)
+                self.assertIs(members, store._lists[store._assignments[row]])
+        self.assertEqual(store.search("Gelnägel Kurs", top_k=1)[0].snippet_id, "doc1")
+
+    def test_backend_selected_from_settings(self) -> None:
+        self.assertIsInstance(create_vector_store(Settings(vector_store_backend="lexical")), SemanticMemoryIndex)
+        self.assertIsInstance(create_vector_store(Settings(vector_store_backend="numpy")), NumpyVectorStore)
+        self.assertIsInstance(
+            create_vector_store(Settings(vector_store_backend="pgvector", supabase_db_url="postgresql://x")),
+            PgVectorStore,
+        )
+        with self.assertRaises(ValueError):
+            Settings(vector_store_backend="faiss")
+
+    def test_pgvector_helpers(self) -> None:
+        self.assertEqual(psycopg_conninfo("postgresql+psycopg://u:p@db:5432/n"), "postgresql://u:p@db:5432/n")
+        self.assertEqual(psycopg_conninfo("postgresql://db/n"), "postgresql://db/n")
+        self.assertEqual(vector_literal([0.5, -1.0, 0.0]), "[0.5,-1,0]")
+
+
+@unittest.skipUnless(os.environ.get("NEXUS_TEST_PGVECTOR_URL"), "set NEXUS_TEST_PGVECTOR_URL (docker compose up postgres)")
+class TestPgVectorStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self.store = PgVectorStore(os.environ["NEXUS_TEST_PGVECTOR_URL"], table="semantic_memory_test")
+
+    def tearDown(self) -> None:
+        for snippet_id in ("a", "b", "c"):
+            self.store.delete(snippet_id)
+        self.store.close()
+
+    def test_copy_upsert_and_hnsw_search(self) -> None:
+        self.store.upsert_many(TestVectorStore.SNIPPETS)
+        self.store.upsert("c", "Nageldesign Kurs in Bochum")
+
+        results = self.store.search("Nageldesign Kurs Bochum", top_k=2)
+        self.assertEqual(results[0].snippet_id, "c")
+        self.assertTrue(self.store.delete("c"))
+        self.assertEqual(self.store.search("Nageldesign Kurs Bochum", top_k=1)[0].snippet_id, "a")
+
 
 class TestContextPackage(unittest.TestCase):
     def test_context_respects_budget(self) -> None:
@@ -62,6 +260,30 @@ class TestContextPackage(unittest.TestCase):
         )
         self.assertLessEqual(total_chars, 180)
 
+    def test_tier_token_budget_from_policy(self) -> None:
+        self.assertEqual(load_tier_token_budgets()["tier_3"], 1500)
+
+        turns = [Turn(role="user", content="wort " * 100) for _ in range(10)]
+        tokenizer = CachedTokenizer(ApproxTokenizer())
+        package = build_context_package(turns, "", [], tier="tier_1", tokenizer=tokenizer)
+
+        # each turn is 1 + 125 tokens; tier_1 allows 400
+        self.assertEqual(len(package.working_turns), 3)
+        self.assertEqual(package.working_turns, turns[-3:])
+        # role, content and summary counted once each despite 10 turns
+        self.assertEqual(tokenizer.count.cache_info().currsize, 3)
+
+    def test_prefer_semantic_trims_turns_first(self) -> None:
+        turns = [Turn(role="u", content="a" * 9) for _ in range(4)]
+        snippets = SemanticMemoryIndex()
+        snippets.upsert("k1", "b" * 20)
+        found = snippets.search("b" * 20)
+
+        package = build_context_package(turns, "", found, prefer_semantic=True, max_tokens=40, tokenizer=ApproxTokenizer(1))
+
+        self.assertEqual(len(package.semantic_snippets), 1)
+        self.assertEqual(package.working_turns, turns[-2:])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -36,7 +36,8 @@ def test_decision_log_has_expected_fields() -> None:
         }
     )
     log_dict = client.logs()[0]
-    assert len(log_dict.keys()) == 19
+    assert len(log_dict.keys()) == 20
+    assert log_dict["time_to_first_token_ms"] is None
     assert entry.tenant_id == "example_tenant"
     assert log_dict["tenant_id"] == "example_tenant"
 
@@ -1,8 +1,17 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
 from src.channels.message import UnifiedMessage
 from src.orchestration.budget import BudgetAgent
 from src.orchestration.coordinator import Coordinator
 from src.orchestration.guardian import GuardianAgent, GuardianOutcome
 from src.orchestration.manager import ManagerAgent
+from src.orchestration.messages import TaskResult
+from src.orchestration.spend_ledger import InMemorySpendBackend, RedisSpendBackend, SpendLedger, SqliteSpendBackend
 from src.routing.models import RiskLevel, RoutingDecision, Tier
 
 
@@ -24,6 +33,64 @@ def test_guardian_requires_confirmation_for_apt_install() -> None:
     assert verdict.outcome == GuardianOutcome.NEEDS_CONFIRMATION
 
 
+def test_guardian_matches_command_tokens_not_substrings() -> None:
+    guardian = GuardianAgent()
+    assert guardian.review("terminal", {"command": "add user"}, "low").outcome == GuardianOutcome.APPROVED
+    assert guardian.review("terminal", {"command": "/bin/dd if=/dev/zero"}, "low").outcome == GuardianOutcome.BLOCKED
+    assert guardian.review("terminal", {"command": "sudo docker ps"}, "low").outcome == GuardianOutcome.NEEDS_CONFIRMATION
+    assert guardian.review("terminal", {"command": 'sh -c "shutdown now"'}, "low").outcome == GuardianOutcome.BLOCKED
+    assert guardian.review("terminal", {"command": "bash -c 'rm -rf /'"}, "low").outcome == GuardianOutcome.BLOCKED
+    assert guardian.review("terminal", {"command": "bash -lc 'ls; rm -rf /tmp/x'"}, "low").outcome == GuardianOutcome.BLOCKED
+    assert guardian.review("terminal", {"command": "'rm' -rf /tmp/x"}, "low").outcome == GuardianOutcome.BLOCKED
+    for command in ["mkfs.ext4 /dev/sda1", "rm -rfv /", "rm -fr /", "rm -r -f /", "rm -R --force x", "FOO=1 dd of=x"]:
+        assert guardian.review("terminal", {"command": command}, "low").outcome == GuardianOutcome.BLOCKED, command
+    assert guardian.review("terminal", {"command": "docker-compose up"}, "low").outcome == GuardianOutcome.NEEDS_CONFIRMATION
+    assert guardian.review("terminal", {"command": "apt-get install -y curl"}, "low").outcome == GuardianOutcome.NEEDS_CONFIRMATION
+    assert guardian.review("terminal", {"command": "echo dd"}, "low").outcome == GuardianOutcome.APPROVED
+    assert guardian.review("terminal", {"command": "rm -r notes"}, "low").outcome == GuardianOutcome.APPROVED
+
+
+def test_guardian_checks_redirection_targets_and_domain_normalisation() -> None:
+    guardian = GuardianAgent()
+    for command in ["echo x >/etc/passwd", "cp a b 2>/etc/x", "echo x >> '/etc/passwd'", "echo x > /etc/passwd"]:
+        assert guardian.review("terminal", {"command": command}, "low").outcome == GuardianOutcome.BLOCKED, command
+
+    guardian.policy.remember_domain(".Example.com.")
+    assert guardian.review("http", {"url": "https://api.example.com/"}, "low").outcome == GuardianOutcome.APPROVED
+
+
+
+def test_guardian_allows_large_payloads() -> None:
+    verdict = GuardianAgent().review("files", {"content": "x" * 40_000, "path": "notes/a.md"}, "low")
+    assert verdict.outcome == GuardianOutcome.APPROVED
+
+def test_guardian_applies_path_domain_and_risk_rules() -> None:
+    guardian = GuardianAgent()
+    verdicts = guardian.review_many(
+        [
+            ("files", {"path": "notes/todo.md"}, "low"),
+            ("files", {"path": "/etc/passwd"}, "low"),
+            ("files", {"path": "/etcetera/file"}, "low"),
+            ("terminal", {"command": "cat /home/nexus/workspace/../../../etc/shadow"}, "low"),
+            ("http", {"url": "https://api.example.com/v1"}, "low"),
+            ("terminal", {"command": "ls"}, "critical"),
+        ]
+    )
+
+    assert [v.outcome for v in verdicts] == [
+        GuardianOutcome.APPROVED,
+        GuardianOutcome.BLOCKED,
+        GuardianOutcome.NEEDS_CONFIRMATION,
+        GuardianOutcome.BLOCKED,
+        GuardianOutcome.NEEDS_CONFIRMATION,
+        GuardianOutcome.BLOCKED,
+    ]
+    assert verdicts[-1].alert is True
+
+    guardian.policy.remember_domain("example.com")
+    assert guardian.review("http", {"url": "https://api.example.com/v2"}, "low").outcome == GuardianOutcome.APPROVED
+
+
 def test_budget_agent_selects_tier_1() -> None:
     budget = BudgetAgent()
     selection = budget.select_model("tier_1", "hello")
@@ -36,6 +103,92 @@ def test_budget_agent_blocks_when_cap_exceeded() -> None:
     assert budget.check_budget() == "exceeded"
 
 
+def test_budget_agent_books_spend_per_tenant() -> None:
+    budget = BudgetAgent()
+    budget.track_usage(model="x", tokens_in=1, tokens_out=1, cost=1.9, tenant_id="t1")
+    assert budget.check_budget(tenant_id="t1") == "warning"
+    assert budget.check_budget(tenant_id="t2") == "ok"
+    assert budget.reserve("openai/gpt-4.1", estimated_tokens=40_000, tenant_id="t1") is None
+    assert budget.reserve("openai/gpt-4.1", estimated_tokens=40_000, tenant_id="t2") is not None
+
+
+def test_spend_ledger_periodic_flush_without_new_traffic() -> None:
+    backend = InMemorySpendBackend()
+    ledger = SpendLedger(backend, daily_cap_usd=2.0, flush_interval_seconds=0.01)
+    ledger.record("t1", "m", 0.5)
+
+    async def _run() -> None:
+        task = asyncio.create_task(ledger.run_periodic_flush())
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if backend.by_model(ledger.today(), "t1"):
+                break
+        task.cancel()
+
+    asyncio.run(_run())
+    assert backend.by_model(ledger.today(), "t1") == {"m": 0.5}
+
+
+def test_budget_agent_computes_cost_from_tier_rate() -> None:
+    budget = BudgetAgent()
+    budget.track_usage(model="deepseek/deepseek-chat", tokens_in=600, tokens_out=400)
+    budget.track_usage(model="openai/gpt-4.1", tokens_in=1000, tokens_out=1000)
+    assert budget.get_daily_spend() == pytest.approx(0.0001 + 0.01)
+    assert budget.ledger.spent_by_model("default") == pytest.approx(
+        {"deepseek/deepseek-chat": 0.0001, "openai/gpt-4.1": 0.01}
+    )
+
+
+def test_spend_ledger_batches_and_rolls_over_at_utc_midnight() -> None:
+    now = [86_400.0 - 10]
+    backend = InMemorySpendBackend()
+    ledger = SpendLedger(backend, daily_cap_usd=2.0, flush_interval_seconds=60, clock=lambda: now[0])
+    ledger.record("t1", "m", 0.5)
+    assert backend.by_model("1970-01-01", "t1") == {}
+    assert ledger.spent("t1") == 0.5
+
+    now[0] += 20
+    assert ledger.spent("t1") == 0.0
+    ledger.flush()
+    assert backend.by_model("1970-01-01", "t1") == {"m": 0.5}
+    assert ledger.spent("t1", day="1970-01-01") == 0.5
+
+
+def _ledger_backends(tmp_path):
+    yield InMemorySpendBackend()
+    yield SqliteSpendBackend(tmp_path / "spend.sqlite3")
+    fakeredis = pytest.importorskip("fakeredis")
+    yield RedisSpendBackend(fakeredis.FakeRedis())
+
+
+def test_spend_ledger_concurrent_reserve_never_exceeds_cap(tmp_path) -> None:
+    for backend in _ledger_backends(tmp_path):
+        ledger = SpendLedger(backend, daily_cap_usd=1.0)
+        ledger.record("t1", "m", 0.3)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            reservations = list(pool.map(lambda _: ledger.reserve("t1", "m", 0.1), range(20)))
+        granted = [r for r in reservations if r is not None]
+        assert len(granted) == 7, type(backend).__name__
+        assert ledger.committed("t1") == pytest.approx(1.0)
+
+        for reservation in granted:
+            ledger.settle(reservation, 0.05)
+        ledger.flush()
+        assert backend.reserved(ledger.today(), "t1") == pytest.approx(0.0)
+        assert ledger.spent_by_model("t1") == pytest.approx({"m": 0.3 + 7 * 0.05})
+
+
+def test_sqlite_spend_ledger_is_shared_across_connections(tmp_path) -> None:
+    path = tmp_path / "spend.sqlite3"
+    first = SpendLedger(SqliteSpendBackend(path), daily_cap_usd=2.0)
+    first.record("t1", "m", 1.25)
+    first.flush()
+    second = BudgetAgent(ledger=SpendLedger(SqliteSpendBackend(path), daily_cap_usd=2.0), tenant_id="t1")
+    assert second.get_daily_spend() == 1.25
+    assert second.check_budget() == "ok"
+    assert second.reserve("openai/gpt-4.1", estimated_tokens=200_000) is None
+
+
 def test_coordinator_routes_simple_without_delegation() -> None:
     coordinator = Coordinator()
     message = UnifiedMessage(channel="web", sender_id="u1", tenant_id="t1", text="hello")
@@ -62,3 +215,99 @@ def test_manager_decomposes_multi_step_task() -> None:
     )
     tasks = manager.decompose("check mails and create workflow", decision, request_id="r1")
     assert len(tasks) == 2
+
+
+class _SleepySpecialist:
+    """Fake specialist that sleeps per task text and tracks peak concurrency."""
+
+    lock = threading.Lock()
+
+    def __init__(self, name: str, delays: dict[str, float], counters: dict[str, int]) -> None:
+        self.name = name
+        self.delays = delays
+        self.counters = counters
+
+    def execute(self, task, context) -> TaskResult:
+        with self.lock:
+            self.counters["active"] += 1
+            self.counters["peak"] = max(self.counters["peak"], self.counters["active"])
+        try:
+            time.sleep(self.delays.get(task.payload["text"], 0.05))
+        finally:
+            with self.lock:
+                self.counters["active"] -= 1
+        return TaskResult(task_id=task.task_id, from_agent=self.name, to_agent="manager", payload={"text": task.payload["text"]})
+
+
+def test_coordinator_runs_specialists_in_parallel_with_partial_results() -> None:
+    coordinator = Coordinator()
+    coordinator.max_specialists = 2
+    coordinator.task_timeout_seconds = 0.3
+    counters = {"active": 0, "peak": 0}
+    delays = {"check mails": 0.1, "create workflow": 0.1, "ping server": 1.0}
+    coordinator.specialists = [_SleepySpecialist(f"s{i}", delays, counters) for i in range(4)]
+
+    message = UnifiedMessage(
+        channel="web", sender_id="u1", tenant_id="t1", text="check mails and ping server and create workflow"
+    )
+    started = time.perf_counter()
+    result = coordinator.process(message)
+    elapsed = time.perf_counter() - started
+
+    assert result.text == "check mails\ncreate workflow"
+    assert counters["peak"] == 2
+    assert elapsed < 0.9
+
+
+def test_sync_delegation_is_rejected_inside_running_loop() -> None:
+    coordinator = Coordinator()
+    message = UnifiedMessage(channel="web", sender_id="u1", tenant_id="t1", text="check mails and create workflow")
+
+    async def _call_sync() -> None:
+        coordinator.process(message)
+
+    with pytest.raises(RuntimeError, match="aprocess"):
+        asyncio.run(_call_sync())
+
+
+def test_timed_out_specialists_do_not_starve_the_pool() -> None:
+    coordinator = Coordinator()
+    coordinator.task_timeout_seconds = 0.05
+    counters = {"active": 0, "peak": 0}
+    release = threading.Event()
+
+    class _StuckSpecialist(_SleepySpecialist):
+        def execute(self, task, context) -> TaskResult:
+            release.wait(5)
+            return super().execute(task, context)
+
+    coordinator.specialists = [_StuckSpecialist("stuck", {}, counters)]
+    message = UnifiedMessage(channel="web", sender_id="u1", tenant_id="t1", text="check mails and create workflow")
+    try:
+        for _ in range(coordinator._executor_workers):
+            coordinator.process(message)
+        # tasks of one request check the limit together, so it may be passed by one batch
+        limit = coordinator._executor_workers - coordinator.max_specialists
+        assert limit <= len(coordinator._abandoned) < coordinator._executor_workers
+
+        task = coordinator.manager.decompose("check mails", coordinator._simple_route("mail"), request_id="r")[0]
+        started = time.perf_counter()
+        result = asyncio.run(coordinator._run_specialist(coordinator.specialists[0], task, None, asyncio.Semaphore(1)))
+        assert result.payload["error"].startswith("overloaded")
+        assert time.perf_counter() - started < 0.05
+    finally:
+        release.set()
+    coordinator._executor.shutdown(wait=True)
+    assert not coordinator._abandoned
+
+def test_specialists_share_coordinator_loop_and_log_sink(monkeypatch) -> None:
+    coordinator = Coordinator()
+    monkeypatch.setattr(coordinator.loop, "_call_litellm", lambda model, prompt, max_tokens: f"done:{prompt}")
+
+    message = UnifiedMessage(channel="web", sender_id="u1", tenant_id="t1", text="check mails and create workflow")
+    result = coordinator.process(message)
+
+    assert all(specialist.loop is coordinator.loop for specialist in coordinator.specialists)
+    assert result.text == "done:check mails\ndone:create workflow"
+    logs = coordinator.loop.logger.logs()
+    assert sorted(log["input_text"] for log in logs) == ["check mails", "create workflow"]
@@ -82,3 +82,219 @@ def test_llm_classifier_placeholder_returns_stable_decision():
     assert decision.intent == "fallback"
     assert decision.tier.value == "tier_3"
     assert decision.risk_level.value == "high"
+
+
+def test_keyword_route_counts_overlapping_keywords_with_word_boundaries():
+    intents = {
+        "intents": {
+            "booking": {"keywords": ["kurs buchen", "buchen", "termin"], "default_tier": "tier_2"},
+            "ops": {"keywords": ["dd", "rm"], "default_tier": "tier_3"},
+        }
+    }
+
+    decision = keyword_route("Ich möchte einen Kurs buchen", intents)
+
+    assert decision is not None
+    assert decision.intent == "booking"
+    assert "2 Treffer" in decision.rationale
+    assert keyword_route("please add a form", intents) is None
+
+
+def test_keyword_matcher_matches_regex_reference():
+    import re
+
+    from src.routing.keyword import get_keyword_matcher
+
+    intents = {
+        "intents": {
+            "faq": {"keywords": ["preis", "öffnungszeiten", "c++", "preis", ""]},
+            "booking": {"keywords": ["termin", "termin buchen", "buchen"]},
+            "storno": {"keywords": ["absagen", "ab"]},
+        }
+    }
+    messages = [
+        "Preis? Öffnungszeiten!",
+        "termin buchen bitte, termin_x",
+        "c++ kurs und absagen",
+        "abab ab",
+        "preise",
+        "",
+    ]
+    matcher = get_keyword_matcher(intents)
+
+    for message in messages:
+        text = message.lower()
+        for intent_name, meta in intents["intents"].items():
+            expected = 0
+            for keyword in meta["keywords"]:
+                escaped = re.escape(keyword.strip().lower())
+                if escaped and re.search(rf"(?<!\w){escaped}(?!\w)", text, flags=re.IGNORECASE):
+                    expected += 1
+            assert matcher.intent_hits(text).get(intent_name, 0) == expected, (message, intent_name)
+
+
+def test_keyword_matcher_cache_reuses_and_rebuilds_on_change():
+    from src.routing.keyword import get_keyword_matcher
+
+    intents = {"intents": {"faq": {"keywords": ["preis"]}}}
+    reloaded = {"intents": {"faq": {"keywords": ["preis"]}}}
+    changed = {"intents": {"faq": {"keywords": ["kosten"]}}}
+
+    assert get_keyword_matcher(intents) is get_keyword_matcher(intents)
+    assert get_keyword_matcher(reloaded) is get_keyword_matcher(intents)
+    assert get_keyword_matcher(changed) is not get_keyword_matcher(intents)
+    assert keyword_route("Was kostet das? kosten", changed) is not None
+
+
+def test_compiled_cache_picks_up_in_place_edits():
+    from src.tools.permissions import get_permission_table
+
+    intents = {"intents": {"faq": {"keywords": ["preis"]}}}
+    assert keyword_route("kosten", intents) is None
+    intents["intents"]["faq"]["keywords"].append("kosten")
+    assert keyword_route("kosten", intents) is not None
+
+    tools = {"tools": {"shell": {"scopes": ["admin"]}}}
+    assert not get_permission_table(tools).check_scope("shell", {"user"})
+    tools["tools"]["shell"]["scopes"] = ["user"]
+    assert get_permission_table(tools).check_scope("shell", {"user"})
+
+
+def test_semantic_index_matches_linear_scan():
+    import random
+
+    from scripts.bench_routing import build_synthetic_intents, linear_scan_route
+
+    intents = build_synthetic_intents(200, vocab_size=300, seed=3)
+    intents["intents"]["kw_only"] = {"keywords": ["wort1", "wort2"]}
+    intents["intents"]["empty"] = {"examples": []}
+    rng = random.Random(5)
+    vocab = [f"wort{i}" for i in range(300)]
+
+    for _ in range(200):
+        message = " ".join(rng.sample(vocab, 5))
+        decision = semantic_route(message, intents)
+        expected = linear_scan_route(message, intents)
+        assert (decision.intent if decision else None) == expected
+
+
+def test_embedding_route_matches_paraphrase_without_token_overlap():
+    from src.routing.embedding import EmbeddingRouter, embedding_route
+
+    intents = {
+        "intents": {
+            "faq": {"examples": ["Öffnungszeiten", "Wann habt ihr geöffnet"], "default_tier": "tier_1"},
+            "booking": {"examples": ["Termin buchen", "Kurs buchen"], "default_tier": "tier_2"},
+        }
+    }
+    router = EmbeddingRouter()
+
+    assert semantic_route("Öffnungszeit?", intents) is None
+    decision = embedding_route("Öffnungszeit?", intents, router=router)
+
+    assert decision is not None
+    assert decision.intent == "faq"
+    assert embedding_route("Wie wird das Wetter morgen", intents, router=router) is None
+
+
+def test_embedding_index_is_persisted_per_config_hash(tmp_path):
+    import numpy as np
+
+    from src.routing.embedding import EmbeddingRouter
+
+    intents = {"intents": {"faq": {"examples": ["Öffnungszeiten", "Preise"]}}}
+
+    first = EmbeddingRouter(cache_dir=tmp_path).index_for(intents)
+    cached_files = list(tmp_path.glob("*.npy"))
+    second = EmbeddingRouter(cache_dir=tmp_path).index_for(intents)
+
+    assert len(cached_files) == 1
+    assert first.matrix.dtype == np.float32
+    assert isinstance(second.matrix, np.memmap)
+    np.testing.assert_array_equal(first.matrix, second.matrix)
+
+
+def test_route_trims_tools_by_channel_and_scopes():
+    from src.routing import route
+    from src.routing.cache import RoutingDecisionCache
+
+    context = _routing_context({"intents": {"faq": {"keywords": ["öffnungszeiten"], "default_tier": "tier_1"}}})
+    context.config.tools["tools"]["kb_search"] = {"enabled": True, "scopes": ["read:kb"], "allowed_channels": ["web"]}
+
+    unrestricted = route("Öffnungszeiten?", context, decision_cache=RoutingDecisionCache())
+    on_telegram = route("Öffnungszeiten?", context, decision_cache=RoutingDecisionCache(), channel="telegram", granted_scopes={"read:kb"})
+    on_web = route("Öffnungszeiten?", context, decision_cache=RoutingDecisionCache(), channel="web", granted_scopes={"read:kb"})
+
+    assert "kb_search" in unrestricted.tools_to_load
+    assert "kb_search" not in on_telegram.tools_to_load
+    assert "kb_search" in on_web.tools_to_load
+
+
+def _routing_context(intents: dict):
+    from src.tenant.models import Tenant, TenantConfig, TenantContext
+
+    config = TenantConfig(tenant=Tenant(tenant_id="t1", business_name="Demo"), intents=intents, tools={"tools": {}})
+    return TenantContext(tenant_id="t1", config=config, risk_mapping={"faq": "high"})
+
+
+def test_route_caches_decisions_per_tenant_and_message():
+    from src.routing import route
+    from src.routing.cache import RoutingDecisionCache
+
+    cache = RoutingDecisionCache(maxsize=10)
+    context = _routing_context({"intents": {"faq": {"keywords": ["öffnungszeiten"], "default_tier": "tier_1"}}})
+
+    first = route("Öffnungszeiten?", context, decision_cache=cache)
+    second = route("  öffnungszeiten?", context, decision_cache=cache)
+
+    assert first == second
+    assert first.risk_level.value == "high"
+    assert first.requires_confirmation is True
+    assert "kb_search" in first.tools_to_load
+    assert (cache.stats().hits, cache.stats().misses) == (1, 1)
+
+    assert cache.invalidate_tenant("t1") == 1
+    route("Öffnungszeiten?", context, decision_cache=cache)
+    assert cache.stats().misses == 2
+
+
+def test_decision_cache_expires_entries_and_changes_key_with_config():
+    from src.routing.cache import RoutingDecisionCache
+    from src.routing.llm_classifier import classify_with_llm_fallback
+
+    now = [0.0]
+    cache = RoutingDecisionCache(maxsize=1, ttl_seconds=10, clock=lambda: now[0])
+    decision = classify_with_llm_fallback("x", {"intents": {}})
+
+    cache.put("t1", "fp1", "Hallo", decision)
+    assert cache.get("t1", "fp1", "hallo") is decision
+    assert cache.get("t1", "fp2", "hallo") is None
+
+    now[0] = 11.0
+    assert cache.get("t1", "fp1", "hallo") is None
+
+    cache.put("t1", "fp1", "a", decision)
+    cache.put("t1", "fp1", "b", decision)
+    assert cache.stats().size == 1
+    assert cache.get("t1", "fp1", "a") is None
+
+
+def test_route_batch_matches_per_message_route():
+    from src.routing import route, route_batch
+    from src.routing.cache import RoutingDecisionCache
+
+    context = _routing_context(
+        {
+            "intents": {
+                "faq": {"keywords": ["öffnungszeiten", "preis"], "examples": ["Wann habt ihr offen"], "default_tier": "tier_1"},
+                "booking": {"keywords": ["termin"], "default_tier": "tier_2"},
+                "fallback": {"default_tier": "tier_3"},
+            }
+        }
+    )
+    messages = ["Öffnungszeiten?", "öffnungszeiten? ", "Termin morgen", "wann offen", "Öffnungszeit", "xyz", ""]
+
+    expected = [route(m, context, decision_cache=RoutingDecisionCache()) for m in messages]
+
+    assert route_batch(messages, context) == expected
+    assert route_batch(messages, context, workers=2, parallel_threshold=1) == expected
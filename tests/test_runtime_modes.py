@@ -1,6 +1,9 @@
 from src.config import Settings
 from src.db.client import SupabaseClientPlaceholder, create_event_store
 from src.db.supabase import InMemorySupabaseClient
+from src.memory.client import create_working_memory
+from src.memory.redis_working import RedisWorkingMemoryStore
+from src.memory.working import WorkingMemoryStore
 from src.observability.client import (
     LangfuseCloudClientPlaceholder,
     create_decision_logger,
@@ -16,6 +19,7 @@ def test_local_runtime_uses_in_memory_adapters() -> None:
 
     assert isinstance(event_store, InMemorySupabaseClient)
     assert isinstance(logger, InMemoryLangfuseClient)
+    assert isinstance(create_working_memory(cfg), WorkingMemoryStore)
 
 
 def test_production_runtime_uses_placeholders() -> None:
@@ -26,3 +30,4 @@ def test_production_runtime_uses_placeholders() -> None:
 
     assert isinstance(event_store, SupabaseClientPlaceholder)
     assert isinstance(logger, LangfuseCloudClientPlaceholder)
+    assert isinstance(create_working_memory(cfg), RedisWorkingMemoryStore)
@@ -1,9 +1,11 @@
+import pickle
 from pathlib import Path
 
 import pytest
 
+from src.tenant.bundle import _HEADER_SIZE
 from src.tenant.manager import TenantConfigError, TenantIdError, TenantManager, TenantNotFoundError
-from src.tenant.models import TenantConfig, TenantContext, TenantMembership
+from src.tenant.models import Tenant, TenantConfig, TenantContext, TenantMembership
 
 
 def test_mock_tenant_fixture(mock_tenant):
@@ -83,3 +85,111 @@ def test_tenant_id_with_invalid_chars_rejected(project_root: Path):
 
     with pytest.raises(TenantIdError):
         manager.load_tenant_config("example tenant")
+
+
+def _write_tenant_tree(config_root: Path, tenant_ids: list[str]) -> None:
+    (config_root / "defaults").mkdir(parents=True)
+    (config_root / "defaults" / "intents.yaml").write_text('{"intents": {"faq": {"keywords": ["preis"]}}}', encoding="utf-8")
+    for f in ["tools.yaml", "channels.yaml", "prompt_template.yaml"]:
+        (config_root / "defaults" / f).write_text("{}", encoding="utf-8")
+    for tenant_id in tenant_ids:
+        (config_root / "tenants" / tenant_id).mkdir(parents=True)
+        (config_root / "tenants" / tenant_id / "tenant.yaml").write_text(
+            f'{{"tenant_id": "{tenant_id}", "business_name": "B"}}', encoding="utf-8"
+        )
+
+
+def test_tenant_config_cache_reuses_and_reloads_on_file_change(tmp_path: Path):
+    config_root = tmp_path / "configs"
+    _write_tenant_tree(config_root, ["t1"])
+    reloaded: list[str] = []
+    manager = TenantManager(config_root=config_root, on_reload=reloaded.append)
+
+    first = manager.load_tenant_config("t1")
+    assert manager.load_tenant_config("t1") is first
+
+    (config_root / "tenants" / "t1" / "intents.yaml").write_text(
+        '{"intents": {"faq": {"keywords": ["kosten"]}}}', encoding="utf-8"
+    )
+    second = manager.load_tenant_config("t1")
+
+    assert second is not first
+    assert second.intents["intents"]["faq"]["keywords"] == ["preis", "kosten"]
+    assert first.intents["intents"]["faq"]["keywords"] == ["preis"]
+    assert reloaded == ["t1"]
+
+
+def test_tenant_config_cache_is_bounded_and_parses_defaults_once(tmp_path: Path, monkeypatch):
+    config_root = tmp_path / "configs"
+    _write_tenant_tree(config_root, ["a", "b", "c"])
+    manager = TenantManager(config_root=config_root, max_cached_tenants=2)
+
+    reads: list[Path] = []
+    original_read = manager._read_yaml  # noqa: SLF001
+    monkeypatch.setattr(manager, "_read_yaml", lambda path, allow_missing=False: reads.append(path) or original_read(path, allow_missing))
+
+    for tenant_id in ["a", "b", "c"]:
+        manager.load_tenant_config(tenant_id)
+
+    default_reads = [path for path in reads if path.parent.name == "defaults"]
+    assert len(default_reads) == 4
+    assert manager.cached_tenant_ids() == ["b", "c"]
+    config_a = manager.load_tenant_config("a")
+    config_b = manager.load_tenant_config("b")
+    assert config_a.intents["intents"] is not config_b.intents["intents"]
+
+
+def test_compiled_bundle_is_loaded_and_falls_back_to_yaml_when_stale(tmp_path: Path, monkeypatch):
+    from scripts.compile_tenant_bundles import compile_bundles
+
+    config_root = tmp_path / "configs"
+    bundle_root = tmp_path / "bundles"
+    _write_tenant_tree(config_root, ["t1"])
+    assert [p.name for p in compile_bundles(config_root, bundle_root)] == ["t1.bundle"]
+
+    expected = TenantManager(config_root=config_root).load_tenant_config("t1")
+    manager = TenantManager(config_root=config_root, bundle_root=bundle_root)
+    with monkeypatch.context() as patched:
+        patched.setattr(manager, "_build_tenant_config", lambda *_: pytest.fail("YAML path used"))
+        assert manager.load_tenant_config("t1") == expected
+
+    (config_root / "defaults" / "intents.yaml").write_text('{"intents": {"faq": {"keywords": ["neu"]}}}', encoding="utf-8")
+    fresh = TenantManager(config_root=config_root, bundle_root=bundle_root).load_tenant_config("t1")
+    assert fresh.intents["intents"]["faq"]["keywords"] == ["neu"]
+
+
+def test_corrupt_bundle_is_ignored(tmp_path: Path):
+    config_root = tmp_path / "configs"
+    bundle_root = tmp_path / "bundles"
+    _write_tenant_tree(config_root, ["t1"])
+    bundle_root.mkdir()
+    (bundle_root / "t1.bundle").write_bytes(b"NXTB\x01garbage")
+
+    config = TenantManager(config_root=config_root, bundle_root=bundle_root).load_tenant_config("t1")
+    assert config.tenant.tenant_id == "t1"
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        b"\x80\x05garbage",
+        b"cnexus_renamed_module\nTenantConfig\n)R.",
+        pickle.dumps(Tenant)[:-4],
+        b"\x80\x05K\x01K\x01R.",
+        b"\x80\x05\x8c\t_operator\x94\x8c\x07getitem\x94\x93\x94}\x94\x8c\x01x\x94\x86\x94R\x94.",
+        b"\x80\x05\x8c\t_operator\x94\x8c\x07getitem\x94\x93\x94]\x94K\x00\x86\x94R\x94.",
+    ],
+    ids=["garbage", "missing-module", "truncated", "type-error", "key-error", "index-error"],
+)
+def test_bundle_with_valid_header_and_corrupt_payload_falls_back_to_yaml(tmp_path: Path, payload: bytes):
+    from scripts.compile_tenant_bundles import compile_bundles
+
+    config_root = tmp_path / "configs"
+    bundle_root = tmp_path / "bundles"
+    _write_tenant_tree(config_root, ["t1"])
+    [path] = compile_bundles(config_root, bundle_root)
+    header = path.read_bytes()[:_HEADER_SIZE]
+    path.write_bytes(header + payload)
+
+    config = TenantManager(config_root=config_root, bundle_root=bundle_root).load_tenant_config("t1")
+    assert config.tenant.tenant_id == "t1"
@@ -1,9 +1,21 @@
+import json
+import os
 from datetime import date
 from pathlib import Path
 
+from src.grounding.citations import CITATION_PATTERN
 from src.tools.servers.calendar import get_mock_availability
 from src.tools.servers.customer import CustomerProfile, CustomerStore
-from src.tools.servers.knowledge_base import kb_search, load_kb_entries
+from src.tools.servers.knowledge_base import (
+    KnowledgeBaseIndex,
+    get_hybrid_retriever,
+    get_kb_index,
+    kb_hybrid_search,
+    kb_search,
+    kb_source_hash,
+    load_kb_entries,
+    normalize_token,
+)
 
 
 def test_kb_search_returns_relevant_entry() -> None:
@@ -13,6 +25,18 @@ def test_kb_search_returns_relevant_entry() -> None:
     assert "Öffnungszeiten" in results[0]["title"]
 
 
+def test_kb_search_sees_entry_lists_changed_in_place() -> None:
+    kb_path = Path("configs/tenants/example_tenant/kb_seed.yaml")
+    assert kb_search("Öffnungszeiten", load_kb_entries(kb_path), top_k=1)[0] is get_kb_index(kb_path).search("Öffnungszeiten", 1)[0]
+
+    entries = [{"id": "A", "title": "Preise", "snippet": "Preisliste"}]
+    assert kb_search("Gutschein", entries) == []
+    entries.append({"id": "B", "title": "Gutscheine", "snippet": "Geschenk"})
+    assert [e["id"] for e in kb_search("Gutschein", entries)] == ["B"]
+    entries[0]["title"] = "Gutschein Aktion"
+    assert {e["id"] for e in kb_search("Gutschein", entries)} == {"A", "B"}
+
+
 def test_calendar_mock_availability_shape() -> None:
     slots = get_mock_availability(start_date=date(2026, 1, 1), days=2)
     assert len(slots) == 4
@@ -25,3 +49,109 @@ def test_customer_store_upsert_and_get() -> None:
     profile = store.get("c1")
     assert profile is not None
     assert profile["first_name"] == "Max"
+
+
+def test_kb_index_german_normalization_and_bm25_ranking() -> None:
+    assert normalize_token("Öffnungszeiten") == normalize_token("oeffnungszeit")
+    assert normalize_token("Anmeldungen") == normalize_token("Anmeldung")
+
+    index = KnowledgeBaseIndex.from_entries(
+        [
+            {"id": "KB-1", "title": "Kurse", "snippet": "Nageldesign Kurse in Bochum und Essen"},
+            {"id": "KB-2", "title": "Kursanmeldung", "snippet": "Anmeldungen für alle Kurse online"},
+            {"id": "KB-3", "title": "Öffnungszeiten", "snippet": "Montag bis Freitag"},
+        ]
+    )
+    assert [e["id"] for e in index.search("Anmeldung zum Kurs", top_k=2)] == ["KB-2", "KB-1"]
+    assert index.search("Oeffnungszeit")[0]["id"] == "KB-3"
+    assert index.search("Wetter") == []
+
+    assert index.remove("KB-2")
+    assert not index.remove("KB-2")
+    index.add({"id": "KB-3", "title": "Anmeldung", "snippet": "telefonisch"})
+    assert index.search("Öffnungszeiten") == []
+    assert [e["id"] for e in index.search("Anmeldung")] == ["KB-3"]
+
+
+def test_kb_index_persists_and_detects_stale_source(tmp_path: Path) -> None:
+    kb_path = tmp_path / "kb_seed.yaml"
+    kb_path.write_text(json.dumps({"entries": [{"id": "KB-1", "title": "Preise", "snippet": "Basiskurs 199 Euro"}]}), encoding="utf-8")
+    index_path = tmp_path / "kb.idx"
+
+    index = get_kb_index(kb_path, index_path)
+    assert index_path.exists()
+    loaded = KnowledgeBaseIndex.load(index_path, kb_source_hash(kb_path))
+    assert loaded is not None
+    assert loaded.search("Preis Basiskurs")[0]["id"] == "KB-1"
+    assert get_kb_index(kb_path, index_path) is index
+
+    kb_path.write_text(json.dumps({"entries": [{"id": "KB-2", "title": "Gutscheine", "snippet": "online kaufen"}]}), encoding="utf-8")
+    os.utime(kb_path, ns=(1, 1))
+    assert KnowledgeBaseIndex.load(index_path, kb_source_hash(kb_path)) is None
+    assert get_kb_index(kb_path, index_path).search("Gutschein")[0]["id"] == "KB-2"
+    assert load_kb_entries(kb_path)[0]["id"] == "KB-2"
+
+
+def test_kb_index_rebuilds_when_index_file_is_unusable(tmp_path: Path) -> None:
+    from src.tools.servers.knowledge_base import _HEADER_SIZE
+
+    kb_path = tmp_path / "kb_seed.yaml"
+    kb_path.write_text(json.dumps({"entries": [{"id": "KB-1", "title": "Preise", "snippet": "Basiskurs"}]}), encoding="utf-8")
+    directory = tmp_path / "as_dir.idx"
+    directory.mkdir()
+    assert KnowledgeBaseIndex.load(directory) is None
+    assert get_kb_index(kb_path, directory).search("Preise")[0]["id"] == "KB-1"
+
+    index_path = tmp_path / "kb.idx"
+    KnowledgeBaseIndex.from_entries([]).save(index_path, kb_source_hash(kb_path))
+    header = index_path.read_bytes()[:_HEADER_SIZE]
+    for payload in [b"cnexus_renamed_module\nIndex\n)R.", b"\x80\x05K\x01K\x01R."]:
+        index_path.write_bytes(header + payload)
+        assert KnowledgeBaseIndex.load(index_path, kb_source_hash(kb_path)) is None
+
+
+def test_hybrid_kb_search_fuses_rankers_and_caches_results(tmp_path: Path) -> None:
+    kb_path = tmp_path / "kb_seed.yaml"
+    kb_path.write_text(Path("configs/tenants/example_tenant/kb_seed.yaml").read_text(encoding="utf-8"), encoding="utf-8")
+
+    # no BM25 term overlap ("geöffnet" vs. "Öffnungszeiten"); found through shared character n-grams
+    results = kb_hybrid_search("Wann habt ihr geöffnet?", kb_path, top_k=1)
+    assert [r["id"] for r in results] == ["KB-FAQ-001"]
+    assert CITATION_PATTERN.fullmatch(f"[{results[0]['id']}]")
+    assert kb_hybrid_search("Kursanmeldung online", kb_path, top_k=1)[0]["id"] == "KB-BOOKING-001"
+
+    retriever = get_hybrid_retriever(kb_path)
+    kb_hybrid_search("  kursanmeldung ONLINE ", kb_path, top_k=1)
+    assert retriever.hits == 1
+
+    retriever.add({"id": "KB-FAQ-002", "title": "Kursanmeldung online", "snippet": "Kursanmeldung online über das Portal"})
+    assert retriever.search("Kursanmeldung online", top_k=1)[0]["id"] == "KB-FAQ-002"
+    assert retriever.remove("KB-FAQ-002")
+    assert retriever.search("Kursanmeldung online", top_k=1)[0]["id"] == "KB-BOOKING-001"
+
+    kb_path.write_text(json.dumps({"entries": [{"id": "KB-NEW-001", "title": "Gutscheine", "snippet": "online"}]}), encoding="utf-8")
+    os.utime(kb_path, ns=(1, 1))
+    assert get_hybrid_retriever(kb_path) is not retriever
+    assert kb_hybrid_search("Gutschein", kb_path)[0]["id"] == "KB-NEW-001"
+
+
+def test_hybrid_search_scores_snapshot_while_kb_changes() -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    from src.tools.servers.knowledge_base import HybridKnowledgeRetriever
+
+    retriever = HybridKnowledgeRetriever([{"id": "A", "title": "Kurs", "snippet": "Nageldesign Kurs"}])
+    snapshot = retriever.bm25
+    retriever.add({"id": "B", "title": "Kurs", "snippet": "Nageldesign Kurs"})
+
+    assert snapshot is not retriever.bm25 and len(snapshot) == 1
+    assert retriever.bm25.order("A") < retriever.bm25.order("B") < retriever.bm25.order("missing")
+    assert [e["id"] for e in retriever.search("Nageldesign Kurs", top_k=2)] == ["A", "B"]
+
+    def _work(i: int) -> int:
+        if i % 4 == 0:
+            retriever.add({"id": f"X{i}", "title": "Preise", "snippet": f"Preisliste {i}"})
+        return len(retriever.search(f"Preisliste {i}", top_k=3))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert all(n <= 3 for n in pool.map(_work, range(200)))